@@ -0,0 +1,429 @@
+"""Offline end-to-end benchmark for daily.py
+
+Starts local stand-ins for LeetCode (GraphQL, submit and check endpoints),
+Gemini (daily.py's fake generation backend), SMTP and the JavaYatra remote,
+points daily.py at them and drives main() or run_batch(). Reports end-to-end
+latency, attempts-to-accept, throughput and the per-stage breakdown from the
+run history, so performance changes can be measured without any secrets.
+
+    python bench.py --runs 5
+    python bench.py --scenario batch --problems 20 --workers 4
+    python bench.py --scenario fanout --accounts 10 --expired-accounts 2
+    python bench.py --verdicts "Accepted=0.5,Wrong Answer=0.4,Time Limit Exceeded=0.1" --judge-time 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import shutil
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def parse_pairs(spec, default_key="*"):
+    """Parse "1.5" or "name=2,other=0.5" into {name or '*': float}"""
+    values = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            name, value = part.rsplit("=", 1)
+            values[name.strip()] = float(value)
+        else:
+            values[default_key] = float(part)
+    return values
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+# ---------------------------
+# Fake LeetCode
+# ---------------------------
+JAVA_TEMPLATE = """class Solution {
+    public int[] twoSum(int[] nums, int target) {
+
+    }
+}"""
+
+CPP_TEMPLATE = """class Solution {
+public:
+    vector<int> twoSum(vector<int>& nums, int target) {
+
+    }
+};"""
+
+PYTHON3_TEMPLATE = """class Solution:
+    def twoSum(self, nums: List[int], target: int) -> List[int]:
+        """
+
+PROBLEM_HTML = """<p>Given an array of integers <code>nums</code> and an integer <code>target</code>, return
+<em>indices of the two numbers such that they add up to <code>target</code></em>.</p>
+<p><strong class="example">Example 1:</strong></p>
+<pre><strong>Input:</strong> nums = [2,7,11,15], target = 9
+<strong>Output:</strong> [0,1]
+<strong>Explanation:</strong> Because nums[0] + nums[1] == 9, we return [0, 1].
+</pre>
+<p><strong>Constraints:</strong></p>
+<ul><li><code>2 &lt;= nums.length &lt;= 10<sup>4</sup></code></li></ul>
+"""
+
+
+class FakeLeetCode:
+    """Synthetic problems plus a judge with configurable latency and verdict distribution"""
+
+    def __init__(self, problems, latency, judge_time, verdicts):
+        self.slugs = [f"bench-problem-{n}" for n in range(1, problems + 1)]
+        self.latency = latency          # endpoint -> seconds added to every response
+        self.judge_time = judge_time    # mean seconds from submit to verdict
+        self.verdicts = verdicts        # status_msg -> weight
+        self.submissions = {}
+        self.requests = {"graphql": 0, "submit": 0, "check": 0}
+        self.languages = {}  # langSlug -> submissions
+        self.lock = threading.Lock()
+
+    def question(self, slug):
+        number = self.slugs.index(slug) + 1
+        return {
+            "questionId": str(number),
+            "questionFrontendId": str(number),
+            "title": f"Bench Problem {number}",
+            "titleSlug": slug,
+            "content": PROBLEM_HTML,
+            "isPaidOnly": False,
+            "codeSnippets": [
+                {"lang": "Java", "langSlug": "java", "code": JAVA_TEMPLATE},
+                {"lang": "C++", "langSlug": "cpp", "code": CPP_TEMPLATE},
+                {"lang": "Python3", "langSlug": "python3", "code": PYTHON3_TEMPLATE},
+            ],
+            "exampleTestcases": "[2,7,11,15]\n9",
+            "metaData": json.dumps({
+                "name": "twoSum",
+                "params": [{"name": "nums", "type": "integer[]"}, {"name": "target", "type": "integer"}],
+                "return": {"type": "integer[]"},
+            }),
+            "difficulty": random.choice(["Easy", "Medium", "Hard"]),
+            "topicTags": [{"slug": "array"}, {"slug": "hash-table"}],
+        }
+
+    def graphql(self, body):
+        query = body.get("query", "")
+        variables = body.get("variables") or {}
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        if "userStatus" in query:
+            return {"userStatus": {"isSignedIn": True, "username": "bench"}}
+        if "activeDailyCodingChallengeQuestion" in query:
+            return {"activeDailyCodingChallengeQuestion": {"date": today, "question": self.question(self.slugs[0])}}
+        if "dailyCodingChallengeV2" in query:
+            year, month = variables["year"], variables["month"]
+            challenges = [
+                {"date": f"{year}-{month:02d}-{day:02d}", "question": {"titleSlug": slug}}
+                for day, slug in enumerate(self.slugs[:28], 1)
+            ]
+            return {"dailyCodingChallengeV2": {"challenges": challenges}}
+        if "questionList" in query:
+            skip, limit = variables.get("skip", 0), variables.get("limit", 50)
+            page = [{"titleSlug": slug, "isPaidOnly": False} for slug in self.slugs[skip:skip + limit]]
+            return {"questionList": {"totalNum": len(self.slugs), "data": page}}
+        if "titleSlug" in variables:
+            slug = variables["titleSlug"]
+            return {"question": self.question(slug) if slug in self.slugs else None}
+        raise ValueError("Unsupported query")
+
+    def submit(self, body):
+        with self.lock:
+            self.languages[body.get("lang")] = self.languages.get(body.get("lang"), 0) + 1
+        names = list(self.verdicts)
+        verdict = random.choices(names, weights=[self.verdicts[n] for n in names])[0]
+        ready_at = time.monotonic() + random.uniform(0.5 * self.judge_time, 1.5 * self.judge_time)
+        with self.lock:
+            submission_id = 1000 + len(self.submissions)
+            self.submissions[submission_id] = (ready_at, verdict)
+        return {"submission_id": submission_id}
+
+    def check(self, submission_id):
+        with self.lock:
+            ready_at, verdict = self.submissions[submission_id]
+        if time.monotonic() < ready_at:
+            return {"state": "PENDING"}
+        result = {
+            "state": "SUCCESS",
+            "status_msg": verdict,
+            "status_runtime": f"{random.randint(1, 20)} ms",
+            "status_memory": f"{random.uniform(40, 50):.1f} MB",
+            "runtime_percentile": round(random.uniform(10, 100), 2),
+            "total_testcases": 63,
+            "total_correct": 63 if verdict == "Accepted" else random.randint(0, 62),
+        }
+        if verdict == "Wrong Answer":
+            result.update(last_testcase="[3,2,4]\n6", expected_output="[1,2]", code_output="[0,0]")
+        elif verdict == "Time Limit Exceeded":
+            result.update(last_testcase="[1,1,1,1]\n2")
+        elif verdict == "Compile Error":
+            result.update(full_compile_error="Line 3: error: missing return statement")
+        elif verdict == "Runtime Error":
+            result.update(full_runtime_error="java.lang.ArrayIndexOutOfBoundsException", last_testcase="[]\n0")
+        return result
+
+
+class FakeLeetCodeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real site
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, endpoint, payload, status=200):
+        fake = self.server.fake
+        with fake.lock:
+            fake.requests[endpoint] += 1
+        time.sleep(fake.latency.get(endpoint, fake.latency.get("*", 0.0)))
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _expired(self):
+        """Sessions named "expired..." are rejected like stale cookies"""
+        return "LEETCODE_SESSION=expired" in self.headers.get("Cookie", "")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self._expired():
+            self._reply("graphql" if self.path == "/graphql" else "submit", {"error": "not authenticated"}, status=403)
+        elif self.path == "/graphql":
+            try:
+                self._reply("graphql", {"data": self.server.fake.graphql(body)})
+            except ValueError as e:
+                self._reply("graphql", {"errors": [{"message": str(e)}]})
+        elif re.fullmatch(r"/problems/[^/]+/submit/", self.path):
+            self._reply("submit", self.server.fake.submit(body))
+        else:
+            self.send_error(404)
+
+    def do_GET(self):
+        match = re.fullmatch(r"/submissions/detail/(\d+)/check/", self.path)
+        if match:
+            self._reply("check", self.server.fake.check(int(match.group(1))))
+        else:
+            self.send_error(404)
+
+
+# ---------------------------
+# SMTP sink
+# ---------------------------
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept and count messages"""
+
+    def handle(self):
+        self.wfile.write(b"220 bench smtp sink\r\n")
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    with self.server.lock:
+                        self.server.messages += 1
+                    self.wfile.write(b"250 OK\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            elif command in (b"EHLO", b"HELO"):
+                self.wfile.write(b"250 bench\r\n")
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+def start_server(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def init_remote(workdir):
+    """Bare git repo standing in for JavaYatra"""
+    remote = os.path.join(workdir, "JavaYatra.git")
+    seed = os.path.join(workdir, "seed")
+    subprocess.run(["git", "init", "-q", "--bare", remote], check=True)
+    os.makedirs(os.path.join(seed, "leetcode_daily"))
+    with open(os.path.join(seed, "leetcode_daily", "README.md"), "w") as f:
+        f.write("bench\n")
+    for args in (["init", "-q"], ["add", "-A"], ["commit", "-q", "-m", "seed"], ["push", "-q", remote, "HEAD:main"]):
+        subprocess.run(["git", "-c", "user.name=bench", "-c", "user.email=bench@localhost", *args],
+                       cwd=seed, check=True)
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=remote, check=True)
+    return remote
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+def configure_environment(args, workdir, leetcode_port, smtp_port, remote):
+    """Point daily.py at the stand-ins; must run before daily is imported"""
+    cache_dir = os.path.join(workdir, "cache")
+    os.environ.update({
+        "LEETCODE_BASE_URL": f"http://127.0.0.1:{leetcode_port}",
+        "LEETCODE_SESSION": "bench-session",
+        "LEETCODE_CSRF": "bench-csrf",
+        "GEMINI_BACKEND": "fake",
+        "FAKE_MODEL_LATENCY": args.model_latency,
+        "FAKE_MODEL_FAILURE_RATE": args.model_failure_rate,
+        "EMAIL_USER": "bench@localhost",
+        "EMAIL_TO": "bench@localhost",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_STARTTLS": "0",
+        "CACHE_ENABLED": "0",
+        "CACHE_DIR": cache_dir,
+        "RUN_HISTORY_PATH": os.path.join(cache_dir, "run_history.jsonl"),
+        "SOLUTION_BANK_DIR": os.path.join(workdir, "solution_bank"),
+        "JAVAYATRA_DIR": os.path.join(workdir, "JavaYatra"),
+        "JAVAYATRA_REPO_URL": remote,
+        "RETRY_DELAY": str(args.retry_delay),
+        "LOCAL_VALIDATION": "1" if args.local_validation else "0",
+        "RACE_LANGUAGES": args.languages,
+    })
+    if not args.rate_limits:
+        os.environ["GEMINI_RATE_PER_MIN"] = "0"
+        os.environ["SUBMIT_RATE_PER_MIN"] = "0"
+    for name in ("GEMINI_API_KEY", "EMAIL_PASS", "GH_PAT"):
+        os.environ.pop(name, None)
+
+
+account_statuses = {}  # Fan-out: final status per account, summed over runs
+
+
+def run_scenario(daily, args):
+    """Drive daily.py and return the wall-clock seconds taken"""
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+    started = time.monotonic()
+    with quiet:
+        if args.scenario == "daily":
+            for _ in range(args.runs):
+                # Every run starts cold: no banked solution, no journal, fresh generation samples
+                shutil.rmtree(daily.SOLUTION_BANK_DIR, ignore_errors=True)
+                if os.path.exists(daily.JOURNAL_PATH):
+                    os.remove(daily.JOURNAL_PATH)
+                daily._prompt_uses.clear()
+                daily.main()
+        elif args.scenario == "fanout":
+            for _ in range(args.runs):
+                shutil.rmtree(daily.SOLUTION_BANK_DIR, ignore_errors=True)
+                daily._prompt_uses.clear()
+                accounts = [
+                    daily.Account(f"bench-{n}", f"{'expired' if n <= args.expired_accounts else 'session'}-{n}", "csrf")
+                    for n in range(1, args.accounts + 1)
+                ]
+                daily.run_fanout(accounts)
+                for account in accounts:
+                    account_statuses[account.status] = account_statuses.get(account.status, 0) + 1
+        else:
+            slugs = [f"bench-problem-{n}" for n in range(1, args.problems + 1)]
+            daily.run_batch([(slug, None) for slug in slugs], workers=args.workers)
+        daily.get_notifier().close()
+        daily.close_transport()
+    return time.monotonic() - started
+
+
+def report(daily, args, wall, fake, smtp):
+    runs = [r for r in daily.load_history() if r.get("kind") == args.scenario]
+    latencies = [r["duration_ms"] / 1000 for r in runs]
+    accepted = [r for r in runs if r.get("verdict") == "Accepted"]
+    attempts = [r["attempts"] for r in accepted if r.get("attempts")]
+
+    print(f"\n{'=' * 70}")
+    print(f"BENCHMARK: {args.scenario} x{len(runs)}")
+    print(f"{'=' * 70}")
+    print(f"Verdicts: {fake.verdicts}  judge ~{fake.judge_time}s  model latency {args.model_latency}s")
+    if latencies:
+        print(f"End-to-end latency: p50 {percentile(latencies, 50):.2f}s, p95 {percentile(latencies, 95):.2f}s, "
+              f"max {max(latencies):.2f}s")
+    print(f"Accepted: {len(accepted)}/{len(runs)}")
+    if attempts:
+        print(f"Attempts to accept: p50 {percentile(attempts, 50)}, p95 {percentile(attempts, 95)}, "
+              f"mean {sum(attempts) / len(attempts):.2f}")
+    print(f"Throughput: {len(runs) / wall * 60:.1f} problems/min ({wall:.1f}s wall)")
+    if account_statuses:
+        print("Accounts: " + ", ".join(f"{k} {v}" for k, v in sorted(account_statuses.items())))
+    print("Server requests: " + ", ".join(f"{k} {v}" for k, v in fake.requests.items()))
+    print("Submissions by language: " + ", ".join(f"{k} {v}" for k, v in sorted(fake.languages.items())))
+    print(f"Emails delivered: {smtp.messages}")
+    print()
+    daily.report_stats(kind=args.scenario)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark daily.py against local LeetCode/Gemini/SMTP stand-ins")
+    parser.add_argument("--scenario", choices=["daily", "batch", "fanout"], default="daily")
+    parser.add_argument("--runs", type=int, default=3, help="daily/fanout scenarios: number of cold runs")
+    parser.add_argument("--problems", type=int, default=10, help="batch scenario: number of problems")
+    parser.add_argument("--workers", type=int, default=2, help="batch scenario: worker threads")
+    parser.add_argument("--accounts", type=int, default=5, help="fanout scenario: number of accounts")
+    parser.add_argument("--expired-accounts", type=int, default=0, help="fanout scenario: accounts with stale cookies")
+    parser.add_argument("--verdicts", default="Accepted=0.6,Wrong Answer=0.3,Time Limit Exceeded=0.1",
+                        help="judge verdict weights")
+    parser.add_argument("--judge-time", type=float, default=1.0, help="mean seconds from submit to verdict")
+    parser.add_argument("--latency", default="graphql=0.08,submit=0.15,check=0.05",
+                        help="seconds added to each LeetCode response, per endpoint")
+    parser.add_argument("--model-latency", default="2", help="fake Gemini seconds, single value or model=value,...")
+    parser.add_argument("--model-failure-rate", default="0", help="fake Gemini failure rate, single value or model=value,...")
+    parser.add_argument("--retry-delay", type=int, default=0, help="RETRY_DELAY for the run")
+    parser.add_argument("--local-validation", action="store_true", help="keep local javac validation on")
+    parser.add_argument("--languages", default="java", help="RACE_LANGUAGES for the run, e.g. java,cpp")
+    parser.add_argument("--rate-limits", action="store_true", help="keep daily.py's token-bucket rate limits")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible verdicts")
+    parser.add_argument("--verbose", action="store_true", help="show daily.py's own output")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    workdir = tempfile.mkdtemp(prefix="lc-bench-")
+    try:
+        fake = FakeLeetCode(args.problems, parse_pairs(args.latency), args.judge_time, parse_pairs(args.verdicts))
+        leetcode = ThreadingHTTPServer(("127.0.0.1", 0), FakeLeetCodeHandler)
+        leetcode.daemon_threads = True
+        leetcode.fake = fake
+        start_server(leetcode)
+
+        smtp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPSinkHandler)
+        smtp.daemon_threads = True
+        smtp.lock = threading.Lock()
+        smtp.messages = 0
+        start_server(smtp)
+
+        configure_environment(args, workdir, leetcode.server_address[1], smtp.server_address[1], init_remote(workdir))
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import daily
+
+        wall = run_scenario(daily, args)
+        report(daily, args, wall, fake, smtp)
+        leetcode.shutdown()
+        smtp.shutdown()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
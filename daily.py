@@ -1,42 +1,230 @@
-import requests
-from google import genai
-from google.genai import types
-from bs4 import BeautifulSoup
+# Heavy dependencies (httpx, google-genai, bs4/lxml, smtplib) are imported
+# inside the functions that use them, so --help, cache hits and tests start fast
 import time
+import ast
+import atexit
+import base64
+import contextvars
+import functools
+import importlib.util
+import hashlib
 import json
+import math
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime
+import queue
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone
 
 
-# Environment variables
-LEETCODE_SESSION = os.environ["LEETCODE_SESSION"]
-LEETCODE_CSRF = os.environ.get("LEETCODE_CSRF", "")
-GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
-EMAIL_USER = os.environ["EMAIL_USER"]
-EMAIL_PASS = os.environ["EMAIL_PASS"]
-EMAIL_TO = os.environ["EMAIL_TO"]
-SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
-SMTP_PORT = os.environ.get("SMTP_PORT", "587")
+# LeetCode endpoint (point at a local stand-in for benchmarks: see bench.py)
+LEETCODE_BASE_URL = os.environ.get("LEETCODE_BASE_URL", "https://leetcode.com").rstrip("/")
 
+# LeetCode HTTP transport: one asyncio loop, pooled keep-alive connections, HTTP/2 when h2 is installed
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "30"))  # Seconds per request
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_KEEPALIVE_CONNECTIONS", "10"))
+HTTP2_ENABLED = os.environ.get("HTTP2", "1") == "1"
+
+# Retry / speculative generation settings
+MAX_ATTEMPTS = int(os.environ.get("MAX_ATTEMPTS", "5"))                      # Submissions per run
+SPECULATIVE_CANDIDATES = int(os.environ.get("SPECULATIVE_CANDIDATES", "1"))  # Candidates requested per round (1 = sequential)
+SPECULATIVE_WORKERS = int(os.environ.get("SPECULATIVE_WORKERS", "0"))  # 0 = one per candidate
+GENERATION_BUDGET = int(os.environ.get("GENERATION_BUDGET", "10"))           # Total Gemini generations per run
+RETRY_DELAY = int(os.environ.get("RETRY_DELAY", "10"))
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.9"))  # MinHash similarity to an earlier candidate
+OPTIMIZE_SUBMISSIONS = int(os.environ.get("OPTIMIZE_SUBMISSIONS", "0"))            # Extra submissions spent on faster variants after Accepted
+OPTIMIZE_TARGET_PERCENTILE = float(os.environ.get("OPTIMIZE_TARGET_PERCENTILE", "95"))  # Stop optimizing once runtime beats this %
+GEMINI_STREAMING = os.environ.get("GEMINI_STREAMING", "1") == "1"  # Stop reading once a complete Solution block arrives
+
+# Prompt size caps (estimated tokens per section) and server-side context caching of the fixed prefix
+PROMPT_TOKEN_BUDGETS = {
+    "problem": int(os.environ.get("PROMPT_PROBLEM_TOKENS", "3000")),
+    "template": int(os.environ.get("PROMPT_TEMPLATE_TOKENS", "800")),
+    "feedback": int(os.environ.get("PROMPT_FEEDBACK_TOKENS", "600")),
+}
+PROMPT_CONTEXT_CACHE = os.environ.get("PROMPT_CONTEXT_CACHE", "1") == "1"
+CONTEXT_CACHE_TTL = os.environ.get("CONTEXT_CACHE_TTL", "900s")
+
+# Model selection: primary first, then fallbacks; hedging and per-model circuit breakers
+GEMINI_BACKEND = os.environ.get("GEMINI_BACKEND", "genai")  # "fake" for offline runs
+GEMINI_MODELS = [m.strip() for m in os.environ.get("GEMINI_MODELS", "gemini-3-pro-preview,gemini-2.5-pro").split(",") if m.strip()]
+
+# Difficulty routing: each tier sets the model order, output/thinking budget and candidates per round.
+# A problem starts on its difficulty's tier, shifted one up (or down) when similar problems in the run
+# history needed ROUTE_ESCALATE_ATTEMPTS+ attempts (or all passed first time); rejections step it up.
+ROUTING = os.environ.get("ROUTING", "1") == "1"
+ROUTE_ORDER = ["Easy", "Medium", "Hard"]
+
+
+def _route_tier(name, models, output_tokens, thinking, candidates):
+    prefix = f"ROUTE_{name.upper()}_"
+    return {
+        "models": [m.strip() for m in os.environ.get(prefix + "MODELS", models).split(",") if m.strip()],
+        "max_output_tokens": int(os.environ.get(prefix + "OUTPUT_TOKENS", str(output_tokens))),
+        "thinking": os.environ.get(prefix + "THINKING", thinking) or None,  # "low", "high" or "" (model default)
+        "candidates": int(os.environ.get(prefix + "CANDIDATES", str(candidates))),
+    }
+
+
+ROUTE_TIERS = {
+    "Easy": _route_tier("Easy", "gemini-2.5-flash,gemini-2.5-pro", 8192, "low", 1),
+    "Medium": _route_tier("Medium", ",".join(GEMINI_MODELS), 32768, "", SPECULATIVE_CANDIDATES),  # The unrouted defaults
+    "Hard": _route_tier("Hard", ",".join(GEMINI_MODELS), 65536, "high", max(2, SPECULATIVE_CANDIDATES)),
+}
+THINKING_BUDGETS = {"low": 1024, "high": 32768}  # thinking_budget for models without thinking levels (pre Gemini 3)
+ROUTE_MIN_SAMPLES = int(os.environ.get("ROUTE_MIN_SAMPLES", "3"))       # Similar runs needed before history counts
+ROUTE_HISTORY_RUNS = int(os.environ.get("ROUTE_HISTORY_RUNS", "30"))    # Most recent similar runs considered
+ROUTE_ESCALATE_ATTEMPTS = float(os.environ.get("ROUTE_ESCALATE_ATTEMPTS", "2"))
+
+# LeetCode langSlugs to generate in; with more than one, each round races them and submits the first to pass
+RACE_LANGUAGES = [l.strip() for l in os.environ.get("RACE_LANGUAGES", "java").split(",") if l.strip()]
+# Seconds an unvalidated non-Java winner waits for Java, which is validated locally, to catch up
+RACE_JAVA_GRACE = float(os.environ.get("RACE_JAVA_GRACE", "30"))
+
+# langSlug -> (name used in prompts, file extension)
+LANGUAGES = {
+    "java": ("Java", "java"),
+    "cpp": ("C++", "cpp"),
+    "c": ("C", "c"),
+    "csharp": ("C#", "cs"),
+    "python3": ("Python3", "py"),
+    "python": ("Python", "py"),
+    "javascript": ("JavaScript", "js"),
+    "typescript": ("TypeScript", "ts"),
+    "golang": ("Go", "go"),
+    "rust": ("Rust", "rs"),
+    "kotlin": ("Kotlin", "kt"),
+    "swift": ("Swift", "swift"),
+    "scala": ("Scala", "scala"),
+}
+HEDGE_DEFAULT_DELAY = float(os.environ.get("HEDGE_DEFAULT_DELAY", "120"))  # Seconds, until enough latencies are known
+HEDGE_MIN_DELAY = float(os.environ.get("HEDGE_MIN_DELAY", "20"))
+HEDGE_MAX_DELAY = float(os.environ.get("HEDGE_MAX_DELAY", "240"))
+HEDGE_MIN_SAMPLES = 5
+HEALTH_WINDOW = 20
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("BREAKER_COOLDOWN", "300"))
+
+# Local pre-validation settings (skipped automatically when no JDK is on PATH)
+LOCAL_VALIDATION = os.environ.get("LOCAL_VALIDATION", "1") == "1"
+LOCAL_RUN_TIMEOUT = int(os.environ.get("LOCAL_RUN_TIMEOUT", "10"))
+LOCAL_RUN_WORKERS = int(os.environ.get("LOCAL_RUN_WORKERS", "4"))  # JVMs running testcases in parallel
+LOCAL_CASES_PER_JVM = 8  # Below this, another JVM's startup costs more than it saves
+STRESS_TEST = os.environ.get("STRESS_TEST", "1") == "1"  # Time candidates on generated inputs up to the constraint maxima
+STRESS_TIME_LIMIT_MS = float(os.environ.get("STRESS_TIME_LIMIT_MS", "1500"))  # Predicted ms for one max-size call
+STRESS_RUN_TIMEOUT = float(os.environ.get("STRESS_RUN_TIMEOUT", "20"))
+STRESS_MAX_ELEMENTS = 2_000_000  # Bigger inputs are extrapolated instead of generated
+# Complexity budget from the constraints: stated in the prompt, and candidates nested deeper are rejected
+COMPLEXITY_BUDGET = os.environ.get("COMPLEXITY_BUDGET", "1") == "1"
+COMPLEXITY_OPS_BUDGET = float(os.environ.get("COMPLEXITY_OPS_BUDGET", "2e8"))  # Simple operations that fit the limit
+COMPLEXITY_DEPTH_SLACK = 1  # Extra loop levels allowed (constant inner loops, binary searches)
+
+# On-disk cache for problem fetches and Gemini responses (persisted between Actions runs)
+CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "1") == "1"
+CACHE_DIR = os.environ.get("CACHE_DIR", ".lc_cache")
+CACHE_MAX_AGE_DAYS = float(os.environ.get("CACHE_MAX_AGE_DAYS", "30"))
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Submission status polling settings
+POLL_INITIAL_INTERVAL = float(os.environ.get("POLL_INITIAL_INTERVAL", "0.25"))  # Seconds before the first check
+POLL_MAX_INTERVAL = float(os.environ.get("POLL_MAX_INTERVAL", "4"))
+POLL_DEADLINE = float(os.environ.get("POLL_DEADLINE", "90"))                    # Overall seconds per submission
+POLL_JITTER = float(os.environ.get("POLL_JITTER", "0.2"))                       # ± fraction of each interval
+POLL_LOG_PATH = os.environ.get("POLL_LOG_PATH", os.path.join(CACHE_DIR, "poll_log.jsonl"))
+RUN_HISTORY_PATH = os.environ.get("RUN_HISTORY_PATH", os.path.join(CACHE_DIR, "run_history.jsonl"))  # Never evicted
+MODEL_HEALTH_PATH = os.environ.get("MODEL_HEALTH_PATH", os.path.join(CACHE_DIR, "model_health.json"))
+JOURNAL_ENABLED = os.environ.get("JOURNAL_ENABLED", "1") == "1"
+JOURNAL_PATH = os.environ.get("JOURNAL_PATH", os.path.join(CACHE_DIR, "journal.jsonl"))  # Today's run only
+POLL_HISTORY_SIZE = 50
+
+# Daemon mode (python daily.py daemon): resident process that fires at the 00:00 UTC rollover
+DAEMON_LEAD_SECONDS = float(os.environ.get("DAEMON_LEAD_SECONDS", "30"))     # Warm up this long before the rollover
+DAEMON_POLL_INTERVAL = float(os.environ.get("DAEMON_POLL_INTERVAL", "2"))    # Seconds between rollover checks
+DAEMON_POLL_TIMEOUT = float(os.environ.get("DAEMON_POLL_TIMEOUT", "900"))    # Give up waiting for the new daily after this
+DAEMON_HEALTH_PATH = os.environ.get("DAEMON_HEALTH_PATH", os.path.join(CACHE_DIR, "daemon_health.json"))
+DAEMON_HEALTH_PORT = int(os.environ.get("DAEMON_HEALTH_PORT", "0"))          # 0 = no HTTP health endpoint
+DAEMON_ENV_FILE = os.environ.get("DAEMON_ENV_FILE", "")                      # KEY=VALUE secrets, reloaded when changed
+SESSION_MAX_AGE_DAYS = 14
+COOKIE_WARN_DAYS = int(os.environ.get("COOKIE_WARN_DAYS", "2"))
+
+# Batch mode / rate limits (token buckets shared by all workers)
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "2"))
+SOLUTION_BANK_DIR = os.environ.get("SOLUTION_BANK_DIR", "solution_bank")
+ARCHIVE_PATH = os.environ.get("ARCHIVE_PATH", os.path.join(SOLUTION_BANK_DIR, "archive.sqlite3"))
+BATCH_PROGRESS_PATH = os.environ.get("BATCH_PROGRESS_PATH", os.path.join(SOLUTION_BANK_DIR, "progress.json"))
+GEMINI_RATE_PER_MIN = float(os.environ.get("GEMINI_RATE_PER_MIN", "10"))
+SUBMIT_RATE_PER_MIN = float(os.environ.get("SUBMIT_RATE_PER_MIN", "6"))
+RATE_BURST = int(os.environ.get("RATE_BURST", "3"))
+FANOUT_RESUBMITS = int(os.environ.get("FANOUT_RESUBMITS", "2"))  # Retries of accepted code to accounts whose submit errored
+
+
+# Import-time regression check (python daily.py --check-import-time)
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "100"))
+HEAVY_MODULES = ["httpx", "google.genai", "bs4", "lxml", "smtplib"]
+
+
+# ---------------------------
+# Configuration (secrets are read on first use, not at import)
+# ---------------------------
+class MissingConfigError(Exception):
+    """Raised when a required environment variable is not set"""
+    pass
+
+
+class Config:
+    """Secrets and endpoints from the environment"""
+
+    def __init__(self, env=None):
+        env = os.environ if env is None else env
+        self.leetcode_session = env.get("LEETCODE_SESSION", "")
+        self.leetcode_csrf = env.get("LEETCODE_CSRF", "")
+        self.gemini_api_key = env.get("GEMINI_API_KEY", "")
+        self.email_user = env.get("EMAIL_USER", "")
+        self.email_pass = env.get("EMAIL_PASS", "")
+        self.email_to = env.get("EMAIL_TO", "")
+        self.smtp_host = env.get("SMTP_HOST", "smtp.gmail.com")
+        self.smtp_port = int(env.get("SMTP_PORT", "587"))
+        self.smtp_starttls = env.get("SMTP_STARTTLS", "1") == "1"  # Disable for plain local SMTP stand-ins
+        self.gh_pat = env.get("GH_PAT", "")
+
+    def require(self, *fields):
+        """Raise MissingConfigError unless all the given fields are set"""
+        missing = [field.upper() for field in fields if not getattr(self, field)]
+        if missing:
+            raise MissingConfigError(f"Missing environment variable(s): {', '.join(missing)}")
+        return self
+
+
+_config = None
+_config_lock = threading.RLock()
+
+
+def get_config():
+    """Build the Config on first use"""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = Config()
+        return _config
 
-# Create session with cookies
-session = requests.Session()
-session.cookies.set('LEETCODE_SESSION', LEETCODE_SESSION, domain='leetcode.com')
-if LEETCODE_CSRF:
-    session.cookies.set('csrftoken', LEETCODE_CSRF, domain='leetcode.com')
 
 # Headers based on working HAR file analysis
-headers = {
+HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
     'Accept': '*/*',
     'Accept-Language': 'en-US,en;q=0.9',
     'Accept-Encoding': 'gzip, deflate',  # No brotli - Python handles gzip automatically
     'Content-Type': 'application/json',
-    'Origin': 'https://leetcode.com',
-    'Referer': 'https://leetcode.com',
+    'Origin': LEETCODE_BASE_URL,
+    'Referer': LEETCODE_BASE_URL,
     'sec-ch-ua': '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
     'sec-ch-ua-mobile': '?0',
     'sec-ch-ua-platform': '"macOS"',
@@ -45,8 +233,113 @@ headers = {
     'sec-fetch-site': 'same-origin',
 }
 
-if LEETCODE_CSRF:
-    headers['x-csrftoken'] = LEETCODE_CSRF
+# ---------------------------
+# LeetCode Transport (asyncio + httpx)
+# ---------------------------
+_loop = None
+_clients = []
+
+
+def get_loop():
+    """Start the shared asyncio event loop on a daemon thread on first use"""
+    global _loop
+    with _config_lock:
+        if _loop is None:
+            import asyncio
+
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="leetcode-io", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run_async(coro):
+    """Run a coroutine on the shared loop from synchronous code and wait for the result
+
+    Any number of threads can do this at once; their requests and status polls
+    overlap on the loop and share the pooled connections.
+    """
+    import asyncio
+
+    run = current_run()
+
+    async def with_run():
+        # Spans recorded by the coroutine belong to the caller's run
+        _run_var.set(run)
+        return await coro
+
+    return asyncio.run_coroutine_threadsafe(with_run(), get_loop()).result()
+
+
+class LeetCodeClient:
+    """One LeetCode account: cookies, CSRF header and a pooled httpx.AsyncClient
+
+    The httpx client is created lazily on the shared loop; coroutines using it
+    must run there (via run_async from synchronous code).
+    """
+
+    def __init__(self, session_cookie, csrf=None, name="default"):
+        self.name = name
+        self.session_cookie = session_cookie
+        self.csrf = csrf
+        self._http = None
+
+    def http(self):
+        if self._http is None:
+            import httpx
+
+            headers = dict(HEADERS)
+            cookies = {"LEETCODE_SESSION": self.session_cookie}
+            if self.csrf:
+                headers["x-csrftoken"] = self.csrf
+                cookies["csrftoken"] = self.csrf
+            self._http = httpx.AsyncClient(
+                base_url=LEETCODE_BASE_URL,
+                headers=headers,
+                cookies=cookies,
+                http2=HTTP2_ENABLED and importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(HTTP_TIMEOUT, connect=10.0),
+            )
+            with _config_lock:
+                _clients.append(self)
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+_client = None
+
+
+def get_client():
+    """The LeetCodeClient for the account configured in the environment"""
+    global _client
+    with _config_lock:
+        if _client is None:
+            config = get_config().require("leetcode_session")
+            _client = LeetCodeClient(config.leetcode_session, config.leetcode_csrf)
+        return _client
+
+
+def close_transport():
+    """Close every pooled connection and stop the event loop"""
+    global _loop
+    if _loop is None:
+        return
+    for client in list(_clients):
+        try:
+            run_async(client.aclose())
+        except Exception:
+            pass
+    _clients.clear()
+    _loop.call_soon_threadsafe(_loop.stop)
+    _loop = None
 
 
 # ---------------------------
@@ -57,44 +350,385 @@ class AuthenticationError(Exception):
     pass
 
 
+class LocalValidationError(Exception):
+    """Raised when no candidate survives local compile/example validation"""
+    def __init__(self, result):
+        super().__init__(result.get("status_msg", "Local validation failed"))
+        self.result = result
+
+
 # ---------------------------
-# 1. Fetch Daily Problem
+# On-disk Cache
 # ---------------------------
-def get_daily_challenge():
-    """Fetch today's LeetCode daily challenge"""
-    url = "https://leetcode.com/graphql"
-    query = {
-        "query": """
-        query questionOfToday {
-          activeDailyCodingChallengeQuestion {
-            date
-            question {
-              questionId
-              questionFrontendId
-              title
-              titleSlug
-              content
-              codeSnippets {
-                lang
-                code
-              }
-              exampleTestcases
-              difficulty
+_cache_lock = threading.Lock()
+cache_stats = {}  # namespace -> {"hits": n, "misses": n}
+
+
+def _cache_path(namespace, key):
+    """Content-addressed file path for a cache entry"""
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, namespace, f"{digest}.json")
+
+
+def _count(namespace, outcome):
+    with _cache_lock:
+        counters = cache_stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+
+def cache_get(namespace, key):
+    """Return the cached value for key, or None on a miss"""
+    if not CACHE_ENABLED:
+        return None
+    path = _cache_path(namespace, key)
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        _count(namespace, "misses")
+        return None
+
+    if time.time() - entry.get("created", 0) > CACHE_MAX_AGE_DAYS * 86400:
+        _count(namespace, "misses")
+        return None
+
+    # Bump mtime so size-based eviction drops least recently used entries first
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    _count(namespace, "hits")
+    return entry["value"]
+
+
+def cache_put(namespace, key, value):
+    """Store value under key (atomically, safe across threads)"""
+    if not CACHE_ENABLED:
+        return
+    path = _cache_path(namespace, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"key": key, "created": time.time(), "value": value}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠ Could not write cache entry: {e}")
+
+
+def cache_delete(namespace, key):
+    """Drop the entry for key, if any"""
+    try:
+        os.remove(_cache_path(namespace, key))
+    except OSError:
+        pass
+
+
+def evict_cache():
+    """Drop expired entries, then least recently used ones until under CACHE_MAX_BYTES"""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    now = time.time()
+    for namespace in os.listdir(CACHE_DIR):
+        folder = os.path.join(CACHE_DIR, namespace)
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > CACHE_MAX_AGE_DAYS * 86400 or name.endswith(".tmp"):
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        os.remove(path)
+        total -= size
+
+
+def report_cache_stats():
+    """Print hit/miss counters for this run"""
+    if not cache_stats:
+        return
+    summary = ", ".join(
+        f"{namespace} {c['hits']} hit / {c['misses']} miss"
+        for namespace, c in sorted(cache_stats.items())
+    )
+    print(f"Cache: {summary}")
+
+
+# ---------------------------
+# Rate Limiting
+# ---------------------------
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_min` tokens a minute, bursts of up to `capacity`"""
+
+    def __init__(self, rate_per_min, capacity):
+        self.rate = rate_per_min / 60.0
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self):
+        """Take a token if one is available; otherwise return the seconds until one is"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available (no-op when the rate is 0 = unlimited)"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waits on the event loop instead of blocking it"""
+        import asyncio
+
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+gemini_limiter = TokenBucket(GEMINI_RATE_PER_MIN, RATE_BURST)
+submit_limiter = TokenBucket(SUBMIT_RATE_PER_MIN, RATE_BURST)
+
+
+# ---------------------------
+# Tracing and Run History
+# ---------------------------
+_trace_local = threading.local()
+_run_var = contextvars.ContextVar("run", default=None)  # Set for coroutines on the shared loop
+_history_lock = threading.Lock()
+
+
+class RunTrace:
+    """Timing spans for one solve, appended to RUN_HISTORY_PATH as a single JSON line on finish()"""
+
+    def __init__(self, kind, **fields):
+        now = datetime.now(timezone.utc)
+        self.run_id = f"{now.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{random.randint(0, 0xffff):04x}"
+        self.kind = kind
+        self.fields = dict(fields)
+        self.started_at = now.isoformat(timespec="seconds")
+        self.started = time.monotonic()
+        self.spans = []
+        self.attempt = None
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def update(self, **fields):
+        with self.lock:
+            self.fields.update(fields)
+
+    def add_span(self, name, seconds, **attrs):
+        entry = {"name": name, "ms": round(seconds * 1000, 1)}
+        if self.attempt is not None:
+            entry["attempt"] = self.attempt
+        entry.update(attrs)
+        with self.lock:
+            if not self.finished:
+                self.spans.append(entry)
+                return
+        # Spans that end after the run was written (background email delivery) get their own line
+        append_history({"type": "span", "run_id": self.run_id, **entry})
+
+    def finish(self, **fields):
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+            self.fields.update(fields)
+            record = {
+                "type": "run",
+                "run_id": self.run_id,
+                "kind": self.kind,
+                "started_at": self.started_at,
+                "duration_ms": round((time.monotonic() - self.started) * 1000, 1),
+                **self.fields,
+                "spans": self.spans,
             }
-          }
-        }
-        """
-    }
+        append_history(record)
 
-    print("Fetching daily challenge from LeetCode...")
-    res = session.post(url, json=query, headers=headers)
+
+def current_run():
+    """The RunTrace the calling thread (or coroutine) is working for, if any"""
+    return _run_var.get() or getattr(_trace_local, "run", None)
+
+
+def start_run(kind, **fields):
+    """Begin tracing a run on this thread"""
+    run = RunTrace(kind, **fields)
+    _trace_local.run = run
+    return run
+
+
+def bind_run(fn):
+    """Wrap fn so it records spans into the caller's run when executed on a pool thread"""
+    run = current_run()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        previous = current_run()
+        _trace_local.run = run
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _trace_local.run = previous
+    return wrapper
+
+
+def record_span(name, seconds, **attrs):
+    run = current_run()
+    if run:
+        run.add_span(name, seconds, **attrs)
+
+
+def traced(stage):
+    """Decorator: record each call as a `stage` span (with the exception name if it raised)"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                record_span(stage, time.monotonic() - started, error=type(e).__name__)
+                raise
+            record_span(stage, time.monotonic() - started)
+            return result
+        return wrapper
+    return decorate
+
+
+def append_history(record):
+    """Append one JSON line to the run history (append-only, never evicted)"""
+    with _history_lock:
+        try:
+            os.makedirs(os.path.dirname(RUN_HISTORY_PATH) or ".", exist_ok=True)
+            with open(RUN_HISTORY_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"⚠ Could not write run history: {e}")
+
+
+def load_history():
+    """Read every run from the history, with late span lines merged back into their run"""
+    runs = {}
+    late = []
+    try:
+        with open(RUN_HISTORY_PATH) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A torn final line from a killed run
+                if record.get("type") == "run":
+                    runs[record["run_id"]] = record
+                elif record.get("type") == "span":
+                    late.append(record)
+    except OSError:
+        return []
+    for record in late:
+        run = runs.get(record.pop("run_id"))
+        if run:
+            record.pop("type")
+            run["spans"].append(record)
+    return list(runs.values())
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def report_stats(days=None, kind=None):
+    """Print p50/p95 per stage across the recorded runs"""
+    runs = load_history()
+    if days:
+        cutoff = datetime.now(timezone.utc).timestamp() - days * 86400
+        runs = [r for r in runs if datetime.fromisoformat(r["started_at"]).timestamp() >= cutoff]
+    if kind:
+        runs = [r for r in runs if r.get("kind") == kind]
+    if not runs:
+        print(f"No runs recorded in {RUN_HISTORY_PATH}")
+        return
+
+    verdicts = {}
+    for run in runs:
+        verdict = run.get("verdict", "Unknown")
+        verdicts[verdict] = verdicts.get(verdict, 0) + 1
+    print(f"Run history: {len(runs)} run(s) from {RUN_HISTORY_PATH}")
+    print("Verdicts: " + ", ".join(f"{v} {n}" for v, n in sorted(verdicts.items())))
+    attempts = [r["attempts"] for r in runs if r.get("attempts")]
+    if attempts:
+        print(f"Attempts per run: p50 {percentile(attempts, 50)}, p95 {percentile(attempts, 95)}")
+    budgets = {}
+    for run in runs:
+        if run.get("complexity_budget"):
+            budgets[run["complexity_budget"]] = budgets.get(run["complexity_budget"], 0) + 1
+    if budgets:
+        print("Complexity budgets: " + ", ".join(f"{b} {n}" for b, n in sorted(budgets.items())))
+    for tier in ROUTE_ORDER:
+        needed = [attempts_to_accept(r) for r in runs if r.get("route") == tier and attempts_to_accept(r)]
+        if needed:
+            print(f"  {tier} route: {len(needed)} run(s), {sum(needed) / len(needed):.1f} attempts to accept on average")
+
+    stages = {}
+    for run in runs:
+        for entry in run.get("spans", []):
+            stages.setdefault(entry["name"], []).append(entry["ms"])
+    stages["run (total)"] = [r["duration_ms"] for r in runs]
+
+    print(f"\n{'stage':<16}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}")
+    for name, values in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        print(f"{name:<16}{len(values):>8}{percentile(values, 50):>12.1f}{percentile(values, 95):>12.1f}")
+
+
+# ---------------------------
+# 1. Fetch Daily Problem
+# ---------------------------
+def graphql(query, variables=None, operation="LeetCode GraphQL request", client=None):
+    """POST a GraphQL query (as the configured account by default), raising AuthenticationError on expired cookies"""
+    return run_async(graphql_async(client or get_client(), query, variables, operation))
+
+
+async def graphql_async(client, query, variables=None, operation="LeetCode GraphQL request"):
+    """POST a GraphQL query with the client's pooled connection"""
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+
+    res = await client.http().post("/graphql", json=payload)
     
     # Check for authentication errors
     if res.status_code in [401, 403]:
         raise AuthenticationError("LeetCode session token or CSRF token has expired. Please update credentials.")
     
     if res.status_code != 200:
-        raise Exception(f"Failed to fetch daily problem: HTTP {res.status_code}")
+        raise Exception(f"{operation} failed: HTTP {res.status_code}")
     
     # Check if response has errors (GraphQL can return 200 but with errors)
     try:
@@ -107,12 +741,35 @@ def get_daily_challenge():
     except (KeyError, IndexError, TypeError):
         pass
     
-    data = res.json()["data"]["activeDailyCodingChallengeQuestion"]
-    q = data["question"]
+    return res.json()["data"]
+
+
+QUESTION_FIELDS = """
+              questionId
+              questionFrontendId
+              title
+              titleSlug
+              content
+              isPaidOnly
+              codeSnippets {
+                lang
+                langSlug
+                code
+              }
+              exampleTestcases
+              metaData
+              difficulty
+              topicTags {
+                slug
+              }
+"""
+
 
+def build_problem(q, date_str=None):
+    """Turn a GraphQL question object into the problem dict used everywhere else"""
     # Extract Java template
     java_template = ""
-    for snip in q["codeSnippets"]:
+    for snip in q.get("codeSnippets") or []:
         if snip["lang"] == "Java":
             java_template = snip["code"]
             break
@@ -122,36 +779,189 @@ def get_daily_challenge():
         'slug': q["titleSlug"],
         'question_id': q["questionId"],
         'frontend_question_id': q["questionFrontendId"],
-        'content': q["content"],
+        'content': q.get("content") or "",
+        'problem_text': html_to_text(q.get("content") or "").strip(),
         'java_template': java_template,
-        'date': data["date"]
+        'snippets': {s["langSlug"]: s["code"] for s in q.get("codeSnippets") or [] if s.get("langSlug")},
+        'example_testcases': q.get("exampleTestcases") or "",
+        'meta_data': q.get("metaData") or "",
+        'paid_only': bool(q.get("isPaidOnly")),
+        'difficulty': q.get("difficulty"),
+        'tags': [t["slug"] for t in q.get("topicTags") or []],
+        'date': date_str
     }
 
 
+@traced("fetch")
+def get_daily_challenge(client=None):
+    """Fetch today's LeetCode daily challenge (served from the cache on re-runs)"""
+    # The daily rolls over at 00:00 UTC, so today's UTC date identifies it
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    cached = cache_get("daily", today)
+    if cached:
+        print("✓ Daily challenge loaded from cache")
+        return cached
+
+    query = """
+        query questionOfToday {
+          activeDailyCodingChallengeQuestion {
+            date
+            question {""" + QUESTION_FIELDS + """            }
+          }
+        }
+        """
+
+    print("Fetching daily challenge from LeetCode...")
+    data = graphql(query, operation="Fetching daily problem", client=client)["activeDailyCodingChallengeQuestion"]
+    problem = build_problem(data["question"], data["date"])
+
+    cache_put("daily", data["date"], problem)
+    cache_put("problem", problem['slug'], problem)
+    return problem
+
+
+@traced("fetch")
+def get_problem(slug):
+    """Fetch any problem by slug (used by batch mode)"""
+    cached = cache_get("problem", slug)
+    if cached:
+        return cached
+
+    query = """
+        query questionData($titleSlug: String!) {
+          question(titleSlug: $titleSlug) {""" + QUESTION_FIELDS + """          }
+        }
+        """
+    print(f"Fetching problem {slug} from LeetCode...")
+    q = graphql(query, {"titleSlug": slug}, operation=f"Fetching {slug}")["question"]
+    if not q:
+        raise Exception(f"Problem not found: {slug}")
+    problem = build_problem(q)
+    cache_put("problem", slug, problem)
+    return problem
+
+
+def list_daily_challenges(year, month):
+    """Map date → slug for every daily challenge in a past month"""
+    query = """
+        query dailyCodingQuestionRecords($year: Int!, $month: Int!) {
+          dailyCodingChallengeV2(year: $year, month: $month) {
+            challenges {
+              date
+              question {
+                titleSlug
+              }
+            }
+          }
+        }
+        """
+    data = graphql(query, {"year": year, "month": month}, operation=f"Listing dailies for {year}-{month:02d}")
+    return {c["date"]: c["question"]["titleSlug"] for c in data["dailyCodingChallengeV2"]["challenges"]}
+
+
+def list_problemset(skip=0, limit=50, page_size=100):
+    """Page through the problemset, returning free problem slugs in order"""
+    query = """
+        query problemsetQuestionList($categorySlug: String, $limit: Int, $skip: Int, $filters: QuestionListFilterInput) {
+          questionList(categorySlug: $categorySlug, limit: $limit, skip: $skip, filters: $filters) {
+            totalNum
+            data {
+              titleSlug
+              isPaidOnly
+            }
+          }
+        }
+        """
+    slugs = []
+    offset = skip
+    while len(slugs) < limit:
+        variables = {"categorySlug": "", "skip": offset, "limit": page_size, "filters": {}}
+        page = graphql(query, variables, operation="Listing problemset")["questionList"]
+        questions = page["data"]
+        if not questions:
+            break
+        slugs.extend(q["titleSlug"] for q in questions if not q["isPaidOnly"])
+        offset += len(questions)
+        if offset >= page["totalNum"]:
+            break
+    return slugs[:limit]
+
+
 # Clean HTML → plain text
+@traced("html_to_text")
 def html_to_text(html):
-    """Convert HTML to plain text"""
+    """Convert HTML to plain text, keeping <sup> exponents as ^"""
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "lxml")
+    # get_text() alone turns 10<sup>5</sup> into "105"
+    for sup in soup.find_all("sup"):
+        sup.replace_with("^" + sup.get_text().strip())
     return soup.get_text()
 
 
 # ---------------------------
 # 2. Gemini Code Generation (Using Gemini 3 Pro Preview or Gemini 2.5 Pro as fallback)
 # ---------------------------
-def generate_code(problem_text, java_template, previous_error=None):
-    """Generate Java code using Gemini AI"""
-    # Set API key as environment variable for the client
-    os.environ['GEMINI_API_KEY'] = GEMINI_API_KEY
-    
-    try:
-        client = genai.Client()
-    except Exception as e:
-        print(f"Error initializing Gemini client: {e}")
-        raise
+_prompt_uses = {}  # prompt cache key -> times requested this run
+_generation_keys = {}  # code_hash -> generation cache key it was served from
+
+
+@traced("generate")
+def generate_code(problem_text, java_template, previous_error=None, improve=None, lang="java", route=None,
+                  budget=None):
+    """Generate code (Java unless another langSlug is given) using Gemini AI
+
+    `route` picks the models and budgets (default: the Medium tier);
+    `budget` is the problem's complexity budget for the prompt.
+    """
+    prefix, suffix = build_prompt(problem_text, java_template, previous_error, improve, lang, budget)
+    route = route or Route("Medium")
+
+    # Identical prompts are asked for several samples (speculative mode, repeated
+    # errors), so the n-th request for a prompt maps to the n-th cached response
+    prompt_key = [prefix + suffix] + route.cache_key()
+    with _cache_lock:
+        digest = hashlib.sha256(json.dumps(prompt_key).encode()).hexdigest()
+        sample = _prompt_uses.get(digest, 0)
+        _prompt_uses[digest] = sample + 1
+    cached = cache_get("generation", prompt_key + [sample])
+    if cached:
+        print(f"✓ Gemini response loaded from cache (sample {sample})")
+        with _cache_lock:
+            _generation_keys[code_hash(cached)] = prompt_key + [sample]
+        return cached
+
+    gemini_limiter.acquire()
 
-    system_prompt = """
+    # The route's first model, hedged with its fallback if slow or failing
+    started = time.monotonic()
+    model_name, code, usage = hedged_generate(prefix, suffix, route)
+
+    mode = "streamed" if GEMINI_STREAMING else "full response"
+    print(f"✓ First usable code from {model_name} after {time.monotonic() - started:.1f}s ({mode})")
+    print(f"  Tokens: {format_usage(usage, prefix + suffix)}")
+
+    cache_put("generation", prompt_key + [sample], code)
+    with _cache_lock:
+        _generation_keys[code_hash(code)] = prompt_key + [sample]
+    return code
+
+
+def forget_generation(code):
+    """Drop a rejected candidate's cached response, so a later process asking the same prompt regenerates"""
+    with _cache_lock:
+        key = _generation_keys.pop(code_hash(code), None)
+    if key:
+        cache_delete("generation", key)
+
+
+# ---------------------------
+# 2a. Prompt Building (token budgets + reusable prefix)
+# ---------------------------
+SYSTEM_PROMPT = """
 You are a competitive programming expert who specializes in writing highly optimized solutions.
-You must return ONLY valid Java code with STRICTLY NO COMMENTS.
+You must return ONLY valid {language} code with STRICTLY NO COMMENTS.
 
 CRITICAL REQUIREMENTS:
 - Give me the MOST OPTIMIZED CODE possible
@@ -160,70 +970,210 @@ CRITICAL REQUIREMENTS:
 - Use efficient data structures (HashMap, TreeSet, PriorityQueue, etc.)
 - Think about edge cases carefully
 - Return clean, efficient, bug-free code
-- Use the given Java template exactly
+- Use the given {language} template exactly
 - NO COMMENTS in the code
 """
 
-    error_feedback = ""
-    if previous_error:
-        error_feedback = f"""
+INSTRUCTIONS = """
+Constraints and Instructions:
+- Strictly no comments. Only valid {language} code.
+- Provide the MOST OPTIMIZED solution with best time complexity.
+- Make sure the code compiles and runs efficiently.
+- Avoid Time Limit Exceeded by using optimal algorithms.
+"""
 
-IMPORTANT - PREVIOUS ATTEMPT FAILED:
-{previous_error}
 
-You MUST fix this error and provide a DIFFERENT, MORE OPTIMIZED approach.
-"""
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) - good enough for budgeting"""
+    return (len(text) + 3) // 4
 
-    final_prompt = f"""
-{system_prompt}
 
-Problem Description:
-{problem_text}
+def cap_tokens(text, budget):
+    """Trim text to roughly `budget` tokens"""
+    if estimate_tokens(text) <= budget:
+        return text
+    return text[:budget * 4].rstrip() + "\n...[truncated]"
 
-Java Boilerplate:
-{java_template}
-{error_feedback}
 
-Constraints and Instructions:
-- Strictly no comments. Only valid Java code.
-- Provide the MOST OPTIMIZED solution with best time complexity.
-- Make sure the code compiles and runs efficiently.
-- Avoid Time Limit Exceeded by using optimal algorithms.
-"""
+def compact_problem_text(problem_text):
+    """Drop redundant example text: explanations after the first example and blank-line runs"""
+    blocks = re.split(r"(?=^[ \t]*Example \d+:)", problem_text, flags=re.MULTILINE)
+    compacted = [blocks[0]]
+    for i, block in enumerate(blocks[1:]):
+        if i > 0:
+            # Input/Output lines already say everything the model needs
+            block = re.sub(
+                r"^[ \t]*Explanation:.*?(?=^[ \t]*(?:Example \d+:|Constraints:|Follow[- ]?up)|\Z)",
+                "\n", block, flags=re.MULTILINE | re.DOTALL
+            )
+        compacted.append(block)
+    text = "".join(compacted).replace("\xa0", " ")
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
 
-    # Use Gemini 3 Pro Preview with proper settings for reasoning models
-    MODEL_NAME = 'gemini-3-pro-preview'
-    
-    config = types.GenerateContentConfig(
+
+def build_prompt(problem_text, java_template, previous_error=None, improve=None, lang="java", budget=None):
+    """Return (prefix, suffix): the prefix is identical across retries, the suffix carries feedback
+
+    `improve` is a brief about an accepted solution to beat (optimize phase).
+    `java_template` is the boilerplate for `lang` (a LeetCode langSlug).
+    `budget` (see complexity_budget) is stated after the instructions.
+    """
+    language = LANGUAGES.get(lang, (lang, lang))[0]
+    sections = {
+        "problem": cap_tokens(compact_problem_text(problem_text), PROMPT_TOKEN_BUDGETS["problem"]),
+        "template": cap_tokens(java_template, PROMPT_TOKEN_BUDGETS["template"]),
+    }
+
+    prefix = f"""
+{SYSTEM_PROMPT.format(language=language)}
+
+Problem Description:
+{sections["problem"]}
+
+{language} Boilerplate:
+{sections["template"]}
+{INSTRUCTIONS.format(language=language)}"""
+    if budget:
+        prefix += "\n" + describe_budget(budget)
+
+    suffix = ""
+    if previous_error:
+        suffix = f"""
+
+IMPORTANT - PREVIOUS ATTEMPT FAILED:
+{cap_tokens(previous_error, PROMPT_TOKEN_BUDGETS["feedback"])}
+
+You MUST fix this error and provide a DIFFERENT, MORE OPTIMIZED approach.
+"""
+    if improve:
+        suffix += f"""
+
+ACCEPTED - NOW MAKE IT FASTER:
+{cap_tokens(improve, PROMPT_TOKEN_BUDGETS["feedback"] + PROMPT_TOKEN_BUDGETS["template"])}
+
+Write a faster solution that is still correct: a better time complexity if one exists,
+otherwise lower constant factors (primitive arrays over collections, no boxing, fewer allocations).
+"""
+    suffix += f"\nReturn only the {language} code.\n"
+    return prefix, suffix
+
+
+_context_caches = {}  # (model, prefix digest) -> cached content name, or None if unavailable
+_context_cache_lock = threading.Lock()
+
+
+def get_context_cache(client, model_name, prefix):
+    """Return a server-side context cache holding the prompt prefix, creating it once per run
+
+    Returns None when caching is disabled or the model/prefix doesn't qualify;
+    callers then send the full prompt, with the unchanged prefix first so the
+    model's implicit prefix caching can still kick in.
+    """
+    if not PROMPT_CONTEXT_CACHE:
+        return None
+    key = (model_name, hashlib.sha256(prefix.encode()).hexdigest())
+    with _context_cache_lock:
+        if key not in _context_caches:
+            from google.genai import types
+
+            try:
+                cache = client.caches.create(
+                    model=model_name,
+                    config=types.CreateCachedContentConfig(contents=[prefix], ttl=CONTEXT_CACHE_TTL),
+                )
+                _context_caches[key] = cache.name
+                print(f"✓ Cached prompt prefix for {model_name} ({estimate_tokens(prefix)} tokens est.)")
+            except Exception as e:
+                print(f"⚠ Context caching unavailable for {model_name}: {str(e)[:200]}")
+                _context_caches[key] = None
+        return _context_caches[key]
+
+
+def release_context_caches():
+    """Delete the server-side caches created by this run"""
+    if not _genai_client:
+        return
+    for name in filter(None, _context_caches.values()):
+        try:
+            _genai_client.caches.delete(name=name)
+        except Exception:
+            pass
+    _context_caches.clear()
+
+
+def usage_dict(usage_metadata):
+    """Pull the token counts we log out of a usage_metadata object"""
+    if not usage_metadata:
+        return {}
+    fields = {
+        "input": "prompt_token_count",
+        "cached": "cached_content_token_count",
+        "output": "candidates_token_count",
+        "thinking": "thoughts_token_count",
+    }
+    return {name: getattr(usage_metadata, attr, None) or 0 for name, attr in fields.items()}
+
+
+def format_usage(usage, prompt):
+    """One-line token usage summary for the log"""
+    if not usage:
+        return f"input ~{estimate_tokens(prompt)} (estimated), output unknown"
+    return (f"input {usage['input']} (cached {usage['cached']}), "
+            f"output {usage['output']}, thinking {usage['thinking']}")
+
+
+_genai_client = None
+
+
+def get_genai_client():
+    """Return the long-lived Gemini client shared by every attempt"""
+    global _genai_client
+    with _config_lock:
+        if _genai_client is None:
+            from google import genai
+
+            _genai_client = genai.Client(api_key=get_config().require("gemini_api_key").gemini_api_key)
+        return _genai_client
+
+
+def thinking_config(model_name, level):
+    """ThinkingConfig for a "low"/"high" level: Gemini 3 takes the level, older models a token budget"""
+    from google.genai import types
+
+    if model_name.startswith("gemini-3"):
+        return types.ThinkingConfig(thinking_level=level)
+    budget = THINKING_BUDGETS[level]
+    if "flash" in model_name:
+        budget = min(budget, 24576)  # Flash's maximum
+    return types.ThinkingConfig(thinking_budget=budget)
+
+
+def request_code(client, model_name, prefix, suffix, cancel=None, route=None):
+    """Run one generation request and return (extracted Java code, token usage)"""
+    from google.genai import types
+
+    config = dict(
         temperature=0.9,  # CRITICAL: High temperature for reasoning models to avoid repetition
-        max_output_tokens=32768,  # Give room for thinking
+        max_output_tokens=route.max_output_tokens if route else 32768,  # Give room for thinking
+    )
+    if route and route.thinking:
+        config["thinking_config"] = thinking_config(model_name, route.thinking)
+    contents = prefix + suffix
+    cache_name = get_context_cache(client, model_name, prefix)
+    if cache_name:
+        # The unchanging prefix is already on the server - only send the feedback
+        config["cached_content"] = cache_name
+        contents = suffix
+    config = types.GenerateContentConfig(**config)
+
+    if GEMINI_STREAMING:
+        return stream_code(client, model_name, contents, config, cancel)
+
+    response = client.models.generate_content(
+        model=model_name,
+        contents=contents,
+        config=config
     )
-    
-    try:
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=final_prompt,
-            config=config
-        )
-    except Exception as model_error:
-        # Check if it's specifically the 503 model overload error
-        error_str = str(model_error)
-        if "503" in error_str and "overloaded" in error_str.lower():
-            print(f"⚠ Gemini 3 Pro is overloaded (503). Falling back to Gemini 2.5 Pro...")
-            # Fallback to Gemini 2.5 Pro
-            MODEL_NAME = "gemini-2.5-pro"
-            config = types.GenerateContentConfig(
-                temperature=0.9,
-                max_output_tokens=32768,
-            )
-            response = client.models.generate_content(
-                model=MODEL_NAME,
-                contents=final_prompt,
-                config=config
-            )
-        else:
-            # Re-raise if it's not the 503 overload error
-            raise
     
     # Extract code from response - prioritize response.text
     code = None
@@ -247,7 +1197,7 @@ Constraints and Instructions:
                             code = candidate.content.parts[0].text.strip()
             
             if not code:
-                print(f"Warning: Empty response from Gemini")
+                print("Warning: Empty response from Gemini")
                 print(f"Finish reason: {finish_reason}")
                 print(f"Has usage_metadata: {hasattr(response, 'usage_metadata')}")
                 if hasattr(response, 'usage_metadata'):
@@ -257,371 +1207,3182 @@ Constraints and Instructions:
     if not code:
         raise Exception("Failed to extract code from Gemini response")
 
-    # Clean up markdown code blocks if present
+    return extract_code(code), usage_dict(getattr(response, 'usage_metadata', None))
+
+
+def stream_code(client, model_name, prompt, config, cancel=None):
+    """Stream a generation and stop reading as soon as a complete Solution block has arrived
+
+    Setting `cancel` (a threading.Event) abandons the stream at the next chunk.
+    """
+    stream = client.models.generate_content_stream(
+        model=model_name,
+        contents=prompt,
+        config=config
+    )
+    text = ""
+    finish_reason = "UNKNOWN"
+    usage = None
+    try:
+        for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled(f"{model_name} request abandoned")
+            # Every chunk carries the running usage totals
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            if chunk.candidates and getattr(chunk.candidates[0], "finish_reason", None):
+                finish_reason = chunk.candidates[0].finish_reason
+            if not chunk.text:
+                continue
+            text += chunk.text
+            code = complete_code_block(text)
+            if code:
+                return code, usage_dict(usage)
+    finally:
+        # Closing the generator releases the HTTP response we stopped reading
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+
+    if not text.strip():
+        print("Warning: Empty response from Gemini")
+        print(f"Finish reason: {finish_reason}")
+        raise Exception(f"Gemini returned empty response - finish_reason: {finish_reason}")
+    return extract_code(text), usage_dict(usage)
+
+
+def complete_code_block(text):
+    """Return the first closed fenced block holding a complete Solution class, if any"""
+    for match in re.finditer(r"```[\w+-]*[ \t]*\n(.*?)```", text, re.DOTALL):
+        block = match.group(1).strip()
+        if "class Solution" in block and "{" in block and block.count("{") == block.count("}"):
+            return block
+    return None
+
+
+def extract_code(text):
+    """Strip markdown code fences from a model response"""
+    code = text.strip()
+
+    # Clean up markdown code blocks if present (```java, ```cpp, ```python3, ...)
     if code.startswith("```"):
         code = code.split("```")[1]
-        if code.startswith("java"):
-            code = code[len("java"):].strip()
+        code = re.sub(r"^[\w+#-]*[ \t]*\n", "", code)
         code = code.strip()
     
     # If there are multiple code blocks, take the one with the solution
     if "```" in code:
         parts = code.split("```")
         for part in reversed(parts):
-            if "class Solution" in part or "public" in part:
-                code = part.strip()
+            if "class Solution" in part or "public" in part or re.search(r"^\s*(?:def|func|fn) ", part, re.M):
+                code = re.sub(r"^[\w+#-]*[ \t]*\n", "", part).strip()
                 break
 
     return code.strip()
 
 
 # ---------------------------
-# 3. Submit to LeetCode (Using Working Approach)
+# 2d. Model Backends, Hedging and Circuit Breakers
 # ---------------------------
-def submit_solution(slug, question_id, code):
-    """Submit solution to LeetCode using the working direct endpoint"""
-    url = f'https://leetcode.com/problems/{slug}/submit/'
-    
-    # Update referer for this specific problem
-    submit_headers = headers.copy()
-    submit_headers['Referer'] = f'https://leetcode.com/problems/{slug}/description/'
-    
-    # Exact payload format from HAR file
-    payload = {
-        "lang": "java",
-        "question_id": question_id,
-        "typed_code": code
-    }
-    
-    print(f"Submitting to: {url}")
-    response = session.post(url, json=payload, headers=submit_headers)
-    
-    # Check for authentication errors
-    if response.status_code in [401, 403]:
-        raise AuthenticationError("LeetCode session token or CSRF token has expired. Please update credentials.")
-    
-    if response.status_code != 200:
-        raise Exception(f"Submission failed: HTTP {response.status_code} - {response.text[:500]}")
-    
-    data = response.json()
-    
-    # Check if response indicates authentication error
-    if "error" in data:
-        error_msg = str(data.get("error", ""))
-        if "not authenticated" in error_msg.lower() or "login" in error_msg.lower():
-            raise AuthenticationError("LeetCode session token or CSRF token has expired. Please update credentials.")
-    
-    submission_id = data.get('submission_id')
-    
-    if not submission_id:
-        raise Exception(f"No submission_id in response: {data}")
-    
-    print(f"✓ Submission ID: {submission_id}")
-    return submission_id
+class RequestCancelled(Exception):
+    """Raised inside a losing hedged request once another model has answered"""
+    pass
 
 
-# Poll submission result
-def check_status(submission_id):
-    """Check submission status until complete"""
-    url = f'https://leetcode.com/submissions/detail/{submission_id}/check/'
-    
-    print(f"Checking submission status...")
-    max_attempts = 30
-    
-    for attempt in range(1, max_attempts + 1):
-        try:
-            response = session.get(url, headers=headers)
-            
-            if response.status_code != 200:
-                print(f"  Attempt {attempt}: HTTP {response.status_code}")
-                time.sleep(2)
-                continue
-            
-            data = response.json()
-            state = data.get('state', 'UNKNOWN')
-            
-            if state == 'SUCCESS':
-                return data
-            elif state in ['PENDING', 'STARTED']:
-                print(f"  Attempt {attempt}: {state}...")
-                time.sleep(2)
-            else:
-                print(f"  Attempt {attempt}: Unknown state {state}")
-                time.sleep(2)
-                
-        except Exception as e:
-            print(f"  Attempt {attempt}: Exception - {e}")
-            time.sleep(2)
-    
-    raise Exception(f"Timeout after {max_attempts} attempts")
+class GenaiBackend:
+    """The real Gemini API"""
 
+    def generate(self, model_name, prefix, suffix, cancel=None, route=None):
+        return request_code(get_genai_client(), model_name, prefix, suffix, cancel, route)
 
-# ---------------------------
-# 4. Save solution to JavaYatra repo
-# ---------------------------
-def save_solution(date_str, title, code, frontend_question_id):
-    """Save accepted solution to JavaYatra repository organized by month"""
-    import subprocess
-    
-    # Parse date to get month and day
-    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-    month = date_obj.strftime("%b")  # e.g., "Dec"
-    day = date_obj.strftime("%d")     # e.g., "01", "10"
-    
-    # GitHub repo details
-    REPO_URL = "https://github.com/techSaswata/JavaYatra.git"
-    REPO_DIR = "JavaYatra"
-    BASE_PATH = "leetcode_daily"
-    
-    # Get GitHub token
-    GH_PAT = os.environ.get("GH_PAT", "")
-    
-    # Clone or update repo
-    if not os.path.exists(REPO_DIR):
-        print(f"Cloning JavaYatra repository...")
-        if GH_PAT:
-            auth_url = REPO_URL.replace("https://", f"https://{GH_PAT}@")
-            subprocess.run(["git", "clone", auth_url, REPO_DIR], check=True)
+
+class FakeModelBackend:
+    """Offline stand-in for Gemini with configurable per-model latency and failure rate
+
+    Returns the problem's template (taken from the prompt) with a random marker
+    field so every candidate is distinct. Configure with FAKE_MODEL_LATENCY and
+    FAKE_MODEL_FAILURE_RATE, either a single number or "model=value,...".
+    """
+
+    def __init__(self, latency=None, failure_rate=None):
+        self.latency = parse_model_values(latency if latency is not None else os.environ.get("FAKE_MODEL_LATENCY", "1.0"))
+        self.failure_rate = parse_model_values(
+            failure_rate if failure_rate is not None else os.environ.get("FAKE_MODEL_FAILURE_RATE", "0")
+        )
+
+    def generate(self, model_name, prefix, suffix, cancel=None, route=None):
+        mean = self.latency.get(model_name, self.latency.get("*", 1.0))
+        deadline = time.monotonic() + random.uniform(0.5 * mean, 1.5 * mean)
+        while time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled(f"{model_name} request abandoned")
+            time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+
+        if random.random() < self.failure_rate.get(model_name, self.failure_rate.get("*", 0.0)):
+            raise Exception(f"503 UNAVAILABLE: The model is overloaded (fake {model_name})")
+
+        match = re.search(r"\S+ Boilerplate:\n(.*?)\nConstraints and Instructions:", prefix, re.DOTALL)
+        template = match.group(1).strip() if match else "class Solution {\n}"
+        # Capitalized so the candidate fingerprint (which renames locals) still tells samples apart
+        variant = random.randint(1, 10 ** 9)
+        marker = f"\n    static final int VARIANT_{variant} = 0;"
+        code = re.sub(r"(class Solution[^{]*\{)", lambda m: m.group(1) + marker, template, count=1)
+        if code == template:
+            # Brace-less languages (Python): a trailing assignment works as the marker
+            code = f"{template}\n\nVARIANT_{variant} = 0"
+        usage = {"input": estimate_tokens(prefix + suffix), "cached": 0, "output": estimate_tokens(code), "thinking": 0}
+        return code, usage
+
+
+def parse_model_values(spec):
+    """Parse "1.5" or "model-a=2,model-b=0.5" into {model or '*': float}"""
+    values = {}
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            name, value = part.split("=", 1)
+            values[name.strip()] = float(value)
         else:
-            subprocess.run(["git", "clone", REPO_URL, REPO_DIR], check=True)
-    else:
-        print(f"Updating JavaYatra repository...")
-        subprocess.run(["git", "-C", REPO_DIR, "pull"], check=True)
-    
-    # Create month folder if it doesn't exist
-    month_folder = os.path.join(REPO_DIR, BASE_PATH, month)
-    os.makedirs(month_folder, exist_ok=True)
-    
-    # Save file as MonthDay.java (e.g., Dec01.java, Dec10.java)
-    filename = f"{month}{day}.java"
-    filepath = os.path.join(month_folder, filename)
-    
-    with open(filepath, "w") as f:
-        f.write(code)
-    
-    print(f"✓ Saved solution as: {BASE_PATH}/{month}/{filename}")
-    
-    # Commit and push
+            values["*"] = float(part)
+    return values
+
+
+_backend = None
+
+
+def get_backend():
+    """The generation backend selected by GEMINI_BACKEND (genai or fake)"""
+    global _backend
+    with _config_lock:
+        if _backend is None:
+            _backend = FakeModelBackend() if GEMINI_BACKEND == "fake" else GenaiBackend()
+        return _backend
+
+
+class ModelHealth:
+    """Recent successful latencies plus a circuit breaker for one model"""
+
+    def __init__(self, name, latencies=None):
+        self.name = name
+        self.latencies = deque(latencies or [], maxlen=HEALTH_WINDOW)
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def p95(self):
+        with self.lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def hedge_delay(self):
+        """How long to wait for this model before hedging with the next one"""
+        p95 = self.p95()
+        if p95 is None:
+            return HEDGE_DEFAULT_DELAY
+        return min(max(p95, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    def available(self):
+        """Breaker closed, or open long enough to allow a half-open trial request"""
+        with self.lock:
+            return self.opened_at is None or time.monotonic() - self.opened_at >= BREAKER_COOLDOWN
+
+    def record_success(self, latency):
+        with self.lock:
+            self.latencies.append(round(latency, 3))
+            self.failures = 0
+            self.opened_at = None
+        save_model_health()
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= BREAKER_FAILURES:
+                if self.opened_at is None:
+                    print(f"⚡ Circuit open for {self.name} after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+
+
+_model_health = {}
+_health_lock = threading.Lock()
+
+
+def model_health(name):
+    """Health tracker for a model, seeded with latencies saved by earlier runs"""
+    with _health_lock:
+        if not _model_health:
+            try:
+                with open(MODEL_HEALTH_PATH) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                saved = {}
+            for model, latencies in saved.items():
+                _model_health[model] = ModelHealth(model, latencies)
+        if name not in _model_health:
+            _model_health[name] = ModelHealth(name)
+        return _model_health[name]
+
+
+def save_model_health():
+    """Persist recent latencies so the hedge threshold is learned across runs"""
+    with _health_lock:
+        snapshot = {name: list(health.latencies) for name, health in _model_health.items()}
     try:
-        # Configure git user
-        subprocess.run(["git", "-C", REPO_DIR, "config", "user.name", "techSaswata"], check=True)
-        subprocess.run(["git", "-C", REPO_DIR, "config", "user.email", "saswata.24bcs10248@sst.scaler.com"], check=True)
-        
-        # Add, commit, and push
-        subprocess.run(["git", "-C", REPO_DIR, "add", "."], check=True)
-        subprocess.run([
-            "git", "-C", REPO_DIR, "commit", "-m",
-            f"lc {frontend_question_id}"
-        ], check=True)
-        subprocess.run(["git", "-C", REPO_DIR, "push"], check=True)
-        print(f"✓ Pushed to JavaYatra repository")
-    except subprocess.CalledProcessError as e:
-        print(f"⚠ Git operation failed: {e}")
-        # Don't raise - email notification will still work
-    
-    return f"{BASE_PATH}/{month}/{filename}"
+        os.makedirs(os.path.dirname(MODEL_HEALTH_PATH) or ".", exist_ok=True)
+        tmp_path = f"{MODEL_HEALTH_PATH}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, MODEL_HEALTH_PATH)
+    except OSError:
+        pass
 
 
-# ---------------------------
-# 5. Email Notification
-# ---------------------------
-def send_email(subject, body):
-    """Send email notification"""
+_hedge_executor = None
+
+
+def hedged_generate(prefix, suffix, route=None):
+    """Ask the first healthy model; if it is slower than its p95 or fails, race the next one
+
+    Models come from the route (default GEMINI_MODELS). Returns
+    (model_name, code, usage) from whichever usable answer arrives first.
+    """
+    global _hedge_executor
+    with _health_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+    backend = get_backend()
+    candidates = route.models if route else GEMINI_MODELS
+    models = [m for m in candidates if model_health(m).available()]
+    if not models:
+        # Every breaker is open - trial the one that has been open longest
+        models = [min(candidates, key=lambda m: model_health(m).opened_at)]
+
+    cancel = threading.Event()
+    in_flight = {}  # future -> (model, started)
+    last_error = None
+
+    def launch():
+        model = models.pop(0)
+        future = _hedge_executor.submit(backend.generate, model, prefix, suffix, cancel, route)
+        in_flight[future] = (model, time.monotonic())
+
+    launch()
     try:
-        msg = MIMEMultipart()
-        msg["From"] = EMAIL_USER
-        msg["To"] = EMAIL_TO
-        msg["Subject"] = subject
+        while in_flight:
+            timeout = None
+            if models:
+                latest_model, latest_start = max(in_flight.values(), key=lambda v: v[1])
+                delay = model_health(latest_model).hedge_delay()
+                timeout = max(0.0, delay - (time.monotonic() - latest_start))
 
-        msg.attach(MIMEText(body, "plain"))
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"⏱ {latest_model} slower than {delay:.0f}s, hedging with {models[0]}...")
+                launch()
+                continue
 
-        server = smtplib.SMTP(SMTP_HOST, int(SMTP_PORT))
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASS)
-        server.sendmail(EMAIL_USER, EMAIL_TO, msg.as_string())
-        server.quit()
-        print("✓ Email sent successfully!")
-    except Exception as e:
-        print(f"✗ Failed to send email: {e}")
+            for future in done:
+                model, started = in_flight.pop(future)
+                try:
+                    code, usage = future.result()
+                except MissingConfigError:
+                    raise
+                except Exception as e:
+                    print(f"⚠ {model} failed: {str(e)[:200]}")
+                    record_span("model", time.monotonic() - started, model=model, error=type(e).__name__)
+                    model_health(model).record_failure()
+                    last_error = e
+                    if models and not in_flight:
+                        print(f"  Falling back to {models[0]}...")
+                        launch()
+                    continue
+                model_health(model).record_success(time.monotonic() - started)
+                record_span("model", time.monotonic() - started, model=model, **usage)
+                return model, code, usage
+
+        raise last_error or Exception("No model available")
+    finally:
+        # Losing requests stop at their next streamed chunk
+        cancel.set()
 
 
 # ---------------------------
-# MAIN FLOW WITH RETRY
+# 2f. Difficulty-Aware Routing
 # ---------------------------
-def main():
-    print("=" * 70)
-    print("LEETCODE DAILY AUTO SOLVER")
-    print("=" * 70)
-    
-    try:
-        # Step 1: Fetch daily challenge
-        print("\n[1/5] Fetching daily challenge...")
-        problem = get_daily_challenge()
-        
-        print(f"✓ Problem: {problem['title']}")
-        print(f"✓ Slug: {problem['slug']}")
-        print(f"✓ Question ID: {problem['question_id']}")
-        print(f"✓ Date: {problem['date']}")
+class Route:
+    """One routing tier: model order, output/thinking budget and candidates per round"""
 
-        problem_text = html_to_text(problem['content']).strip()
+    def __init__(self, tier, reason=""):
+        settings = ROUTE_TIERS[tier]
+        self.tier = tier
+        self.models = settings["models"]
+        self.max_output_tokens = settings["max_output_tokens"]
+        self.thinking = settings["thinking"]
+        self.candidates = max(1, settings["candidates"])
+        self.reason = reason
 
-    except AuthenticationError as auth_err:
-        # Handle authentication errors immediately without trying Gemini
-        print(f"\n{'='*70}")
-        print(f"AUTHENTICATION ERROR")
-        print(f"{'='*70}")
-        print(f"✗ {auth_err}")
-        
-        send_email(
-            "✗ LeetCode Daily FAILED: Session Token or CSRF Expired",
-            f"Authentication Error: Session token or CSRF token has expired.\n\n"
-            f"Error Details:\n{auth_err}\n\n"
-            f"Please update your LEETCODE_SESSION and LEETCODE_CSRF secrets in GitHub Actions.\n\n"
-            f"Steps to fix:\n"
-            f"1. Log into LeetCode in your browser\n"
-            f"2. Open Developer Tools > Application > Cookies\n"
-            f"3. Copy the new LEETCODE_SESSION and csrftoken values\n"
-            f"4. Update the secrets in GitHub repository settings\n\n"
-            f"Date: {datetime.now().strftime('%Y-%m-%d')}"
-        )
-        return
+    def escalated(self):
+        """The next heavier tier (this one when it is already the heaviest)"""
+        index = ROUTE_ORDER.index(self.tier)
+        if index + 1 >= len(ROUTE_ORDER):
+            return self
+        return Route(ROUTE_ORDER[index + 1], f"escalated from {self.tier} after a rejection")
 
-    # Step 2: Generate and submit with retries
-    max_attempts = 5
-    attempts = 0
-    previous_error = None  # Track previous error for feedback to Gemini
+    def cache_key(self):
+        # Medium's key matches the pre-routing one, so cached responses stay valid
+        return [self.models, 0.9, self.max_output_tokens] + ([self.thinking] if self.thinking else [])
 
-    while attempts < max_attempts:
-        attempts += 1
-        print(f"\n{'='*70}")
-        print(f"ATTEMPT {attempts}/{max_attempts}")
-        print(f"{'='*70}")
+    def describe(self):
+        return (f"{self.tier} tier ({self.reason}): {', '.join(self.models)}, "
+                f"thinking {self.thinking or 'default'}, {self.max_output_tokens} output tokens, "
+                f"{self.candidates} candidate(s) per round")
 
-        try:
-            # Generate code (with feedback from previous attempt)
-            print(f"\n[2/5] Generating code using Gemini 3 Pro Preview (reasoning model)...")
-            code = generate_code(problem_text, problem['java_template'], previous_error)
-            print(f"✓ Code generated ({len(code)} chars)")
-            
-            # Submit
-            print(f"\n[3/5] Submitting to LeetCode...")
-            submission_id = submit_solution(problem['slug'], problem['question_id'], code)
-            
-            # Check status
-            print(f"\n[4/5] Checking submission status...")
-            result = check_status(submission_id)
 
-            status = result.get("status_msg", "Unknown")
-            runtime = result.get("status_runtime", "N/A")
-            memory = result.get("status_memory", "N/A")
-            
-            print(f"\n{'='*70}")
-            print(f"RESULT: {status}")
-            print(f"{'='*70}")
-            print(f"Runtime: {runtime}")
-            print(f"Memory: {memory}")
-            if 'total_testcases' in result:
-                print(f"Test Cases: {result.get('total_correct', 0)}/{result.get('total_testcases', 0)}")
-            print(f"{'='*70}")
+def attempts_to_accept(run):
+    """Submissions a recorded run needed; a failed run counts as one more than it spent"""
+    if run.get("verdict") == "Accepted":
+        return run.get("attempts") or 1
+    if run.get("verdict") == "Failed":
+        return (run.get("attempts") or MAX_ATTEMPTS) + 1
+    return None  # Dry runs, auth errors, ...
 
-            if status == "Accepted":
-                # Save solution
-                print(f"\n[5/5] ✓ ACCEPTED! Saving solution...")
-                filename = save_solution(problem['date'], problem['title'], code, problem['frontend_question_id'])
-                
-                # Send success email
-                send_email(
-                    f"✓ LeetCode Daily Accepted: {problem['title']}",
-                    f"Your solution for {problem['title']} ({problem['slug']}) was Accepted!\n\n"
-                    f"Runtime: {runtime}\n"
-                    f"Memory: {memory}\n"
-                    f"Saved as: {filename}\n"
-                    f"Submission ID: {submission_id}\n\n"
-                    f"Date: {problem['date']}"
-                )
-                
-                print("\n" + "🎉" * 35)
-                print("SUCCESS! Task completed.")
-                print("🎉" * 35)
-                return
-            else:
-                # Build error feedback for next attempt
-                print(f"\n✗ {status}")
-                error_details = f"Status: {status}"
-                
-                if 'full_runtime_error' in result and result['full_runtime_error']:
-                    runtime_error = result['full_runtime_error'][:500]
-                    print(f"Runtime Error: {runtime_error}")
-                    error_details += f"\nRuntime Error: {runtime_error}"
-                
-                if 'full_compile_error' in result and result['full_compile_error']:
-                    compile_error = result['full_compile_error'][:500]
-                    print(f"Compile Error: {compile_error}")
-                    error_details += f"\nCompile Error: {compile_error}"
-                
-                if status == "Time Limit Exceeded":
-                    test_cases = result.get('total_testcases', '?')
-                    passed = result.get('total_correct', 0)
-                    error_details += f"\nTime Limit Exceeded after {passed}/{test_cases} test cases"
-                    error_details += "\nYou need a MORE EFFICIENT algorithm with better time complexity!"
-                
-                if status == "Wrong Answer":
-                    if 'last_testcase' in result:
-                        error_details += f"\nFailed on test case: {result['last_testcase'][:200]}"
-                    if 'code_output' in result and 'expected_output' in result:
-                        error_details += f"\nYour output: {result.get('code_output', '')[:100]}"
-                        error_details += f"\nExpected: {result.get('expected_output', '')[:100]}"
-                
-                # Store error for next attempt
-                previous_error = error_details
-                
-                print(f"\nWill regenerate code with error feedback...")
-                print(f"Retrying in 10 seconds...")
-                time.sleep(10)
-                
-        except AuthenticationError as auth_err:
-            # Authentication error during submission - stop immediately
-            print(f"\n{'='*70}")
-            print(f"AUTHENTICATION ERROR")
-            print(f"{'='*70}")
-            print(f"✗ {auth_err}")
-            
-            send_email(
-                "✗ LeetCode Daily FAILED: Session Token or CSRF Expired",
-                f"Authentication Error: Session token or CSRF token has expired.\n\n"
-                f"Error Details:\n{auth_err}\n\n"
-                f"Problem: {problem['title']} ({problem['slug']})\n"
-                f"Date: {problem['date']}\n\n"
-                f"Please update your LEETCODE_SESSION and LEETCODE_CSRF secrets in GitHub Actions.\n\n"
-                f"Steps to fix:\n"
-                f"1. Log into LeetCode in your browser\n"
-                f"2. Open Developer Tools > Application > Cookies\n"
-                f"3. Copy the new LEETCODE_SESSION and csrftoken values\n"
-                f"4. Update the secrets in GitHub repository settings"
-            )
-            return
-                
-        except Exception as e:
-            print(f"\n✗ Submission Error: {e}")
-            import traceback
-            traceback.print_exc()
-            
-            # Store submission error for next attempt
-            previous_error = f"Submission failed with error: {str(e)}"
-            
-            if attempts < max_attempts:
-                print(f"\nWill regenerate code to fix submission error...")
-                print(f"\nRetrying in 10 seconds...")
-                time.sleep(10)
 
-    # All attempts failed
-    print(f"\n{'='*70}")
-    print(f"FAILED - All {max_attempts} attempts exhausted")
-    print(f"{'='*70}")
-    
-    # Build failure email with last error details
+def choose_route(problem, history=None):
+    """Pick the starting tier from the problem's difficulty and how similar problems went
+
+    Similar means the same difficulty and, when enough of them exist, a
+    shared topic tag. With ROUTE_MIN_SAMPLES such runs, an average of
+    ROUTE_ESCALATE_ATTEMPTS or more moves one tier up, and all of them being
+    accepted first time moves one tier down.
+    """
+    difficulty = problem.get("difficulty")
+    if not ROUTING or difficulty not in ROUTE_ORDER:
+        return Route("Medium", "routing off" if not ROUTING else "difficulty unknown")
+
+    history = load_history() if history is None else history
+    solved = [r for r in history if r.get("difficulty") == difficulty and attempts_to_accept(r)]
+    tags = set(problem.get("tags") or [])
+    similar = [r for r in solved if tags & set(r.get("tags") or [])]
+    if len(similar) < ROUTE_MIN_SAMPLES:
+        similar = solved
+    similar = similar[-ROUTE_HISTORY_RUNS:]
+    if len(similar) < ROUTE_MIN_SAMPLES:
+        return Route(difficulty, f"{difficulty} problem")
+
+    mean = sum(attempts_to_accept(r) for r in similar) / len(similar)
+    index = ROUTE_ORDER.index(difficulty)
+    if mean >= ROUTE_ESCALATE_ATTEMPTS:
+        index = min(index + 1, len(ROUTE_ORDER) - 1)
+    elif mean <= 1:
+        index = max(index - 1, 0)
+    return Route(ROUTE_ORDER[index], f"{difficulty} problem, similar ones took {mean:.1f} attempt(s) over {len(similar)} run(s)")
+
+
+# ---------------------------
+# 2b. Speculative Candidate Generation
+# ---------------------------
+def loop_nesting_depth(code, skip_constant=False):
+    """Return the deepest nesting of braced for/while/do loops in Java code
+
+    With skip_constant, for loops whose bounds are all literals or constants
+    (`d < 4`, `c <= 'z'`, `: DIRS`) don't count as a level.
+    """
+    # Arrays with literal contents or sizes ({{0, 1}, ...}, new int[26]) are constant too
+    constants = set(re.findall(r"([A-Za-z_$][\w$]*)\s*=\s*(?:new\s+[\w<>\[\]]+\s*)?\{", code))
+    constants |= set(re.findall(r"([A-Za-z_$][\w$]*)\s*=\s*new\s+\w+\s*(?:\[\s*\d+\s*\])+", code))
+    stack = []
+    pending_loop = False
+    parens = 0
+    depth = 0
+    for match in re.finditer(r"\b(?:for|while|do)\b|[{}();]", code):
+        token = match.group()
+        if token in ("for", "while", "do"):
+            pending_loop = not (skip_constant and token == "for" and _constant_loop(code, match.end(), constants))
+        elif token == "(":
+            parens += 1
+        elif token == ")":
+            parens = max(0, parens - 1)
+        elif token == "{":
+            stack.append(pending_loop)
+            pending_loop = False
+            depth = max(depth, sum(stack))
+        elif token == "}":
+            if stack:
+                stack.pop()
+        elif token == ";" and pending_loop and not parens:
+            # Brace-less loop body (or do-while tail) - does not open a block
+            pending_loop = False
+    return depth
+
+
+def _constant_loop(code, start, constants):
+    """Whether the for header after `start` only involves literals, constants and its own variable"""
+    opened = code.find("(", start)
+    if opened < 0 or code[start:opened].strip():
+        return False
+    level = 0
+    for end in range(opened, len(code)):
+        level += {"(": 1, ")": -1}.get(code[end], 0)
+        if level == 0:
+            break
+    header = re.sub(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])+'", "0", code[opened + 1:end])
+    parts = header.split(";")
+    if len(parts) == 3:
+        init, condition = parts[0], parts[1]
+        if not condition.strip():
+            return False  # for (;;) runs until a break
+        own = set(re.findall(r"([A-Za-z_$][\w$]*)\s*=(?!=)", init))
+        checked = init + " " + condition
+    elif ":" in header:
+        own, checked = set(), header.split(":", 1)[1]
+    else:
+        return False
+    # Members (.length) go with their owner; capitalized names are classes or constants
+    names = re.findall(r"(?<![\w.$])([A-Za-z_$][\w$]*)", checked)
+    return all(name in JAVA_KEYWORDS or name in own or name in constants or name[0].isupper() for name in names)
+
+
+# Candidate fingerprints: the model often "changes approach" by renaming variables
+# or reordering helpers, which costs a whole submit/poll cycle to find out
+JAVA_KEYWORDS = frozenset("""
+    abstract boolean break byte case catch char class continue default do double else enum extends
+    final finally float for if implements import instanceof int interface long new null package
+    private protected public return short static super switch this throw throws true false try var
+    void while
+""".split())
+_JAVA_TOKEN = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:\\.|[^"\\])*")
+  | (?P<char>'(?:\\.|[^'\\])+')
+  | (?P<number>\d[\w.]*)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<op>\S)
+""", re.S | re.X)
+MINHASH_PERMUTATIONS = 128
+SHINGLE_SIZE = 5
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_SEEDS = [(random.Random(i).randrange(1, _MINHASH_PRIME), random.Random(-i).randrange(_MINHASH_PRIME))
+                  for i in range(MINHASH_PERMUTATIONS)]
+# A near-identical resubmission can fix these, so near (not exact) copies of such candidates are allowed
+FIXABLE_VERDICTS = {"Wrong Answer", "Runtime Error", "Compile Error"}
+
+
+def normalized_java_tokens(code):
+    """Java tokens with names, literals and member order normalized away
+
+    Locals, parameters and the candidate's own methods become v0, v1, ...
+    (numbered per member, so reordering methods changes nothing); keywords,
+    type names and names after "." (library calls, .length) are kept.
+    Literals other than 0/1 collapse to their kind, and the class members
+    are sorted.
+    """
+    code = re.sub(r"^\s*(?:import|package)\b[^;]*;", "", code, flags=re.M)
+    raw = []
+    for match in _JAVA_TOKEN.finditer(code):
+        kind = match.lastgroup
+        if kind != "comment":
+            raw.append((kind, match.group()))
+
+    # Split into top-level declarations and class members, by brace depth
+    members, current, depth = [], [], 0
+    for kind, text in raw:
+        current.append((kind, text))
+        if text == "{":
+            depth += 1
+        elif text == "}":
+            depth -= 1
+        if depth <= 1 and text in (";", "}") or depth == 1 and text == "{":
+            members.append(current)
+            current = []
+    if current:
+        members.append(current)
+
+    normalized = []
+    for member in members:
+        names = {}
+        tokens = []
+        for i, (kind, text) in enumerate(member):
+            if kind == "name" and text not in JAVA_KEYWORDS and not text[0].isupper() \
+                    and not (i and member[i - 1][1] == "."):
+                text = names.setdefault(text, f"v{len(names)}")
+            elif kind == "number" and text not in ("0", "1"):
+                text = "NUM"
+            elif kind in ("string", "char"):
+                text = kind.upper()
+            tokens.append(text)
+        normalized.append(" ".join(tokens))
+    return " ".join(sorted(normalized)).split()
+
+
+def minhash_signature(tokens):
+    """MinHash over the token shingles, for estimating Jaccard similarity between candidates"""
+    shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))}
+    values = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(min((a * v + b) % _MINHASH_PRIME for v in values) for a, b in _MINHASH_SEEDS)
+
+
+def minhash_similarity(first, second):
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class CandidateLedger:
+    """Fingerprint and MinHash signature of every candidate seen for one problem
+
+    With a slug, verdicts are also kept in the archive's candidates table,
+    so a later process (a re-dispatched day, a retried batch item) skips
+    the duplicates too.
+    """
+
+    def __init__(self, slug=None):
+        self.slug = slug
+        self.entries = {}  # fingerprint -> {"signature", "verdict"}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(code):
+        tokens = normalized_java_tokens(code)
+        return hashlib.sha256(" ".join(tokens).encode()).hexdigest(), tokens
+
+    def admit(self, code):
+        """Record a new candidate, or return its similarity (0-1) to an earlier one it duplicates
+
+        Normalized-identical code is always a duplicate; a near-duplicate
+        (MinHash similarity >= NEAR_DUPLICATE_THRESHOLD) only when the
+        earlier candidate is unjudged, accepted or failed in a way a small
+        edit can't fix (e.g. Time Limit Exceeded).
+        """
+        fingerprint, tokens = self.fingerprint(code)
+        signature = minhash_signature(tokens)
+        with self._lock:
+            if fingerprint in self.entries:
+                return 1.0
+            for entry in self.entries.values():
+                if entry["verdict"] in FIXABLE_VERDICTS:
+                    continue
+                similarity = minhash_similarity(signature, entry["signature"])
+                if similarity >= NEAR_DUPLICATE_THRESHOLD:
+                    return similarity
+            self.entries[fingerprint] = {"signature": signature, "verdict": None}
+        return None
+
+    def mark(self, code, verdict):
+        """Attach the judge's (or local validation's) verdict to an admitted candidate"""
+        if verdict != "Accepted":
+            forget_generation(code)
+        fingerprint, _ = self.fingerprint(code)
+        with self._lock:
+            entry = self.entries.get(fingerprint)
+            if entry:
+                entry["verdict"] = verdict
+        if entry and verdict and self.slug:
+            record_candidate_verdict(self.slug, fingerprint, entry["signature"], verdict)
+
+    def seed(self, code, verdict=None):
+        """Record a candidate from an earlier run, keeping any verdict it already has here"""
+        fingerprint, tokens = self.fingerprint(code)
+        self.seed_fingerprint(fingerprint, minhash_signature(tokens), verdict)
+
+    def seed_fingerprint(self, fingerprint, signature, verdict=None):
+        """seed() for a candidate known only by its archived fingerprint and signature"""
+        with self._lock:
+            entry = self.entries.setdefault(fingerprint, {"signature": signature, "verdict": None})
+            entry["verdict"] = verdict or entry["verdict"]
+
+
+_ledgers = {}
+_ledgers_lock = threading.Lock()
+
+
+def candidate_ledger(slug):
+    """The ledger of candidates seen for a problem, seeded from the archive on first use"""
+    with _ledgers_lock:
+        if slug not in _ledgers:
+            ledger = CandidateLedger(slug)
+            for fingerprint, signature, verdict in load_candidate_verdicts(slug):
+                ledger.seed_fingerprint(fingerprint, signature, verdict)
+            for code in load_archived_codes(slug):
+                ledger.seed(code, "Accepted")
+            _ledgers[slug] = ledger
+        return _ledgers[slug]
+
+
+def rank_candidate(code, java_template):
+    """Score a generated candidate, or return None if it is clearly unusable"""
+    if not code or "```" in code:
+        return None
+    if code.count("{") != code.count("}"):
+        return None
+    if "class Solution" in java_template and "class Solution" not in code:
+        return None
+
+    # Every method declared in the template must still be there
+    for method in re.findall(r"\b(\w+)\s*\([^)]*\)\s*\{", java_template):
+        if method not in code:
+            return None
+
+    # Prefer shallower loop nesting, then shorter code
+    return (-loop_nesting_depth(code), -len(code))
+
+
+def generate_candidates(problem_text, java_template, previous_error=None, count=1, workers=None, validator=None,
+                        improve=None, ledger=None, lang="java", route=None, budget=None):
+    """Generate candidates concurrently and return the usable ones, best first
+
+    Returns as soon as the first candidate passes screening (and the optional
+    validator); candidates that finished alongside it are kept as backups and
+    the rest are cancelled. With a CandidateLedger, duplicates of earlier
+    candidates are dropped before they reach the validator. With a complexity
+    budget, candidates whose loops nest deeper than it suggests rank last.
+    """
+    workers = max(1, min(workers or count, count))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [
+        executor.submit(bind_run(generate_code), problem_text, java_template, previous_error, improve, lang, route,
+                        budget)
+        for _ in range(count)
+    ]
+
+    ranked = []
+    last_error = None
+    last_failure = None
+    seen = set()
+
+    def collect(future):
+        nonlocal last_error, last_failure
+        seen.add(future)
+        try:
+            code = future.result()
+        except Exception as e:
+            print(f"  ✗ Candidate generation failed: {e}")
+            last_error = e
+            return
+        score = rank_candidate(code, java_template)
+        if score is None:
+            print(f"  ✗ Candidate rejected by screening ({len(code)} chars)")
+            forget_generation(code)
+            last_error = Exception("Generated code failed screening (missing Solution class/method or unbalanced braces)")
+            return
+        similarity = ledger.admit(code) if ledger else None
+        if similarity is not None:
+            print(f"  ✗ Candidate duplicates an earlier one (similarity {similarity:.2f})")
+            forget_generation(code)
+            last_failure = {"status_msg": "Duplicate Candidate", "similarity": similarity}
+            return
+        # Nesting alone can't prove a loop nest too slow (amortized scans), so it only ranks and advises
+        over = exceeds_budget(code, budget)
+        if over:
+            print(f"  ⚠ Candidate nests loops {over['loop_depth']} deep, more than the {over['budget']} budget suggests")
+        if validator:
+            failure = validator(code)
+            if failure:
+                print(f"  ✗ Candidate rejected locally: {failure.get('status_msg')}")
+                last_failure = dict(failure, **(over or {}))
+                if ledger:
+                    ledger.mark(code, failure.get("status_msg"))
+                return
+        ranked.append(((over is None,) + score, code))
+
+    try:
+        for future in as_completed(futures):
+            collect(future)
+            if ranked:
+                # Pick up anything else that already finished, then stop waiting
+                for other in futures:
+                    if other not in seen and other.done() and not other.cancelled():
+                        collect(other)
+                break
+    finally:
+        # Not-yet-started requests are cancelled; in-flight ones are abandoned
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not ranked:
+        if last_failure:
+            raise LocalValidationError(last_failure)
+        raise last_error or Exception("No usable candidate generated")
+
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    print(f"✓ {len(ranked)} usable candidate(s) out of {count} requested")
+    return [code for _, code in ranked]
+
+
+def race_candidates(problem, problem_text, languages, previous_error=None, count=1, improve=None, ledger=None,
+                    route=None, budget=None):
+    """Generate in several languages at once and return [(lang, code)], the first language to pass first
+
+    Each language runs its own generate_candidates round (Java is also
+    validated locally); languages without a LeetCode snippet are skipped.
+    When another language wins while Java is still being generated or
+    validated, Java gets RACE_JAVA_GRACE seconds to pass and go first.
+    Languages still generating after that are abandoned like the losing
+    samples within a round.
+    """
+    templates = dict(problem.get("snippets") or {}, java=problem['java_template'])
+    languages = [lang for lang in languages if templates.get(lang)]
+    executor = ThreadPoolExecutor(max_workers=max(1, len(languages)))
+    futures = {
+        executor.submit(
+            bind_run(generate_candidates), problem_text, templates[lang], previous_error,
+            count=count, workers=SPECULATIVE_WORKERS, improve=improve, ledger=ledger, lang=lang, route=route,
+            budget=budget, validator=(lambda candidate: validate_locally(problem, candidate)) if lang == "java" else None,
+        ): lang
+        for lang in languages
+    }
+
+    winners = []
+    last_error = None
+    try:
+        for future in as_completed(futures):
+            try:
+                winners += [(futures[future], code) for code in future.result()]
+            except Exception as e:
+                print(f"  ✗ {LANGUAGES.get(futures[future], (futures[future],))[0]}: {e}")
+                if last_error is None or isinstance(e, LocalValidationError):
+                    last_error = e
+                continue
+            # Only Java is checked before it reaches the judge, so a quicker unvalidated language waits for it
+            java = next((other for other, lang in futures.items() if lang == "java"), None)
+            validated = java and LOCAL_VALIDATION and shutil.which("javac") and shutil.which("java")
+            if futures[future] != "java" and validated and not java.done() and RACE_JAVA_GRACE > 0:
+                print(f"  ⏳ {LANGUAGES.get(futures[future], (futures[future],))[0]} passed screening first - "
+                      f"giving Java up to {RACE_JAVA_GRACE:.0f}s to pass validation")
+                wait([java], timeout=RACE_JAVA_GRACE)
+            # Keep languages that finished alongside the winner as backups, then stop waiting
+            for other in futures:
+                if other is not future and other.done() and not other.cancelled() and not other.exception():
+                    winners += [(futures[other], code) for code in other.result()]
+            # Locally validated Java goes ahead of candidates only the judge will check
+            if validated:
+                winners.sort(key=lambda winner: winner[0] != "java")
+            break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not winners:
+        raise last_error or Exception("No usable candidate generated")
+    print(f"✓ {LANGUAGES.get(winners[0][0], (winners[0][0],))[0]} goes first")
+    return winners
+
+
+# ---------------------------
+# 2c. Local Pre-Validation (JDK compile + example testcases)
+# ---------------------------
+JAVA_PREAMBLE = """import java.util.*;
+import java.util.function.*;
+import java.util.stream.*;
+import java.math.*;
+"""
+
+# LeetCode provides these for linked list / tree problems
+JAVA_NODE_CLASSES = {
+    "ListNode": """
+class ListNode {
+    int val;
+    ListNode next;
+    ListNode() {}
+    ListNode(int val) { this.val = val; }
+    ListNode(int val, ListNode next) { this.val = val; this.next = next; }
+}
+""",
+    "TreeNode": """
+class TreeNode {
+    int val;
+    TreeNode left;
+    TreeNode right;
+    TreeNode() {}
+    TreeNode(int val) { this.val = val; }
+    TreeNode(int val, TreeNode left, TreeNode right) { this.val = val; this.left = left; this.right = right; }
+}
+""",
+}
+
+# metaData parameter type -> Java declaration and converter in the harness
+JAVA_ARG_TYPES = {
+    "integer": ("int", "toInt"),
+    "long": ("long", "toLong"),
+    "double": ("double", "toDouble"),
+    "boolean": ("boolean", "toBool"),
+    "string": ("String", "toStr"),
+    "character": ("char", "toChar"),
+    "integer[]": ("int[]", "toIntArray"),
+    "integer[][]": ("int[][]", "toIntMatrix"),
+    "long[]": ("long[]", "toLongArray"),
+    "double[]": ("double[]", "toDoubleArray"),
+    "boolean[]": ("boolean[]", "toBoolArray"),
+    "character[]": ("char[]", "toCharArray"),
+    "character[][]": ("char[][]", "toCharMatrix"),
+    "string[]": ("String[]", "toStrArray"),
+    "string[][]": ("String[][]", "toStrMatrix"),
+    "list<integer>": ("List<Integer>", "toIntList"),
+    "list<list<integer>>": ("List<List<Integer>>", "toIntListList"),
+    "list<string>": ("List<String>", "toStrList"),
+    "list<list<string>>": ("List<List<String>>", "toStrListList"),
+}
+
+RESULT_MARKER = "@@RESULT@@ "
+TIME_MARKER = "@@TIME@@ "
+
+JAVA_HARNESS = r"""
+import java.io.*;
+
+public class Main {
+    static final class Raw {
+        final String text;
+        Raw(String text) { this.text = text; }
+    }
+
+    static String src;
+    static int pos;
+
+    static Object parse(String s) {
+        src = s.trim();
+        pos = 0;
+        return value();
+    }
+
+    static void skip() {
+        while (pos < src.length() && Character.isWhitespace(src.charAt(pos))) pos++;
+    }
+
+    static Object value() {
+        skip();
+        char c = src.charAt(pos);
+        if (c == '[') {
+            pos++;
+            List<Object> list = new ArrayList<>();
+            skip();
+            if (src.charAt(pos) == ']') {
+                pos++;
+                return list;
+            }
+            while (true) {
+                list.add(value());
+                skip();
+                if (src.charAt(pos++) == ']') return list;
+            }
+        }
+        if (c == '"') {
+            pos++;
+            StringBuilder sb = new StringBuilder();
+            while (src.charAt(pos) != '"') {
+                char d = src.charAt(pos++);
+                if (d == '\\') {
+                    char e = src.charAt(pos++);
+                    if (e == 'n') sb.append('\n');
+                    else if (e == 't') sb.append('\t');
+                    else if (e == 'u') {
+                        sb.append((char) Integer.parseInt(src.substring(pos, pos + 4), 16));
+                        pos += 4;
+                    } else sb.append(e);
+                } else sb.append(d);
+            }
+            pos++;
+            return sb.toString();
+        }
+        int start = pos;
+        while (pos < src.length() && src.charAt(pos) != ',' && src.charAt(pos) != ']' && !Character.isWhitespace(src.charAt(pos))) pos++;
+        String token = src.substring(start, pos);
+        return token.equals("null") ? null : new Raw(token);
+    }
+
+    @SuppressWarnings("unchecked")
+    static List<Object> list(Object v) { return (List<Object>) v; }
+    static String text(Object v) { return v instanceof Raw ? ((Raw) v).text : (String) v; }
+
+    static int toInt(Object v) { return Integer.parseInt(text(v)); }
+    static long toLong(Object v) { return Long.parseLong(text(v)); }
+    static double toDouble(Object v) { return Double.parseDouble(text(v)); }
+    static boolean toBool(Object v) { return Boolean.parseBoolean(text(v)); }
+    static String toStr(Object v) { return text(v); }
+    static char toChar(Object v) { return text(v).charAt(0); }
+
+    static int[] toIntArray(Object v) {
+        List<Object> l = list(v);
+        int[] r = new int[l.size()];
+        for (int i = 0; i < r.length; i++) r[i] = toInt(l.get(i));
+        return r;
+    }
+
+    static int[][] toIntMatrix(Object v) {
+        List<Object> l = list(v);
+        int[][] r = new int[l.size()][];
+        for (int i = 0; i < r.length; i++) r[i] = toIntArray(l.get(i));
+        return r;
+    }
+
+    static long[] toLongArray(Object v) {
+        List<Object> l = list(v);
+        long[] r = new long[l.size()];
+        for (int i = 0; i < r.length; i++) r[i] = toLong(l.get(i));
+        return r;
+    }
+
+    static double[] toDoubleArray(Object v) {
+        List<Object> l = list(v);
+        double[] r = new double[l.size()];
+        for (int i = 0; i < r.length; i++) r[i] = toDouble(l.get(i));
+        return r;
+    }
+
+    static boolean[] toBoolArray(Object v) {
+        List<Object> l = list(v);
+        boolean[] r = new boolean[l.size()];
+        for (int i = 0; i < r.length; i++) r[i] = toBool(l.get(i));
+        return r;
+    }
+
+    static char[] toCharArray(Object v) {
+        List<Object> l = list(v);
+        char[] r = new char[l.size()];
+        for (int i = 0; i < r.length; i++) r[i] = toChar(l.get(i));
+        return r;
+    }
+
+    static char[][] toCharMatrix(Object v) {
+        List<Object> l = list(v);
+        char[][] r = new char[l.size()][];
+        for (int i = 0; i < r.length; i++) r[i] = toCharArray(l.get(i));
+        return r;
+    }
+
+    static String[] toStrArray(Object v) {
+        List<Object> l = list(v);
+        String[] r = new String[l.size()];
+        for (int i = 0; i < r.length; i++) r[i] = toStr(l.get(i));
+        return r;
+    }
+
+    static String[][] toStrMatrix(Object v) {
+        List<Object> l = list(v);
+        String[][] r = new String[l.size()][];
+        for (int i = 0; i < r.length; i++) r[i] = toStrArray(l.get(i));
+        return r;
+    }
+
+    static List<Integer> toIntList(Object v) {
+        List<Integer> r = new ArrayList<>();
+        for (Object o : list(v)) r.add(toInt(o));
+        return r;
+    }
+
+    static List<List<Integer>> toIntListList(Object v) {
+        List<List<Integer>> r = new ArrayList<>();
+        for (Object o : list(v)) r.add(toIntList(o));
+        return r;
+    }
+
+    static List<String> toStrList(Object v) {
+        List<String> r = new ArrayList<>();
+        for (Object o : list(v)) r.add(toStr(o));
+        return r;
+    }
+
+    static List<List<String>> toStrListList(Object v) {
+        List<List<String>> r = new ArrayList<>();
+        for (Object o : list(v)) r.add(toStrList(o));
+        return r;
+    }
+
+    static String quote(String s) {
+        StringBuilder sb = new StringBuilder("\"");
+        for (char c : s.toCharArray()) {
+            if (c == '"' || c == '\\') sb.append('\\');
+            sb.append(c);
+        }
+        return sb.append('"').toString();
+    }
+
+    static String ser(Object o) {
+        if (o == null) return "null";
+        if (o instanceof String) return quote((String) o);
+        if (o instanceof Character) return quote(String.valueOf(o));
+        if (o instanceof Double || o instanceof Float) return String.format(Locale.ROOT, "%.5f", ((Number) o).doubleValue());
+        StringJoiner j = new StringJoiner(",", "[", "]");
+        if (o instanceof int[]) { for (int x : (int[]) o) j.add(String.valueOf(x)); return j.toString(); }
+        if (o instanceof long[]) { for (long x : (long[]) o) j.add(String.valueOf(x)); return j.toString(); }
+        if (o instanceof double[]) { for (double x : (double[]) o) j.add(ser(x)); return j.toString(); }
+        if (o instanceof boolean[]) { for (boolean x : (boolean[]) o) j.add(String.valueOf(x)); return j.toString(); }
+        if (o instanceof char[]) { for (char x : (char[]) o) j.add(ser(x)); return j.toString(); }
+        if (o instanceof Object[]) { for (Object x : (Object[]) o) j.add(ser(x)); return j.toString(); }
+        if (o instanceof Collection) { for (Object x : (Collection<?>) o) j.add(ser(x)); return j.toString(); }
+        return String.valueOf(o);
+    }
+
+    public static void main(String[] args) throws Exception {
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in));
+        List<String> lines = new ArrayList<>();
+        for (String line = in.readLine(); line != null; line = in.readLine()) {
+            if (!line.trim().isEmpty()) lines.add(line);
+        }
+        for (int base = 0; base + __ARGC__ <= lines.size(); base += __ARGC__) {
+            Solution sol = new Solution();
+__CALL__
+        }
+    }
+}
+"""
+
+
+def _load_meta(meta_data):
+    """Parse the metaData JSON string returned by GraphQL"""
+    try:
+        return json.loads(meta_data) if isinstance(meta_data, str) else (meta_data or {})
+    except ValueError:
+        return {}
+
+
+def harness_arg_count(meta_data):
+    """Number of input lines per testcase for a problem"""
+    return max(1, len(_load_meta(meta_data).get("params", [])))
+
+
+def build_java_harness(meta_data):
+    """Build the Main.java harness for a problem's metaData, or None if unsupported"""
+    meta = _load_meta(meta_data)
+    if not meta or meta.get("systemdesign") or "name" not in meta:
+        return None
+
+    params = meta.get("params", [])
+    lines = []
+    names = []
+    for i, param in enumerate(params):
+        arg_type = JAVA_ARG_TYPES.get(param.get("type"))
+        if not arg_type:
+            return None
+        java_type, converter = arg_type
+        lines.append(f"            {java_type} a{i} = {converter}(parse(lines.get(base + {i})));")
+        names.append(f"a{i}")
+
+    call = f"sol.{meta['name']}({', '.join(names)})"
+    return_type = meta.get("return", {}).get("type", "void")
+    # Only the call itself is timed (for the stress test), not parsing or printing
+    lines.append("            long started = System.nanoTime();")
+    if return_type == "void":
+        param_index = meta.get("output", {}).get("paramindex")
+        if param_index is None:
+            return None
+        lines.append(f"            {call};")
+        lines.append(f"            Object out = a{param_index};")
+    else:
+        lines.append(f"            Object out = {call};")
+    lines.append("            long elapsed = System.nanoTime() - started;")
+    lines.append(f"            System.out.println(\"{RESULT_MARKER}\" + ser(out));")
+    lines.append(f"            System.out.println(\"{TIME_MARKER}\" + elapsed);")
+
+    harness = JAVA_HARNESS.replace("__ARGC__", str(harness_arg_count(meta)))
+    return JAVA_PREAMBLE + harness.replace("__CALL__", "\n".join(lines))
+
+
+def extract_example_outputs(problem_text):
+    """Pull the 'Output:' values of each example out of the problem text"""
+    return [m.strip() for m in re.findall(r"^\s*Output:?\s*(.+?)\s*$", problem_text, re.MULTILINE)]
+
+
+def _canonical_output(text, any_order=False):
+    """Parse judge-style output for comparison (JSON when possible)"""
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return re.sub(r"\s+", "", text)
+
+    def normalize(v):
+        if isinstance(v, list):
+            items = [normalize(x) for x in v]
+            return sorted(items, key=json.dumps) if any_order else items
+        if isinstance(v, float):
+            return round(v, 5)
+        return v
+
+    return normalize(value)
+
+
+def outputs_match(actual, expected, any_order=False):
+    """Compare a harness output line with the expected example output"""
+    return _canonical_output(actual, any_order) == _canonical_output(expected, any_order)
+
+
+@traced("validate")
+def validate_locally(problem, code):
+    """Compile the candidate with a local JDK and run it on the examples and past failing testcases
+
+    Returns None when the candidate passes (or validation is unavailable),
+    otherwise a check_status-style result dict describing the failure.
+    """
+    if not LOCAL_VALIDATION:
+        return None
+    javac = shutil.which("javac")
+    java = shutil.which("java")
+    if not javac or not java:
+        return None
+
+    # The candidate's own imports must stay ahead of the injected node classes
+    import_pattern = re.compile(r"^[ \t]*import\s+(?:static\s+)?[\w.]+(?:\.\*)?\s*;[ \t]*$", re.M)
+    imports = import_pattern.findall(code)
+    body = import_pattern.sub("", code)
+    # The template's commented-out ListNode/TreeNode definition doesn't count as one
+    uncommented = re.sub(r"//[^\n]*|/\*.*?\*/", "", body, flags=re.S)
+
+    source = JAVA_PREAMBLE + "".join(line.strip() + "\n" for line in imports)
+    for name, definition in JAVA_NODE_CLASSES.items():
+        if re.search(rf"\b{name}\b", uncommented) and not re.search(rf"class\s+{name}\b", uncommented):
+            source += definition
+    source += "\n" + body + "\n"
+
+    harness = build_java_harness(problem.get("meta_data"))
+
+    with tempfile.TemporaryDirectory(prefix="lc_validate_") as workdir:
+        with open(os.path.join(workdir, "Solution.java"), "w") as f:
+            f.write(source)
+        files = ["Solution.java"]
+        if harness:
+            with open(os.path.join(workdir, "Main.java"), "w") as f:
+                f.write(harness)
+            files.append("Main.java")
+
+        try:
+            compiled = subprocess.run(
+                [javac, "-nowarn", "-d", workdir] + files,
+                cwd=workdir, capture_output=True, text=True, timeout=120
+            )
+        except subprocess.TimeoutExpired:
+            return None
+        if compiled.returncode != 0:
+            # Only errors inside the candidate are the model's fault
+            errors = compiled.stdout + compiled.stderr
+            if "Solution.java" not in errors:
+                print("  ⚠ Harness failed to compile, skipping example check")
+                return None
+            return {"status_msg": "Compile Error", "full_compile_error": errors.strip()}
+
+        if not harness:
+            return None
+
+        cases = testcases_for(problem)
+        if not cases:
+            return None
+        any_order = "any order" in (problem.get("problem_text") or html_to_text(problem.get("content", ""))).lower()
+
+        # Contiguous chunks, one JVM each, so a big corpus doesn't serialize behind one process
+        size = max(LOCAL_CASES_PER_JVM, -(-len(cases) // max(1, LOCAL_RUN_WORKERS)))
+        chunks = [cases[i:i + size] for i in range(0, len(cases), size)]
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            runs = list(pool.map(lambda chunk: run_testcases(java, workdir, chunk), chunks))
+
+        failure = check_testcase_runs(chunks, runs, any_order)
+        if failure or not STRESS_TEST:
+            return failure
+        return stress_test(problem, java, workdir)
+
+
+def check_testcase_runs(chunks, runs, any_order=False):
+    """First failure across the chunked runs as a check_status-style dict, or None"""
+    total = sum(len(chunk) for chunk in chunks)
+    passed = 0
+    for chunk, (outputs, failure) in zip(chunks, runs):
+        for (case, wanted, from_corpus), actual in zip(chunk, outputs):
+            if wanted is not None and not outputs_match(actual, wanted, any_order):
+                if from_corpus:
+                    print("  ✗ Regressed on a testcase the judge failed before")
+                return {
+                    "status_msg": "Wrong Answer",
+                    "last_testcase": case,
+                    "code_output": actual,
+                    "expected_output": wanted,
+                    "total_testcases": total,
+                    "total_correct": passed,
+                }
+            passed += 1
+        if failure:
+            failed_case = chunk[len(outputs)][0] if len(outputs) < len(chunk) else ""
+            return dict(failure, last_testcase=failed_case, total_testcases=total, total_correct=passed)
+    return None
+
+
+def testcases_for(problem):
+    """Examples (with expected outputs when they line up) plus the judge's failing-case corpus
+
+    Returns [(input, expected or None, from_corpus)].
+    """
+    argc = harness_arg_count(problem["meta_data"])
+    lines = [line for line in (problem.get("example_testcases") or "").splitlines() if line.strip()]
+    examples = ["\n".join(lines[i:i + argc]) for i in range(0, len(lines) - argc + 1, argc)]
+
+    problem_text = problem.get("problem_text") or html_to_text(problem.get("content", ""))
+    expected = extract_example_outputs(problem_text)
+    if len(expected) != len(examples):
+        # Can't line examples up with their outputs - just check they run
+        expected = [None] * len(examples)
+
+    cases = [(case, wanted, False) for case, wanted in zip(examples, expected)]
+    seen = set(examples)
+    for case, wanted in load_failing_cases(problem["slug"]):
+        if case not in seen and len(case.splitlines()) == argc:
+            cases.append((case, wanted, True))
+            seen.add(case)
+    return cases
+
+
+def run_testcases(java, workdir, cases):
+    """Run the compiled harness over some cases in one JVM
+
+    Returns (outputs, failure) where failure is None or a partial
+    check_status-style dict for a crash or timeout.
+    """
+    stdin = "\n".join(case for case, _, _ in cases) + "\n"
+    try:
+        run = subprocess.run(
+            [java, "-cp", workdir, "Main"],
+            input=stdin, cwd=workdir, capture_output=True, text=True,
+            timeout=LOCAL_RUN_TIMEOUT
+        )
+    except subprocess.TimeoutExpired as e:
+        partial = e.stdout.decode() if isinstance(e.stdout, bytes) else (e.stdout or "")
+        outputs = [line[len(RESULT_MARKER):] for line in partial.splitlines() if line.startswith(RESULT_MARKER)]
+        return outputs, {"status_msg": "Time Limit Exceeded"}
+
+    outputs = [line[len(RESULT_MARKER):] for line in run.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+    if run.returncode != 0:
+        return outputs, {"status_msg": "Runtime Error", "full_runtime_error": run.stderr.strip()[-1000:]}
+    return outputs, None
+
+
+# ---------------------------
+# 2e. Stress Test (predict TLE from the constraints)
+# ---------------------------
+STRESS_FRACTIONS = (1 / 64, 1 / 16, 1 / 4, 1)  # Input sizes timed, as fractions of the largest one
+_BOUND_OPS = {ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b, ast.Mult: lambda a, b: a * b}
+_SEQUENCE_TYPES = {"integer[]", "long[]", "double[]", "boolean[]", "character[]", "string",
+                   "string[]", "list<integer>", "list<string>"}
+_MATRIX_TYPES = {"integer[][]", "character[][]", "list<list<integer>>"}
+
+
+def constraints_text(content_html):
+    """The Constraints section of a problem statement, with <sup> exponents kept as ^"""
+    # One constraint per line even when the HTML has no whitespace between the <li>s
+    html = re.sub(r"(</li>|</p>|<br\s*/?>)", r"\1\n", content_html or "", flags=re.I)
+    text = html_to_text(html)
+    match = re.search(r"Constraints:?(.*?)(?:Follow[- ]?up|\Z)", text, re.S | re.I)
+    return match.group(1) if match else ""
+
+
+def parse_bound(expr):
+    """Evaluate a bound like '2 * 10^4', '-2^31' or '10,000', None if it isn't a plain number"""
+    expr = re.sub(r"(?<=\d),(?=\d{3})", "", expr.strip()).replace("^", "**").replace("×", "*")
+
+    def value(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -value(node.operand)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            base, exponent = value(node.left), value(node.right)
+            if abs(exponent) > 64:
+                raise ValueError(expr)
+            return base ** exponent
+        if isinstance(node, ast.BinOp) and type(node.op) in _BOUND_OPS:
+            return _BOUND_OPS[type(node.op)](value(node.left), value(node.right))
+        raise ValueError(expr)
+
+    try:
+        return value(ast.parse(expr, mode="eval").body)
+    except (SyntaxError, ValueError, TypeError):
+        return None
+
+
+def _constraint_key(name):
+    """Normalize 'grid[0].length' / 'words[ i ]' style names to one spelling"""
+    name = re.sub(r"\s+", "", name)
+    return re.sub(r"\[[a-z0-9]+\]", "[i]", name)
+
+
+def parse_constraints(text):
+    """Bounds from a Constraints section: {key: (lo, hi)}
+
+    Keys are normalized names like "nums.length", "nums[i]", "grid[i].length"
+    or "k". A bound that refers to another quantity ("k <= nums.length") is
+    kept as its key string and resolved when inputs are generated. In a chain
+    ("1 <= k <= nums.length <= 10^5") every name is bounded by the next term
+    and by the chain's lower bound.
+    """
+    text = text.replace("≤", "<=").replace("≥", ">=").replace("&lt;", "<")
+    bounds = {}
+    aliases = {}
+    for line in re.split(r"\n|;", text):
+        line = line.strip().rstrip(".")
+        alias = re.fullmatch(r"([\w.\[\] ]+?)\s*==\s*([\w.\[\] ]+)", line)
+        if alias:
+            # Either way round: "m == grid.length" or "nums1.length == m"
+            name, key = alias.groups()
+            if not re.fullmatch(r"[A-Za-z_]\w*", name):
+                name, key = key, name
+            if re.fullmatch(r"[A-Za-z_]\w*", name):
+                aliases[name] = _constraint_key(key)
+            continue
+        terms = re.split(r"\s*(<=?)\s*", line)
+        if len(terms) < 5:
+            continue
+        lo = parse_bound(terms[0])
+        if lo is None:
+            continue
+        lo = lo + 1 if terms[1] == "<" and isinstance(lo, int) else lo
+        for i in range(2, len(terms) - 2, 2):
+            names, hi_op, hi_text = terms[i], terms[i + 1], terms[i + 2]
+            if not re.fullmatch(r"[A-Za-z_][\w.\[\], ]*", names):
+                continue
+            hi = parse_bound(hi_text)
+            if hi is None:
+                hi = _constraint_key(hi_text)
+            else:
+                hi = hi - 1 if hi_op == "<" and isinstance(hi, int) else hi
+            for name in names.split(","):
+                if name.strip():
+                    bounds[_constraint_key(name)] = (lo, hi)
+
+    # "m == grid.length" + "1 <= m, n <= 200" bounds the grid itself
+    for alias, key in aliases.items():
+        if alias in bounds:
+            bounds.setdefault(key, bounds[alias])
+        elif key in bounds:
+            bounds[alias] = bounds[key]
+    return bounds
+
+
+def _charset(text, name):
+    """Characters a string parameter is drawn from, going by the constraint wording"""
+    lines = [line.lower() for line in text.splitlines() if re.search(rf"\b{re.escape(name)}\b", line)]
+    wording = " ".join(lines) or text.lower()
+    if re.search(r"'0'.*'1'|binary", wording):
+        return "01"
+    if "digit" in wording and "letter" not in wording:
+        return "0123456789"
+    if "'('" in wording and "')'" in wording:
+        return "()"
+    letters = ""
+    if "lowercase" in wording or "uppercase" not in wording:
+        letters += "abcdefghijklmnopqrstuvwxyz"
+    if "uppercase" in wording:
+        letters += "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    if "digit" in wording:
+        letters += "0123456789"
+    return letters
+
+
+def stress_input(meta, bounds, text, fraction, rng, sizes_only=False):
+    """One generated testcase with inputs at `fraction` of their maximum sizes
+
+    Returns (input text, element count); the input is None when sizes_only is
+    set or a parameter type can't be generated.
+    """
+    sizes = {}
+
+    def bound(key, default):
+        lo, hi = bounds.get(key, default)
+        if isinstance(hi, str):
+            hi = sizes.get(hi, default[1])
+        return lo, max(lo, hi)
+
+    def scaled(key, default, share=1.0):
+        lo, hi = bound(key, default)
+        return max(int(lo), int(hi * share))
+
+    plan = []
+    elements = 0
+    for param in meta.get("params", []):
+        name, kind = param.get("name", ""), param.get("type")
+        if kind in ("integer", "long"):
+            lo, hi = bound(name, (1, 100))
+            if lo >= 0 and isinstance(hi, int) and hi >= 1000:
+                # Big non-negative scalars are sizes ("n", "k"), so they scale too
+                value = max(lo, int(hi * fraction))
+            else:
+                value = rng.randint(int(lo), int(hi))
+            sizes[name] = value
+            plan.append((name, kind, value))
+            elements += 1
+        elif kind in _SEQUENCE_TYPES:
+            length = scaled(f"{name}.length", (1, 1000), fraction)
+            sizes[f"{name}.length"] = length
+            width = scaled(f"{name}[i].length", (1, 10)) if kind in ("string[]", "list<string>") else 1
+            plan.append((name, kind, (length, width)))
+            elements += length * width
+        elif kind in _MATRIX_TYPES:
+            share = math.sqrt(fraction)
+            rows = scaled(f"{name}.length", (1, 100), share)
+            cols = scaled(f"{name}[i].length", (1, 100), share)
+            sizes[f"{name}.length"], sizes[f"{name}[i].length"] = rows, cols
+            plan.append((name, kind, (rows, cols)))
+            elements += rows * cols
+        elif kind in ("double", "boolean", "character"):
+            plan.append((name, kind, None))
+            elements += 1
+        else:
+            return None, 0
+
+    if sizes_only or elements > STRESS_MAX_ELEMENTS:
+        return None, elements
+
+    def number(key, kind):
+        lo, hi = bound(key, (0, 10 ** 5))
+        if kind == "double" or isinstance(lo, float) or isinstance(hi, float):
+            return round(rng.uniform(lo, hi), 5)
+        return rng.randint(int(lo), int(hi))
+
+    def word(key, length):
+        chars = _charset(text, key.split("[")[0].split(".")[0])
+        return "".join(rng.choice(chars) for _ in range(length))
+
+    lines = []
+    for name, kind, shape in plan:
+        if kind in ("integer", "long"):
+            value = shape
+        elif kind == "double":
+            value = number(name, kind)
+        elif kind == "boolean":
+            value = rng.random() < 0.5
+        elif kind == "character":
+            value = word(name, 1)
+        elif kind in ("string", "character[]"):
+            text_value = word(name, shape[0])
+            value = text_value if kind == "string" else list(text_value)
+        elif kind in ("string[]", "list<string>"):
+            value = [word(f"{name}[i]", rng.randint(1, shape[1])) for _ in range(shape[0])]
+        elif kind == "boolean[]":
+            value = [rng.random() < 0.5 for _ in range(shape[0])]
+        elif kind == "character[][]":
+            value = [list(word(f"{name}[i][j]", shape[1])) for _ in range(shape[0])]
+        elif kind in _MATRIX_TYPES:
+            value = [[number(f"{name}[i][j]", kind) for _ in range(shape[1])] for _ in range(shape[0])]
+        else:
+            value = [number(f"{name}[i]", kind) for _ in range(shape[0])]
+        lines.append(json.dumps(value, separators=(",", ":")))
+    return "\n".join(lines), elements
+
+
+def fit_complexity(timings):
+    """Least-squares fit of log(ms) against log(size): (exponent, predicted ms at full size)"""
+    points = [(math.log(f), math.log(ms)) for f, ms in timings if ms >= 1]
+    if len(points) < 2:
+        return None, max((ms for _, ms in timings), default=0.0)
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if spread == 0:
+        return None, max(ms for _, ms in timings)
+    exponent = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+    # log(1) = 0, so the intercept is the prediction at the constraint maxima
+    return exponent, math.exp(mean_y - exponent * mean_x)
+
+
+def complexity_label(exponent):
+    """Big-O name for an empirical growth exponent"""
+    if exponent is None or exponent < 0.25:
+        return "O(log n)" if exponent is not None else "O(1)"
+    for limit, label in ((1.15, "O(n)"), (1.45, "O(n log n)"), (2.4, "O(n^2)"), (3.4, "O(n^3)")):
+        if exponent < limit:
+            return label
+    return f"O(n^{exponent:.1f})"
+
+
+def stress_test(problem, java, workdir):
+    """Time the compiled harness on generated inputs of growing size
+
+    Returns a Time Limit Exceeded result when the fitted curve predicts the
+    candidate is too slow on a maximum-size input, otherwise None. Problems
+    whose inputs can't be generated are let through.
+    """
+    meta = _load_meta(problem.get("meta_data"))
+    text = constraints_text(problem.get("content", ""))
+    bounds = parse_constraints(text)
+    if not meta or not bounds:
+        return None
+
+    rng = random.Random(problem.get("slug"))
+    _, full = stress_input(meta, bounds, text, 1.0, rng, sizes_only=True)
+    if not full:
+        return None
+    top = min(1.0, STRESS_MAX_ELEMENTS / full)
+    fractions = [top * f for f in STRESS_FRACTIONS]
+    cases = [stress_input(meta, bounds, text, f, rng)[0] for f in fractions]
+    if None in cases:
+        return None
+
+    # The smallest case runs twice so JIT warm-up isn't billed to the curve
+    stdin = "\n".join([cases[0]] + cases) + "\n"
+    try:
+        run = subprocess.run([java, "-cp", workdir, "Main"], input=stdin, cwd=workdir,
+                             capture_output=True, text=True, timeout=STRESS_RUN_TIMEOUT)
+        output, crashed = run.stdout, run.returncode != 0
+    except subprocess.TimeoutExpired as e:
+        # Only the calls that finished are timed; the overrun also covers JVM startup and input
+        # parsing, so it isn't billed to the unfinished call (too few timings skips the check)
+        output = e.stdout.decode() if isinstance(e.stdout, bytes) else (e.stdout or "")
+        crashed = False
+
+    times = [int(line[len(TIME_MARKER):]) / 1e6 for line in output.splitlines() if line.startswith(TIME_MARKER)][1:]
+    if crashed:
+        # Random inputs can break promises the statement makes (sorted, distinct, ...)
+        print("  ⚠ Stress test inputs crashed the candidate, skipping")
+        return None
+    timings = list(zip(fractions, times))
+    if len(timings) < 2:
+        print("  ⚠ Stress test got too few timings, skipping")
+        return None
+
+    exponent, predicted = fit_complexity(timings)
+    if top == 1.0 and len(times) == len(fractions):
+        predicted = times[-1]
+    label = complexity_label(exponent)
+    if predicted > STRESS_TIME_LIMIT_MS:
+        print(f"  ✗ Stress test: grows like {label}, ~{predicted:.0f} ms predicted at max input size")
+        return {
+            "status_msg": "Time Limit Exceeded",
+            "predicted_complexity": label,
+            "predicted_ms": predicted,
+            "stress_exponent": exponent,
+        }
+    print(f"  ✓ Stress test: grows like {label}, ~{predicted:.0f} ms predicted at max input size")
+    return None
+
+
+# ---------------------------
+# 2g. Complexity Budget (from the constraint bounds)
+# ---------------------------
+# Heaviest first: (label, operations at input size n, polynomial degree or None)
+COMPLEXITY_CLASSES = [
+    ("O(n!)", lambda n: math.factorial(n) if n <= 20 else math.inf, None),
+    ("O(2^n)", lambda n: 2.0 ** n * n if n <= 64 else math.inf, None),
+    ("O(n^3)", lambda n: n ** 3, 3),
+    ("O(n^2 log n)", lambda n: n ** 2 * math.log2(n), 2),
+    ("O(n^2)", lambda n: n ** 2, 2),
+    ("O(n sqrt n)", lambda n: n ** 1.5, 1.5),
+    ("O(n log n)", lambda n: n * math.log2(n), 1),
+    ("O(n)", lambda n: n, 1),
+    ("O(sqrt n)", lambda n: n ** 0.5, 0.5),
+    ("O(log n)", lambda n: math.log2(n), 0),
+]
+
+
+def format_bound(value):
+    """10^5 / 2 * 10^4 style, the way LeetCode writes bounds"""
+    value = int(value)
+    exponent = len(str(abs(value))) - 1
+    if exponent < 3 or value % 10 ** exponent:
+        return str(value)
+    mantissa = value // 10 ** exponent
+    return f"10^{exponent}" if mantissa == 1 else f"{mantissa} * 10^{exponent}"
+
+
+def input_sizes(bounds):
+    """({key: largest size}, lengths) for the length bounds, else n/m, else the plain integer inputs
+
+    `lengths` is True only for array/string lengths; the fallbacks may be
+    values rather than sizes, so they are only good for a prompt hint.
+    """
+    def upper(key):
+        hi = bounds[key][1]
+        if isinstance(hi, str):
+            hi = bounds.get(hi, (None, None))[1]
+        return hi if isinstance(hi, (int, float)) and not isinstance(hi, bool) else None
+
+    # "m == grid.length" aliases are already merged into the .length keys
+    for wanted in (lambda k: k.endswith(".length"), lambda k: k in ("n", "m"),
+                   lambda k: re.fullmatch(r"[A-Za-z_]\w*", k)):
+        sizes = {k: upper(k) for k in bounds if wanted(k)}
+        sizes = {k: v for k, v in sizes.items() if v}
+        if sizes:
+            return sizes, all(k.endswith(".length") for k in sizes)
+    return {}, False
+
+
+def complexity_budget(problem):
+    """The heaviest complexity class the constraints allow, or None when no size bound is stated
+
+    The size is the largest length-like bound ("nums.length", "n"); each class
+    is costed at that size against COMPLEXITY_OPS_BUDGET. The returned dict
+    also carries the loop nesting depth above which a candidate ranks last,
+    which is only set when the size is an array/string length.
+    """
+    if not COMPLEXITY_BUDGET:
+        return None
+    sizes, lengths = input_sizes(parse_constraints(constraints_text(problem.get("content", ""))))
+    if not sizes:
+        return None
+    key = max(sizes, key=sizes.get)
+    n = int(sizes[key])
+    if n < 2:
+        return None
+    allowed = [(label, degree) for label, ops, degree in COMPLEXITY_CLASSES if ops(n) <= COMPLEXITY_OPS_BUDGET]
+    if not allowed:
+        return None
+    label, _ = allowed[0]
+    index = [c[0] for c in COMPLEXITY_CLASSES].index(label)
+    too_slow = COMPLEXITY_CLASSES[index - 1][0] if index > 0 else None
+    # Nesting only tells polynomial degrees apart; tiny inputs allow exponential search anyway
+    max_depth = None
+    if lengths and n > 20:
+        max_depth = int(math.log(COMPLEXITY_OPS_BUDGET) / math.log(n) + 1e-9) + COMPLEXITY_DEPTH_SLACK
+    return {
+        "size_key": key,
+        "n": n,
+        "label": label,
+        "too_slow": too_slow,
+        "max_loop_depth": max_depth,
+        "lengths": lengths,
+        "sizes": {k: int(v) for k, v in sizes.items()},
+    }
+
+
+def describe_budget(budget):
+    """Prompt text stating the budget"""
+    sizes = ", ".join(f"{k} <= {format_bound(v)}" for k, v in sorted(budget["sizes"].items()))
+    text = (f"Complexity budget (from the constraints: {sizes}):\n"
+            f"- Largest input {'size' if budget['lengths'] else 'value'} n = {format_bound(budget['n'])}"
+            f" ({budget['size_key']}); "
+            f"about {format_bound(COMPLEXITY_OPS_BUDGET)} simple operations fit the time limit\n"
+            f"- Aim for {budget['label']} or better")
+    if budget["too_slow"]:
+        text += f"; {budget['too_slow']} will exceed the time limit"
+    return text + "\n"
+
+
+def exceeds_budget(code, budget):
+    """Loop-depth details when the nesting goes past what the budget suggests, else None
+
+    Loops with constant bounds (alphabet, bit or direction loops) don't count.
+    Amortized scans (two pointers) still look nested, so this is only used to
+    rank candidates and to explain a rejection, never to reject one.
+    """
+    if not budget or budget.get("max_loop_depth") is None:
+        return None
+    depth = loop_nesting_depth(code, skip_constant=True)
+    if depth <= budget["max_loop_depth"]:
+        return None
+    return {"loop_depth": depth, "budget": budget["label"], "n": budget["n"]}
+
+
+# ---------------------------
+# 3. Submit to LeetCode (Using Working Approach)
+# ---------------------------
+@traced("submit")
+def submit_solution(slug, question_id, code, lang="java"):
+    """Submit solution to LeetCode using the working direct endpoint"""
+    submit_limiter.acquire()
+    return run_async(submit_async(get_client(), slug, question_id, code, lang))
+
+
+async def submit_async(client, slug, question_id, code, lang="java"):
+    """POST a submission with the client's pooled connection and return its submission_id"""
+    url = f'/problems/{slug}/submit/'
+    
+    # Update referer for this specific problem
+    submit_headers = {'Referer': f'{LEETCODE_BASE_URL}/problems/{slug}/description/'}
+    
+    # Exact payload format from HAR file
+    payload = {
+        "lang": lang,
+        "question_id": question_id,
+        "typed_code": code
+    }
+    
+    print(f"Submitting to: {LEETCODE_BASE_URL}{url}")
+    response = await client.http().post(url, json=payload, headers=submit_headers)
+    
+    # Check for authentication errors
+    if response.status_code in [401, 403]:
+        raise AuthenticationError("LeetCode session token or CSRF token has expired. Please update credentials.")
+    
+    if response.status_code != 200:
+        raise Exception(f"Submission failed: HTTP {response.status_code} - {response.text[:500]}")
+    
+    data = response.json()
+    
+    # Check if response indicates authentication error
+    if "error" in data:
+        error_msg = str(data.get("error", ""))
+        if "not authenticated" in error_msg.lower() or "login" in error_msg.lower():
+            raise AuthenticationError("LeetCode session token or CSRF token has expired. Please update credentials.")
+    
+    submission_id = data.get('submission_id')
+    
+    if not submission_id:
+        raise Exception(f"No submission_id in response: {data}")
+    
+    print(f"✓ Submission ID: {submission_id}")
+    return submission_id
+
+
+# Poll submission result
+_poll_lock = threading.Lock()
+_judge_latencies = None  # Recent submit → SUCCESS latencies (seconds), loaded from POLL_LOG_PATH
+
+
+def recent_judge_latencies():
+    """Return recently observed judge latencies, seeding from the poll log on first use"""
+    global _judge_latencies
+    with _poll_lock:
+        if _judge_latencies is None:
+            _judge_latencies = []
+            try:
+                with open(POLL_LOG_PATH) as f:
+                    for line in f:
+                        try:
+                            latency = json.loads(line).get("judge_latency")
+                        except ValueError:
+                            continue
+                        if latency:
+                            _judge_latencies.append(latency)
+            except OSError:
+                pass
+            _judge_latencies = _judge_latencies[-POLL_HISTORY_SIZE:]
+        return list(_judge_latencies)
+
+
+def record_poll_trace(submission_id, polls, judge_latency, final_state):
+    """Append one submission's poll timings to the poll log for later tuning"""
+    recent_judge_latencies()
+    with _poll_lock:
+        if judge_latency:
+            _judge_latencies.append(judge_latency)
+            del _judge_latencies[:-POLL_HISTORY_SIZE]
+        record = {
+            "submission_id": submission_id,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "judge_latency": judge_latency,
+            "final_state": final_state,
+            "polls": polls,
+        }
+        try:
+            with open(POLL_LOG_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"⚠ Could not write poll log: {e}")
+
+
+def next_poll_interval(interval, state, elapsed, expected_latency):
+    """Pick the next poll interval from the judge state and its usual latency"""
+    if state == "STARTED":
+        # Judging has begun - the verdict is close, poll briskly
+        interval = min(interval * 1.5, POLL_MAX_INTERVAL / 2)
+        if expected_latency and elapsed < expected_latency:
+            # ...but don't hammer the endpoint well before it usually finishes
+            interval = max(interval, (expected_latency - elapsed) / 2)
+    elif state == "PENDING":
+        # Still queued - back off faster
+        interval = interval * 2
+        if expected_latency and elapsed < expected_latency / 2:
+            interval = max(interval, (expected_latency / 2 - elapsed))
+    else:
+        # HTTP errors / unknown states
+        interval = interval * 2
+
+    interval = max(POLL_INITIAL_INTERVAL, min(interval, POLL_MAX_INTERVAL))
+    return interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+
+def check_status(submission_id):
+    """Check submission status until complete, backing off adaptively until the deadline"""
+    return run_async(check_status_async(get_client(), submission_id))
+
+
+async def check_status_async(client, submission_id):
+    """Poll one submission on the shared loop; many of these can wait concurrently"""
+    import asyncio
+
+    url = f'/submissions/detail/{submission_id}/check/'
+    
+    print("Checking submission status...")
+    # The poll log is plain file I/O - keep it off the loop the other accounts' polls share
+    latencies = sorted(await asyncio.to_thread(recent_judge_latencies))
+    expected_latency = latencies[len(latencies) // 2] if latencies else None
+
+    started = time.monotonic()
+    deadline = started + POLL_DEADLINE
+    interval = POLL_INITIAL_INTERVAL
+    polls = []
+    attempt = 0
+    state = "UNKNOWN"
+
+    # First check after the initial interval - fast verdicts come back in well under a second
+    await asyncio.sleep(interval)
+
+    while True:
+        attempt += 1
+        request_started = time.monotonic()
+        try:
+            response = await client.http().get(url, timeout=max(1.0, deadline - request_started))
+            
+            if response.status_code != 200:
+                state = f"HTTP {response.status_code}"
+                print(f"  Attempt {attempt}: HTTP {response.status_code}")
+            else:
+                data = response.json()
+                state = data.get('state', 'UNKNOWN')
+                
+                if state == 'SUCCESS':
+                    elapsed = time.monotonic() - started
+                    polls.append({
+                        "attempt": attempt,
+                        "state": state,
+                        "at": round(elapsed, 3),
+                        "request": round(time.monotonic() - request_started, 3),
+                    })
+                    print(f"  Attempt {attempt}: verdict after {elapsed:.2f}s")
+                    record_span("poll", time.monotonic() - request_started, state=state)
+                    await asyncio.to_thread(record_poll_trace, submission_id, polls, round(elapsed, 3), state)
+                    return data
+                elif state in ['PENDING', 'STARTED']:
+                    print(f"  Attempt {attempt}: {state}...")
+                else:
+                    print(f"  Attempt {attempt}: Unknown state {state}")
+                
+        except Exception as e:
+            state = "EXCEPTION"
+            print(f"  Attempt {attempt}: Exception - {e}")
+
+        now = time.monotonic()
+        record_span("poll", now - request_started, state=state)
+        elapsed = now - started
+        # The last sleep ends at the deadline, so the verdict gets one final poll there
+        interval = min(next_poll_interval(interval, state, elapsed, expected_latency), max(0.0, deadline - now))
+        polls.append({
+            "attempt": attempt,
+            "state": state,
+            "at": round(elapsed, 3),
+            "request": round(now - request_started, 3),
+            "sleep": round(interval, 3),
+        })
+
+        if now >= deadline:
+            break
+        await asyncio.sleep(interval)
+    
+    await asyncio.to_thread(record_poll_trace, submission_id, polls, None, state)
+    raise Exception(f"Timeout after {POLL_DEADLINE:.0f}s ({attempt} polls, last state {state})")
+
+
+# ---------------------------
+# 4. Save solution to JavaYatra repo
+# ---------------------------
+# GitHub repo details
+REPO_URL = os.environ.get("JAVAYATRA_REPO_URL", "https://github.com/techSaswata/JavaYatra.git")
+REPO_DIR = os.environ.get("JAVAYATRA_DIR", "JavaYatra")  # Reused between runs (cached in Actions)
+BASE_PATH = "leetcode_daily"
+GIT_AUTHOR = ["-c", "user.name=techSaswata", "-c", "user.email=saswata.24bcs10248@sst.scaler.com"]
+
+_git_lock = threading.Lock()
+_staged_solutions = []  # (frontend id, path) written by save_solution(commit=False), awaiting flush
+_unpushed = False       # A local commit exists that the last push didn't deliver
+
+
+def git(*args, check=True):
+    """Run git against the JavaYatra work tree, authenticating with GH_PAT if set
+
+    The token is passed as a per-command header instead of being embedded in
+    the remote URL, so it never lands in the cached .git/config.
+    """
+    command = ["git"]
+    GH_PAT = get_config().gh_pat
+    if GH_PAT:
+        token = base64.b64encode(f"x-access-token:{GH_PAT}".encode()).decode()
+        command += ["-c", f"http.https://github.com/.extraheader=AUTHORIZATION: basic {token}"]
+    if args and args[0] != "clone":
+        command += ["-C", REPO_DIR]
+    return subprocess.run(command + list(args), check=check, capture_output=True, text=True)
+
+
+def prepare_workspace(month):
+    """Get a shallow, sparse work tree holding leetcode_daily/<month>, reusing it if present"""
+    global _unpushed
+    month_path = f"{BASE_PATH}/{month}"
+    if not os.path.isdir(os.path.join(REPO_DIR, ".git")):
+        print(f"Cloning JavaYatra repository (shallow, sparse: {month_path})...")
+        git("clone", "--depth", "1", "--filter=blob:none", "--sparse", REPO_URL, REPO_DIR)
+        git("sparse-checkout", "set", month_path)
+        return
+
+    print("Updating JavaYatra repository...")
+    # No-op on a full (non-sparse) clone
+    git("sparse-checkout", "add", month_path, check=False)
+    if _staged_solutions or _unpushed:
+        return
+    # Commits whose push failed in an earlier run are replayed on the remote tip, never reset away
+    base, ahead = unpushed_commits()
+    git("fetch", "--depth", "1", "origin")
+    if ahead is None:
+        print("⚠ Could not tell which local commits were pushed - keeping the work tree as it is")
+        return
+    if not ahead:
+        git("reset", "--hard", "@{u}")
+        return
+    print(f"↺ {len(ahead)} commit(s) from an earlier run weren't pushed, replaying them on the remote tip...")
+    if git(*GIT_AUTHOR, "rebase", "--onto", "@{u}", base, check=False).returncode != 0:
+        git("rebase", "--abort", check=False)
+        print(f"⚠ Unpushed commits conflict with the remote - resolve them in {REPO_DIR} by hand")
+        return
+    _unpushed = True  # Pushed by the next flush_saved_solutions()
+
+
+def unpushed_commits():
+    """(base, [sha]) for local commits the remote hadn't got as of the last fetch or push
+
+    The list is None when that can't be told (no upstream or fetch recorded).
+    """
+    resolved = git("merge-base", "@{u}", "HEAD", check=False)
+    if resolved.returncode != 0:
+        # Shallow work trees from before the upstream ref was fetched into were reset to FETCH_HEAD instead
+        resolved = git("rev-parse", "--verify", "--quiet", "FETCH_HEAD", check=False)
+    if resolved.returncode != 0:
+        return None, None
+    base = resolved.stdout.strip()
+    listed = git("rev-list", f"{base}..HEAD", check=False)
+    if listed.returncode != 0:
+        return None, None
+    return base, listed.stdout.split()
+
+
+@traced("save")
+def save_solution(date_str, title, code, frontend_question_id, commit=True, lang="java"):
+    """Save accepted solution to JavaYatra repository organized by month
+
+    With commit=False the file is only written and staged; call
+    flush_saved_solutions() to commit and push everything in one go.
+    """
+    # Parse date to get month and day
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    month = date_obj.strftime("%b")  # e.g., "Dec"
+    day = date_obj.strftime("%d")     # e.g., "01", "10"
+    
+    # Save file as MonthDay.java (e.g., Dec01.java, Dec10.java); other languages
+    # go in a subfolder per language with their own extension (cpp/Dec01.cpp)
+    extension = LANGUAGES.get(lang, (lang, lang))[1]
+    filename = f"{month}{day}.{extension}"
+    relative_path = f"{BASE_PATH}/{month}/{filename}" if lang == "java" else f"{BASE_PATH}/{month}/{lang}/{filename}"
+
+    with _git_lock:
+        try:
+            prepare_workspace(month)
+        except subprocess.CalledProcessError as e:
+            print(f"⚠ Git operation failed: {e} {e.stderr or ''}")
+            return relative_path
+
+        # Create month (and language) folder if it doesn't exist
+        path = os.path.join(REPO_DIR, *relative_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(code)
+        
+        print(f"✓ Saved solution as: {relative_path}")
+        
+        try:
+            # Stage only the file we wrote
+            git("add", "--", relative_path)
+            _staged_solutions.append((str(frontend_question_id), relative_path))
+        except subprocess.CalledProcessError as e:
+            print(f"⚠ Git operation failed: {e} {e.stderr or ''}")
+            return relative_path
+
+    if commit:
+        flush_saved_solutions()
+    return relative_path
+
+
+def flush_saved_solutions():
+    """Commit every staged solution in one commit and push it"""
+    global _unpushed
+    with _git_lock:
+        try:
+            if _staged_solutions:
+                ids = [frontend_id for frontend_id, _ in _staged_solutions]
+                message = "lc " + ", ".join(ids)
+                if len(ids) > 1:
+                    # Keep a file → problem mapping for batched commits
+                    message += "\n\n" + "\n".join(f"{path}: lc {frontend_id}" for frontend_id, path in _staged_solutions)
+                git(*GIT_AUTHOR, "commit", "-m", message)
+                _staged_solutions.clear()
+                _unpushed = True
+            if _unpushed:
+                git("push")
+                _unpushed = False
+                print("✓ Pushed to JavaYatra repository")
+        except subprocess.CalledProcessError as e:
+            print(f"⚠ Git operation failed: {e} {e.stderr or ''}")
+            # Don't raise - email notification will still work
+
+
+# ---------------------------
+# 4b. Solution Archive (SQLite index of every accepted solution)
+# ---------------------------
+_archive_lock = threading.Lock()
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    frontend_question_id TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    question_id TEXT,
+    slug TEXT,
+    title TEXT,
+    code TEXT NOT NULL,
+    runtime TEXT,
+    memory TEXT,
+    runtime_ms REAL,
+    memory_mb REAL,
+    submission_id TEXT,
+    accepted_at TEXT,
+    source TEXT NOT NULL,
+    path TEXT,
+    PRIMARY KEY (frontend_question_id, lang)
+);
+CREATE INDEX IF NOT EXISTS solutions_slug ON solutions (slug, lang);
+CREATE INDEX IF NOT EXISTS solutions_question_id ON solutions (question_id, lang);
+
+CREATE TABLE IF NOT EXISTS failing_cases (
+    slug TEXT NOT NULL,
+    input TEXT NOT NULL,
+    expected TEXT,
+    verdict TEXT,
+    seen_at TEXT,
+    PRIMARY KEY (slug, input)
+);
+
+CREATE TABLE IF NOT EXISTS candidates (
+    slug TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    seen_at TEXT,
+    PRIMARY KEY (slug, fingerprint)
+);
+"""
+ARCHIVE_VERSION = 3
+
+
+def _leading_number(text):
+    match = re.match(r"\s*([\d.]+)", text or "")
+    return float(match.group(1)) if match else None
+
+
+def open_archive():
+    """Open (creating and migrating if needed) the solution archive"""
+    import sqlite3
+
+    os.makedirs(os.path.dirname(ARCHIVE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(ARCHIVE_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < ARCHIVE_VERSION:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(ARCHIVE_SCHEMA)
+        if version == 0:
+            _import_json_bank(conn)
+        conn.execute(f"PRAGMA user_version = {ARCHIVE_VERSION}")
+        conn.commit()
+    return conn
+
+
+def _import_json_bank(conn):
+    """One-off migration of the per-slug JSON files the bank used to keep"""
+    if not os.path.isdir(SOLUTION_BANK_DIR):
+        return
+    for name in sorted(os.listdir(SOLUTION_BANK_DIR)):
+        if not name.endswith(".json") or os.path.join(SOLUTION_BANK_DIR, name) == BATCH_PROGRESS_PATH:
+            continue
+        try:
+            with open(os.path.join(SOLUTION_BANK_DIR, name)) as f:
+                entry = json.load(f)
+            _upsert_solution(conn, dict(entry, source="accepted"))
+        except (OSError, ValueError, KeyError):
+            continue
+
+
+def _upsert_solution(conn, entry):
+    """Insert or replace; a JavaYatra import never overwrites a solution we saw accepted
+
+    Returns the number of rows written (0 when the existing row was kept).
+    """
+    return conn.execute(
+        """
+        INSERT INTO solutions (frontend_question_id, lang, question_id, slug, title, code, runtime, memory,
+                               runtime_ms, memory_mb, submission_id, accepted_at, source, path)
+        VALUES (:frontend_question_id, :lang, :question_id, :slug, :title, :code, :runtime, :memory,
+                :runtime_ms, :memory_mb, :submission_id, :accepted_at, :source, :path)
+        ON CONFLICT (frontend_question_id, lang) DO UPDATE SET
+            question_id = COALESCE(excluded.question_id, question_id),
+            slug = COALESCE(excluded.slug, slug),
+            title = COALESCE(excluded.title, title),
+            code = excluded.code,
+            runtime = excluded.runtime,
+            memory = excluded.memory,
+            runtime_ms = excluded.runtime_ms,
+            memory_mb = excluded.memory_mb,
+            submission_id = excluded.submission_id,
+            accepted_at = excluded.accepted_at,
+            source = excluded.source,
+            path = COALESCE(excluded.path, path)
+        WHERE excluded.source = 'accepted' OR solutions.source != 'accepted'
+        """,
+        {
+            "frontend_question_id": str(entry["frontend_question_id"]),
+            "lang": entry.get("lang", "java"),
+            "question_id": entry.get("question_id"),
+            "slug": entry.get("slug"),
+            "title": entry.get("title"),
+            "code": entry["code"],
+            "runtime": entry.get("runtime"),
+            "memory": entry.get("memory"),
+            "runtime_ms": _leading_number(entry.get("runtime")),
+            "memory_mb": _leading_number(entry.get("memory")),
+            "submission_id": str(entry["submission_id"]) if entry.get("submission_id") else None,
+            "accepted_at": entry.get("accepted_at"),
+            "source": entry.get("source", "accepted"),
+            "path": entry.get("path"),
+        },
+    ).rowcount
+
+
+def find_archived_solution(slug=None, frontend_question_id=None, question_id=None, lang="java"):
+    """Return the archived solution matching any of the given keys, or None"""
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            row = conn.execute(
+                """
+                SELECT * FROM solutions
+                WHERE lang = ? AND (slug = ? OR frontend_question_id = ? OR question_id = ?)
+                ORDER BY source = 'accepted' DESC, accepted_at DESC
+                LIMIT 1
+                """,
+                (lang, slug, str(frontend_question_id) if frontend_question_id else None,
+                 str(question_id) if question_id else None),
+            ).fetchone()
+        finally:
+            conn.close()
+    return dict(row) if row else None
+
+
+def find_archived_candidate(problem, languages=None):
+    """The archived solution in the first of `languages` (default RACE_LANGUAGES) that has one, or None"""
+    for lang in languages or RACE_LANGUAGES:
+        archived = find_archived_solution(problem['slug'], problem['frontend_question_id'], problem['question_id'], lang)
+        if archived:
+            return archived
+    return None
+
+
+def archive_solution(problem, code, result, submission_id, lang="java"):
+    """Record an accepted solution so later runs can resubmit it without generating"""
+    entry = {
+        "slug": problem["slug"],
+        "title": problem["title"],
+        "question_id": problem["question_id"],
+        "frontend_question_id": problem["frontend_question_id"],
+        "lang": lang,
+        "code": code,
+        "runtime": result.get("status_runtime"),
+        "memory": result.get("status_memory"),
+        "submission_id": submission_id,
+        "accepted_at": datetime.now().isoformat(timespec="seconds"),
+        "source": "accepted",
+    }
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            _upsert_solution(conn, entry)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def bootstrap_archive():
+    """Index the solutions already in JavaYatra, mapping files to problems via the "lc N" commits
+
+    Single-solution commits are subject "lc N" with one file; batched commits
+    list "path: lc N" lines in the body. Needs commit history, so a shallow
+    work tree is deepened (commits and trees only - blobs are fetched on demand).
+    """
+    with _git_lock:
+        prepare_workspace(datetime.now(timezone.utc).strftime("%b"))
+        if os.path.exists(os.path.join(REPO_DIR, ".git", "shallow")):
+            print("Fetching JavaYatra commit history...")
+            git("fetch", "--filter=blob:none", "--unshallow", "origin")
+        log = git("log", "--format=%x1e%cI%n%s%n%b%x1f", "--name-only", "--diff-filter=AM", "HEAD", "--", BASE_PATH).stdout
+
+    # Newest commit first, so the latest version of each file wins
+    files = {}
+    for record in log.split("\x1e")[1:]:
+        message, _, names = record.partition("\x1f")
+        lines = message.strip().splitlines()
+        if len(lines) < 2:
+            continue
+        committed_at, subject, body = lines[0], lines[1], lines[2:]
+        mapping = {}
+        for line in body:
+            match = re.fullmatch(r"(\S+\.java): lc (\d+)", line.strip())
+            if match:
+                mapping[match.group(1)] = match.group(2)
+        java_files = [name for name in names.split() if name.endswith(".java")]
+        match = re.fullmatch(r"lc (\d+)", subject.strip())
+        if not mapping and match and len(java_files) == 1:
+            mapping[java_files[0]] = match.group(1)
+        for path, frontend_id in mapping.items():
+            files.setdefault(path, (frontend_id, committed_at))
+
+    imported = 0
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            for path, (frontend_id, committed_at) in files.items():
+                shown = git("show", f"HEAD:{path}", check=False)
+                if shown.returncode != 0:
+                    continue  # Renamed or deleted since
+                imported += _upsert_solution(conn, {
+                    "frontend_question_id": frontend_id,
+                    "code": shown.stdout,
+                    "accepted_at": committed_at,
+                    "source": "javayatra",
+                    "path": path,
+                })
+            conn.commit()
+        finally:
+            conn.close()
+    print(f"✓ Archived {imported} solution(s) from JavaYatra ({len(files)} mapped file(s))")
+    return imported
+
+
+def report_archive():
+    """Print how many solutions the archive holds, by language and source"""
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            rows = conn.execute(
+                "SELECT lang, source, COUNT(*) AS n FROM solutions GROUP BY lang, source ORDER BY lang, source"
+            ).fetchall()
+        finally:
+            conn.close()
+    total = sum(row["n"] for row in rows)
+    print(f"Archive: {total} solution(s) in {ARCHIVE_PATH}")
+    for row in rows:
+        print(f"  {row['lang']:<10}{row['source']:<12}{row['n']:>6}")
+
+
+def record_failing_case(problem, result):
+    """Add a judge-reported failing testcase to the problem's regression corpus"""
+    testcase = (result.get("last_testcase") or "").strip()
+    if not testcase:
+        return
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            conn.execute(
+                """
+                INSERT INTO failing_cases (slug, input, expected, verdict, seen_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (slug, input) DO UPDATE SET
+                    expected = COALESCE(excluded.expected, expected),
+                    verdict = excluded.verdict,
+                    seen_at = excluded.seen_at
+                """,
+                (problem["slug"], testcase, result.get("expected_output") or None,
+                 result.get("status_msg"), datetime.now().isoformat(timespec="seconds")),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def load_failing_cases(slug):
+    """Every (input, expected output or None) the judge has failed a candidate on, oldest first"""
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            rows = conn.execute(
+                "SELECT input, expected FROM failing_cases WHERE slug = ? ORDER BY seen_at", (slug,)
+            ).fetchall()
+        finally:
+            conn.close()
+    return [(row["input"], row["expected"]) for row in rows]
+
+
+def record_candidate_verdict(slug, fingerprint, signature, verdict):
+    """Keep a candidate's verdict so later runs' ledgers count copies of it as duplicates"""
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            conn.execute(
+                """
+                INSERT INTO candidates (slug, fingerprint, signature, verdict, seen_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (slug, fingerprint) DO UPDATE SET
+                    verdict = excluded.verdict,
+                    seen_at = excluded.seen_at
+                """,
+                (slug, fingerprint, json.dumps(signature), verdict, datetime.now().isoformat(timespec="seconds")),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def load_candidate_verdicts(slug):
+    """(fingerprint, MinHash signature, verdict) of every candidate judged for a problem"""
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            rows = conn.execute(
+                "SELECT fingerprint, signature, verdict FROM candidates WHERE slug = ?", (slug,)
+            ).fetchall()
+        finally:
+            conn.close()
+    return [(row["fingerprint"], tuple(json.loads(row["signature"])), row["verdict"]) for row in rows]
+
+
+def load_archived_codes(slug):
+    """Code of every archived solution for a problem, in any language"""
+    with _archive_lock:
+        conn = open_archive()
+        try:
+            rows = conn.execute("SELECT code FROM solutions WHERE slug = ?", (slug,)).fetchall()
+        finally:
+            conn.close()
+    return [row["code"] for row in rows]
+
+
+# ---------------------------
+# 4c. Run Journal (write-ahead log so a killed daily run resumes instead of starting over)
+# ---------------------------
+def code_hash(code):
+    """Identity of a candidate for the journal - whitespace changes don't make new code"""
+    return hashlib.sha256(re.sub(r"\s+", "", code).encode()).hexdigest()[:16]
+
+
+class RunJournal:
+    """Append-only record of one day's daily run in JOURNAL_PATH
+
+    Every step is fsynced before the next one starts: the fetched problem,
+    each candidate, each submission_id (before polling) and each verdict,
+    then the save/email steps and "done". Opening the journal again the same
+    day replays those entries so the run carries on where it stopped.
+    """
+
+    def __init__(self, key, path=None):
+        self.key = key
+        self.path = path or JOURNAL_PATH
+        self.entries = []
+        self._lock = threading.Lock()
+
+        kept = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A torn last line from the crash
+                    if entry.get("run") == key:
+                        kept.append(line if line.endswith("\n") else line + "\n")
+                        self.entries.append(entry)
+        except FileNotFoundError:
+            pass
+
+        # Earlier days are finished with - drop them so the file stays one run long
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.writelines(kept)
+        os.replace(tmp, self.path)
+
+    def record(self, step, **fields):
+        """Durably append one step before carrying on"""
+        entry = {"run": self.key, "step": step, "at": datetime.now().isoformat(timespec="seconds"), **fields}
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries.append(entry)
+
+    def steps(self, step):
+        return [entry for entry in self.entries if entry["step"] == step]
+
+    def has(self, step):
+        return any(entry["step"] == step for entry in self.entries)
+
+    def problem(self):
+        fetched = self.steps("problem")
+        return fetched[-1]["problem"] if fetched else None
+
+    def verdict(self, code):
+        """(submission_id, result) if this code was already judged"""
+        key = code_hash(code)
+        for entry in reversed(self.steps("verdict")):
+            if entry["code"] == key:
+                return entry["submission_id"], entry["result"]
+        return None
+
+    def submission(self, code):
+        """submission_id of a submit whose verdict never got recorded"""
+        key = code_hash(code)
+        for entry in reversed(self.steps("submitted")):
+            if entry["code"] == key:
+                return entry["submission_id"]
+        return None
+
+    def record_candidates(self, candidates):
+        """Journal (lang, code) candidates not seen before"""
+        known = {entry["code"] for entry in self.steps("candidate")}
+        for lang, code in candidates:
+            if code_hash(code) not in known:
+                known.add(code_hash(code))
+                self.record("candidate", code=code_hash(code), lang=lang, source=code)
+
+    def resume_candidates(self):
+        """(lang, code) to pick up with: an accepted one, else those never judged (interrupted polls first)"""
+        for entry in self.steps("verdict"):
+            if entry["result"].get("status_msg") == "Accepted":
+                return [c for c in self._candidates() if code_hash(c[1]) == entry["code"]][:1]
+        unjudged = [c for c in self._candidates() if not self.verdict(c[1])]
+        return sorted(unjudged, key=lambda c: self.submission(c[1]) is None)
+
+    def _candidates(self):
+        return [(entry.get("lang", "java"), entry["source"]) for entry in self.steps("candidate")]
+
+    def judged_candidates(self):
+        """(code, verdict or None) of every journaled candidate"""
+        return [(code, (self.verdict(code) or (None, {}))[1].get("status_msg")) for _, code in self._candidates()]
+
+    def last_failure(self):
+        """The most recent rejected verdict, to feed back into the next generation"""
+        for entry in reversed(self.steps("verdict")):
+            if entry["result"].get("status_msg") != "Accepted":
+                return entry["result"]
+        return None
+
+
+def open_journal(dry_run=False):
+    """Today's journal, or None when journaling is off (dry runs never touch it)"""
+    if dry_run or not JOURNAL_ENABLED:
+        return None
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    journal = RunJournal(f"daily-{today}")
+    if journal.entries:
+        print(f"↺ Resuming today's run from {journal.path} ({len(journal.entries)} journaled step(s))")
+    return journal
+
+
+# ---------------------------
+# 5. Email Notification
+# ---------------------------
+class Notifier:
+    """Background email sender that keeps one authenticated SMTP connection open
+
+    notify() only enqueues; a worker thread delivers. Between start_digest()
+    and flush() notifications are rolled into a single digest message.
+    flush()/close() block until everything queued has been delivered.
+    """
+
+    IDLE_CHECK_SECONDS = 60  # NOOP before reusing a connection idle this long
+
+    def __init__(self, host, port, user, password, sender, recipient, starttls=True):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.sender = sender
+        self.recipient = recipient
+        self.starttls = starttls
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.server = None
+        self.last_used = 0.0
+        self.worker = None
+        self.digest_title = None
+        self.digest_items = []
+
+    def notify(self, subject, body):
+        """Queue a message (or add it to the open digest) without blocking"""
+        with self.lock:
+            if self.digest_title is not None:
+                self.digest_items.append((subject, body))
+                return
+            self._ensure_worker()
+        # Delivery time is recorded on the run that queued the message
+        self.queue.put((subject, body, current_run()))
+
+    def start_digest(self, title):
+        """Collect notifications into one message until flush()"""
+        with self.lock:
+            self.digest_title = title
+            self.digest_items = []
+
+    def flush(self):
+        """Send any open digest and wait until the queue is drained"""
+        with self.lock:
+            title, items = self.digest_title, self.digest_items
+            self.digest_title, self.digest_items = None, []
+        if items:
+            body = f"{len(items)} notification(s)\n\n" + "\n\n".join(
+                f"{'=' * 60}\n{subject}\n{'=' * 60}\n{body}" for subject, body in items
+            )
+            self.notify(title or "LeetCode notifications", body)
+        if self.worker:
+            self.queue.join()
+
+    def close(self):
+        """Flush, stop the worker and log out of the SMTP server"""
+        self.flush()
+        with self.lock:
+            worker, self.worker = self.worker, None
+        if worker:
+            self.queue.put(None)
+            worker.join()
+        self._disconnect()
+
+    def warm(self):
+        """Have the worker open (or re-check) the SMTP connection before anything needs sending"""
+        with self.lock:
+            self._ensure_worker()
+        self.queue.put("warm")
+
+    def _ensure_worker(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, name="notifier", daemon=True)
+            self.worker.start()
+            # Deliver whatever is still queued when the interpreter exits
+            atexit.register(self.close)
+
+    def _connect(self):
+        import smtplib
+
+        if not self.recipient:
+            raise MissingConfigError("Missing environment variable(s): EMAIL_TO")
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.starttls:
+            server.starttls()
+        if self.password:
+            server.login(self.user, self.password)
+        return server
+
+    def _disconnect(self):
+        if self.server:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+    def _connection(self):
+        """Return the open connection, reconnecting if it went stale"""
+        import smtplib
+
+        if self.server and time.monotonic() - self.last_used > self.IDLE_CHECK_SECONDS:
+            try:
+                if self.server.noop()[0] != 250:
+                    self._disconnect()
+            except smtplib.SMTPException:
+                self._disconnect()
+        if not self.server:
+            self.server = self._connect()
+        return self.server
+
+    def _deliver(self, subject, body):
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart()
+        msg["From"] = self.sender
+        msg["To"] = self.recipient
+        msg["Subject"] = subject
+
+        msg.attach(MIMEText(body, "plain"))
+
+        # One retry on a fresh connection if the kept-alive one was dropped
+        for attempt in range(2):
+            try:
+                self._connection().sendmail(self.sender, self.recipient, msg.as_string())
+                self.last_used = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError, OSError):
+                self._disconnect()
+                if attempt:
+                    raise
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                if item == "warm":
+                    try:
+                        self._connection()
+                    except Exception as e:
+                        print(f"⚠ SMTP warm-up failed: {e}")
+                    continue
+                subject, body, run = item
+                started = time.monotonic()
+                self._deliver(subject, body)
+                if run:
+                    run.add_span("email", time.monotonic() - started)
+                print("✓ Email sent successfully!")
+            except Exception as e:
+                print(f"✗ Failed to send email: {e}")
+            finally:
+                self.queue.task_done()
+
+
+_notifier = None
+
+
+def get_notifier():
+    """Create the shared Notifier on first use"""
+    global _notifier
+    with _config_lock:
+        if _notifier is None:
+            config = get_config()
+            _notifier = Notifier(
+                config.smtp_host, config.smtp_port, config.email_user, config.email_pass,
+                config.email_user, config.email_to, starttls=config.smtp_starttls
+            )
+        return _notifier
+
+
+def send_email(subject, body):
+    """Send email notification (queued; delivered in the background)"""
+    get_notifier().notify(subject, body)
+
+
+# Turn a (judge or local) failure result into feedback for the next attempt
+def describe_failure(result):
+    """Build error feedback text from a check_status-style result dict"""
+    status = result.get("status_msg", "Unknown")
+    error_details = f"Status: {status}"
+    
+    if 'full_runtime_error' in result and result['full_runtime_error']:
+        runtime_error = result['full_runtime_error'][:500]
+        error_details += f"\nRuntime Error: {runtime_error}"
+    
+    if 'full_compile_error' in result and result['full_compile_error']:
+        compile_error = result['full_compile_error'][:500]
+        error_details += f"\nCompile Error: {compile_error}"
+    
+    if status == "Time Limit Exceeded":
+        if 'predicted_complexity' in result:
+            error_details += (f"\nLocal stress test: runtime grows like {result['predicted_complexity']}"
+                              f" in the input size, predicted {result['predicted_ms']:.0f} ms on a"
+                              f" maximum-size input (limit ~{STRESS_TIME_LIMIT_MS:.0f} ms)")
+        else:
+            test_cases = result.get('total_testcases', '?')
+            passed = result.get('total_correct', 0)
+            error_details += f"\nTime Limit Exceeded after {passed}/{test_cases} test cases"
+        if 'loop_depth' in result:
+            error_details += (f"\nThe code nests loops {result['loop_depth']} deep; with n up to"
+                              f" {format_bound(result['n'])} only {result['budget']} or better fits the time limit.")
+        error_details += "\nYou need a MORE EFFICIENT algorithm with better time complexity!"
+    
+    if status == "Duplicate Candidate":
+        error_details += ("\nThe code was essentially the same as an earlier attempt"
+                          f" ({result.get('similarity', 1.0):.0%} similar after normalizing names and layout)."
+                          "\nWrite a genuinely different solution, not a renamed or reordered copy.")
+
+    if status == "Wrong Answer":
+        if 'last_testcase' in result:
+            error_details += f"\nFailed on test case: {result['last_testcase'][:200]}"
+        if 'code_output' in result and 'expected_output' in result:
+            error_details += f"\nYour output: {result.get('code_output', '')[:100]}"
+            error_details += f"\nExpected: {result.get('expected_output', '')[:100]}"
+    
+    return error_details
+
+
+# ---------------------------
+# MAIN FLOW WITH RETRY
+# ---------------------------
+def submit_and_check(problem, code, lang="java", journal=None):
+    """Submit as the configured account and wait for the verdict: (submission_id, result)
+
+    With a journal, code that already has a verdict is never resubmitted and
+    a submission whose poll was interrupted is polled again instead.
+    """
+    judged = journal.verdict(code) if journal else None
+    if judged:
+        print(f"\n[3/5] ↺ Already judged as submission {judged[0]} - not resubmitting")
+        return judged
+
+    submission_id = journal.submission(code) if journal else None
+    if submission_id:
+        print(f"\n[3/5] ↺ Resuming submission {submission_id} from the journal")
+    else:
+        print("\n[3/5] Submitting to LeetCode...")
+        submission_id = submit_solution(problem['slug'], problem['question_id'], code, lang)
+        if journal:
+            journal.record("submitted", code=code_hash(code), submission_id=submission_id)
+
+    print("\n[4/5] Checking submission status...")
+    result = check_status(submission_id)
+    if journal:
+        journal.record("verdict", code=code_hash(code), submission_id=submission_id, result=result)
+    return submission_id, result
+
+
+def solve_problem(problem, dry_run=False, initial_candidates=None, judge=None, journal=None, languages=None):
+    """Generate → validate → submit with retries until Accepted or the budget runs out
+
+    `judge(problem, code, lang)` returns (submission_id, result); it defaults
+    to submit_and_check for the configured account. Initial candidates are
+    Java code or (lang, code) pairs. With several `languages` (default
+    RACE_LANGUAGES) every generation round races them; a single non-Java
+    language is simply generated in. The route (see choose_route) sets the
+    models and candidates per round, and each judged rejection moves it one
+    tier heavier. With a journal,
+    candidates are journaled before they're judged and the last journaled
+    rejection seeds the feedback. Returns a dict with status, lang, code,
+    result, submission_id, attempts, route and last_error.
+    AuthenticationError is raised straight away.
+    """
+    judge = judge or functools.partial(submit_and_check, journal=journal)
+    languages = languages or RACE_LANGUAGES
+    problem_text = problem.get('problem_text') or html_to_text(problem['content']).strip()
+    route = choose_route(problem)
+    print(f"✓ Route: {route.describe()}")
+    budget = complexity_budget(problem)
+    if budget:
+        print(f"✓ Complexity budget: {budget['label']} for n = {format_bound(budget['n'])} ({budget['size_key']})")
+    run = current_run()
+    if run:
+        run.update(complexity_budget=budget and budget["label"], input_size=budget and budget["n"])
+
+    max_attempts = MAX_ATTEMPTS
+    attempts = 0
+    generations = 0
+    previous_error = None  # Track previous error for feedback to Gemini
+    # Screened (lang, code) candidates not yet submitted, best first
+    pending = [c if isinstance(c, tuple) else ("java", c) for c in initial_candidates or []]
+    ledger = candidate_ledger(problem['slug'])
+    if journal:
+        for code, status in journal.judged_candidates():
+            ledger.seed(code, status)
+    for _, code in pending:
+        ledger.admit(code)
+    if journal:
+        journal.record_candidates(pending)
+        if journal.last_failure():
+            previous_error = describe_failure(journal.last_failure())
+
+    while attempts < max_attempts:
+        if not pending and generations >= GENERATION_BUDGET:
+            print(f"\n⚠ Generation budget of {GENERATION_BUDGET} exhausted")
+            break
+
+        attempts += 1
+        attempt_number = attempts
+        attempt_started = time.monotonic()
+        verdict = "Error"
+        run = current_run()
+        if run:
+            run.attempt = attempt_number
+        print(f"\n{'='*70}")
+        print(f"ATTEMPT {attempts}/{max_attempts}")
+        print(f"{'='*70}")
+
+        try:
+            # Generate code (with feedback from previous attempt)
+            if not pending and languages != ["java"]:
+                count = max(1, min(route.candidates, (GENERATION_BUDGET - generations) // len(languages)))
+                print(f"\n[2/5] Generating {count} candidate(s) each in {', '.join(languages)}...")
+                generations += count * len(languages)
+                pending = race_candidates(problem, problem_text, languages, previous_error, count=count, ledger=ledger,
+                                          route=route, budget=budget)
+                if journal:
+                    journal.record_candidates(pending)
+            elif not pending:
+                count = min(route.candidates, GENERATION_BUDGET - generations)
+                print(f"\n[2/5] Generating {count} candidate(s) using {route.models[0]}...")
+                generations += count
+                pending = [("java", code) for code in generate_candidates(
+                    problem_text, problem['java_template'], previous_error,
+                    count=count, workers=SPECULATIVE_WORKERS,
+                    validator=lambda candidate: validate_locally(problem, candidate),
+                    ledger=ledger, route=route, budget=budget
+                )]
+                if journal:
+                    journal.record_candidates(pending)
+            else:
+                print(f"\n[2/5] Using queued candidate ({len(pending)} left)...")
+            lang, code = pending.pop(0)
+            print(f"✓ Code generated ({len(code)} chars{'' if lang == 'java' else ', ' + lang})")
+
+            if dry_run:
+                print("\n[3/5] DRY RUN - skipping submission. Candidate:\n")
+                print(code)
+                verdict = "Dry Run"
+                return {"status": "Dry Run", "lang": lang, "code": code, "attempts": attempts,
+                        "route": route.tier, "last_error": previous_error}
+            
+            # Submit and wait for the verdict
+            submission_id, result = judge(problem, code, lang)
+
+            status = result.get("status_msg", "Unknown")
+            verdict = status
+            ledger.mark(code, status)
+            
+            print(f"\n{'='*70}")
+            print(f"RESULT: {status}")
+            print(f"{'='*70}")
+            print(f"Runtime: {result.get('status_runtime', 'N/A')}")
+            print(f"Memory: {result.get('status_memory', 'N/A')}")
+            if 'total_testcases' in result:
+                print(f"Test Cases: {result.get('total_correct', 0)}/{result.get('total_testcases', 0)}")
+            print(f"{'='*70}")
+
+            if status == "Accepted":
+                return {
+                    "status": status,
+                    "lang": lang,
+                    "code": code,
+                    "result": result,
+                    "submission_id": submission_id,
+                    "attempts": attempts,
+                    "route": route.tier,
+                    "last_error": previous_error,
+                }
+
+            # Keep the failing testcase so later candidates are screened against it locally
+            record_failing_case(problem, result)
+
+            # Build error feedback for next attempt
+            print(f"\n✗ {status}")
+            error_details = describe_failure(dict(result, **(exceeds_budget(code, budget) or {})))
+            print(error_details)
+            
+            # Store error for next attempt
+            previous_error = error_details
+
+            heavier = route.escalated()
+            if heavier is not route:
+                route = heavier
+                print(f"↑ Route: {route.describe()}")
+            
+            if pending:
+                print("\nTrying next queued candidate...")
+            else:
+                print("\nWill regenerate code with error feedback...")
+                print(f"Retrying in {RETRY_DELAY} seconds...")
+                time.sleep(RETRY_DELAY)
+                
+        except LocalValidationError as local_err:
+            # Caught before any network submission - costs generation budget only
+            verdict = "Local " + local_err.result.get("status_msg", "Failure")
+            print(f"\n✗ Local validation failed: {local_err}")
+            feedback = "Local validation failed before submission\n" + describe_failure(local_err.result)
+            if local_err.result.get("status_msg") == "Duplicate Candidate" and previous_error \
+                    and "Duplicate Candidate" not in previous_error:
+                # Keep the judge's feedback - the duplicate still has that problem
+                feedback = previous_error + "\n\n" + feedback
+            previous_error = feedback
+            print(previous_error)
+            attempts -= 1
+            print("\nWill regenerate code with error feedback...")
+
+        except AuthenticationError:
+            verdict = "Auth Error"
+            raise
+                
+        except Exception as e:
+            print(f"\n✗ Submission Error: {e}")
+            import traceback
+            traceback.print_exc()
+            
+            # Store submission error for next attempt
+            previous_error = f"Submission failed with error: {str(e)}"
+            
+            if attempts < max_attempts and not pending:
+                print("\nWill regenerate code to fix submission error...")
+                print(f"\nRetrying in {RETRY_DELAY} seconds...")
+                time.sleep(RETRY_DELAY)
+
+        finally:
+            if run:
+                run.attempt = None
+            record_span("attempt", time.monotonic() - attempt_started, attempt=attempt_number, verdict=verdict)
+
+    return {"status": "Failed", "attempts": attempts, "route": route.tier, "last_error": previous_error}
+
+
+def runtime_score(result):
+    """Sort key for accepted results: runtime percentile first, then lower runtime"""
+    percentile = result.get("runtime_percentile")
+    runtime_ms = _leading_number(result.get("status_runtime"))
+    return (percentile if percentile is not None else -1.0, -(runtime_ms if runtime_ms is not None else float("inf")))
+
+
+def describe_runtime(result):
+    runtime = result.get("status_runtime", "N/A")
+    percentile = result.get("runtime_percentile")
+    return f"{runtime} (beats {percentile:.1f}%)" if percentile is not None else runtime
+
+
+def optimize_solution(problem, outcome, budget=None, judge=None):
+    """Spend up to `budget` extra submissions on faster variants of an accepted solution
+
+    Returns the outcome for the best accepted version (highest runtime
+    percentile), with optimize_submissions recording what was spent.
+    Variants are written in the accepted solution's language, since LeetCode
+    ranks runtimes per language.
+    """
+    budget = OPTIMIZE_SUBMISSIONS if budget is None else budget
+    judge = judge or submit_and_check
+    problem_text = problem.get('problem_text') or html_to_text(problem['content']).strip()
+    best = dict(outcome)
+    lang = best.get("lang", "java")
+    template = problem['java_template'] if lang == "java" else (problem.get('snippets') or {}).get(lang, "")
+    route = Route(best["route"], "tier that got it accepted") if best.get("route") in ROUTE_TIERS else choose_route(problem)
+    complexity = complexity_budget(problem)
+    submissions = 0
+    # The accepted code is in the ledger, so restyled copies of it aren't submitted as "variants"
+    ledger = candidate_ledger(problem['slug'])
+    ledger.admit(best["code"])
+
+    print(f"\n{'='*70}")
+    print(f"OPTIMIZE: up to {budget} extra submission(s), starting from {describe_runtime(best['result'])}")
+    print(f"{'='*70}")
+
+    for _ in range(budget):
+        if submissions >= budget:
+            break
+        if runtime_score(best["result"])[0] >= OPTIMIZE_TARGET_PERCENTILE:
+            print(f"✓ Runtime beats {OPTIMIZE_TARGET_PERCENTILE:.0f}% - good enough")
+            break
+
+        brief = (
+            f"This solution was Accepted with runtime {describe_runtime(best['result'])} "
+            f"and memory {best['result'].get('status_memory', 'N/A')}:\n{best['code']}"
+        )
+        try:
+            candidates = generate_candidates(
+                problem_text, template, improve=brief,
+                count=route.candidates, workers=SPECULATIVE_WORKERS,
+                validator=(lambda candidate: validate_locally(problem, candidate)) if lang == "java" else None,
+                ledger=ledger, lang=lang, route=route, budget=complexity
+            )
+        except Exception as e:
+            print(f"  ✗ No usable variant this round: {e}")
+            continue
+
+        for code in candidates:
+            if submissions >= budget:
+                break
+            submissions += 1
+            try:
+                submission_id, result = judge(problem, code, lang)
+            except AuthenticationError as auth_err:
+                print(f"✗ Stopping optimization: {auth_err}")
+                return dict(best, optimize_submissions=submissions)
+            except Exception as e:
+                print(f"  ✗ Variant submission failed: {e}")
+                continue
+
+            ledger.mark(code, result.get("status_msg"))
+            if result.get("status_msg") != "Accepted":
+                print(f"  ✗ Variant {result.get('status_msg', 'Unknown')} - keeping {describe_runtime(best['result'])}")
+                record_failing_case(problem, result)
+                continue
+            if runtime_score(result) > runtime_score(best["result"]):
+                print(f"  ✓ Faster variant: {describe_runtime(result)} (was {describe_runtime(best['result'])})")
+                best.update(code=code, result=result, submission_id=submission_id)
+            else:
+                print(f"  = Variant accepted at {describe_runtime(result)}, not faster")
+
+    return dict(best, optimize_submissions=submissions)
+
+
+def send_auth_failure_email(auth_err, problem=None):
+    """Tell the user their LeetCode cookies need refreshing"""
+    context = ""
+    if problem:
+        context = f"Problem: {problem['title']} ({problem['slug']})\nDate: {problem['date']}\n\n"
+    send_email(
+        "✗ LeetCode Daily FAILED: Session Token or CSRF Expired",
+        "Authentication Error: Session token or CSRF token has expired.\n\n"
+        f"Error Details:\n{auth_err}\n\n"
+        f"{context}"
+        "Please update your LEETCODE_SESSION and LEETCODE_CSRF secrets in GitHub Actions.\n\n"
+        "Steps to fix:\n"
+        "1. Log into LeetCode in your browser\n"
+        "2. Open Developer Tools > Application > Cookies\n"
+        "3. Copy the new LEETCODE_SESSION and csrftoken values\n"
+        "4. Update the secrets in GitHub repository settings\n\n"
+        f"Date: {datetime.now().strftime('%Y-%m-%d')}"
+    )
+
+
+def print_auth_error(auth_err):
+    print(f"\n{'='*70}")
+    print("AUTHENTICATION ERROR")
+    print(f"{'='*70}")
+    print(f"✗ {auth_err}")
+
+
+def trace_outcome(problem, outcome):
+    """Copy the problem and verdict onto the current run's history record"""
+    run = current_run()
+    if not run:
+        return
+    if problem:
+        run.update(slug=problem['slug'], title=problem['title'], date=problem.get('date'),
+                   difficulty=problem.get('difficulty'), tags=problem.get('tags') or [])
+    if outcome:
+        result = outcome.get("result") or {}
+        run.update(
+            verdict=outcome["status"],
+            lang=outcome.get("lang"),
+            route=outcome.get("route"),
+            attempts=outcome.get("attempts", 0),
+            runtime=result.get("status_runtime"),
+            memory=result.get("status_memory"),
+            submission_id=outcome.get("submission_id"),
+        )
+        if "optimize_submissions" in outcome:
+            run.update(optimize_submissions=outcome["optimize_submissions"])
+
+
+def main(dry_run=False):
+    """Solve today's daily, recording the run in the run history"""
+    run = start_run("daily", dry_run=dry_run)
+    try:
+        solve_daily(dry_run)
+    finally:
+        run.finish()
+    return run
+
+
+def solve_daily(dry_run=False):
+    print("=" * 70)
+    print("LEETCODE DAILY AUTO SOLVER" + (" (DRY RUN)" if dry_run else ""))
+    print("=" * 70)
+
+    journal = open_journal(dry_run)
+    if journal and any(entry.get("status") == "Accepted" for entry in journal.steps("done")):
+        # A failed day may be re-dispatched; it still never resubmits judged code
+        print("✓ Today's daily was already accepted, saved and emailed - nothing to do")
+        return
+    
+    try:
+        # Step 1: Fetch daily challenge
+        print("\n[1/5] Fetching daily challenge...")
+        problem = journal.problem() if journal else None
+        if problem:
+            print("↺ Using the problem recorded in the journal")
+        else:
+            problem = get_daily_challenge()
+            if journal:
+                journal.record("problem", problem=problem)
+        
+        print(f"✓ Problem: {problem['title']}")
+        print(f"✓ Slug: {problem['slug']}")
+        print(f"✓ Question ID: {problem['question_id']}")
+        print(f"✓ Date: {problem['date']}")
+
+    except AuthenticationError as auth_err:
+        # Handle authentication errors immediately without trying Gemini
+        trace_outcome(None, {"status": "Auth Error"})
+        print_auth_error(auth_err)
+        if not dry_run:
+            send_auth_failure_email(auth_err)
+        return
+
+    # A known-good solution (earlier accept, batch mode or JavaYatra) is resubmitted before any generation
+    archived = find_archived_candidate(problem)
+    if archived:
+        print(f"✓ Found archived {archived['lang']} solution for {problem['slug']} "
+              f"({archived['source']}, {archived.get('accepted_at') or '?'}) - resubmitting without generation")
+
+    # Journaled candidates (an accepted one, or ones never judged) come before anything new
+    initial_candidates = journal.resume_candidates() if journal else []
+    if not initial_candidates and archived:
+        initial_candidates = [(archived['lang'], archived['code'])]
+
+    # Step 2: Generate and submit with retries
+    try:
+        outcome = solve_problem(problem, dry_run=dry_run, initial_candidates=initial_candidates, journal=journal)
+    except AuthenticationError as auth_err:
+        # Authentication error during submission - stop immediately
+        trace_outcome(problem, {"status": "Auth Error"})
+        print_auth_error(auth_err)
+        send_auth_failure_email(auth_err, problem)
+        return
+
+    trace_outcome(problem, outcome)
+    if outcome["status"] == "Dry Run":
+        return
+
+    if outcome["status"] == "Accepted":
+        optimized = journal.steps("optimized") if journal else []
+        if optimized:
+            outcome = optimized[-1]["outcome"]
+            trace_outcome(problem, outcome)
+        elif OPTIMIZE_SUBMISSIONS and not dry_run:
+            outcome = optimize_solution(problem, outcome, judge=functools.partial(submit_and_check, journal=journal))
+            trace_outcome(problem, outcome)
+            if journal:
+                journal.record("optimized", outcome=outcome)
+
+        code = outcome["code"]
+        lang = outcome.get("lang", "java")
+        result = outcome["result"]
+        runtime = describe_runtime(result)
+        memory = result.get("status_memory", "N/A")
+        archive_solution(problem, code, result, outcome["submission_id"], lang)
+
+        # Save solution
+        saved = journal.steps("saved") if journal else []
+        if saved:
+            filename = saved[-1]["filename"]
+            print(f"\n[5/5] ↺ Already saved as {filename}")
+        else:
+            print("\n[5/5] ✓ ACCEPTED! Saving solution...")
+            filename = save_solution(problem['date'], problem['title'], code, problem['frontend_question_id'], lang=lang)
+            if journal:
+                journal.record("saved", filename=filename)
+        
+        # Send success email
+        if journal and journal.has("emailed"):
+            print("↺ Success email already sent")
+        else:
+            send_email(
+                f"✓ LeetCode Daily Accepted: {problem['title']}",
+                f"Your solution for {problem['title']} ({problem['slug']}) was Accepted!\n\n"
+                f"Language: {LANGUAGES.get(lang, (lang,))[0]}\n"
+                f"Runtime: {runtime}\n"
+                f"Memory: {memory}\n"
+                f"Saved as: {filename}\n"
+                f"Submission ID: {outcome['submission_id']}\n"
+                + (f"Optimization: {outcome['optimize_submissions']} extra submission(s)\n" if OPTIMIZE_SUBMISSIONS else "")
+                + "\n"
+                f"Date: {problem['date']}"
+            )
+            if journal:
+                journal.record("emailed")
+        if journal:
+            journal.record("done", status="Accepted")
+        
+        print("\n" + "🎉" * 35)
+        print("SUCCESS! Task completed.")
+        print("🎉" * 35)
+        return
+
+    # All attempts failed
+    attempts = outcome["attempts"]
+    previous_error = outcome["last_error"]
+    print(f"\n{'='*70}")
+    print(f"FAILED - All {attempts} attempts exhausted")
+    print(f"{'='*70}")
+    if dry_run:
+        return
+    
+    # Build failure email with last error details
     failure_message = (
-        f"All {max_attempts} attempts failed for {problem['title']} ({problem['slug']}).\n\n"
+        f"All {attempts} attempts failed for {problem['title']} ({problem['slug']}).\n\n"
         f"Date: {problem['date']}\n\n"
     )
     
@@ -634,7 +4395,721 @@ def main():
         f"✗ LeetCode Daily FAILED: {problem['title']}",
         failure_message
     )
+    if journal:
+        journal.record("done", status="Failed")
+
+
+# ---------------------------
+# BATCH MODE (pre-build a bank of accepted solutions)
+# ---------------------------
+def load_batch_progress():
+    """Load per-slug batch results from BATCH_PROGRESS_PATH"""
+    try:
+        with open(BATCH_PROGRESS_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_batch_progress(progress):
+    """Atomically persist batch progress so an interrupted batch can resume"""
+    os.makedirs(os.path.dirname(BATCH_PROGRESS_PATH) or ".", exist_ok=True)
+    tmp_path = BATCH_PROGRESS_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, BATCH_PROGRESS_PATH)
+
+
+def collect_batch_targets(slugs=None, dates=None, problemset_skip=0, problemset_limit=0):
+    """Resolve the batch selection into a list of (slug, date) pairs"""
+    targets = []
+    for slug in slugs or []:
+        targets.append((slug, None))
+
+    if dates:
+        months = {}
+        for date_str in dates:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+            key = (date_obj.year, date_obj.month)
+            if key not in months:
+                months[key] = list_daily_challenges(*key)
+            slug = months[key].get(date_str)
+            if slug:
+                targets.append((slug, date_str))
+            else:
+                print(f"⚠ No daily challenge found for {date_str}")
+
+    if problemset_limit:
+        for slug in list_problemset(problemset_skip, problemset_limit):
+            targets.append((slug, None))
+
+    return targets
+
+
+def run_batch(targets, workers=None, retry_failed=False, dry_run=False):
+    """Push every target problem through generate → validate → submit on a worker pool"""
+    progress = load_batch_progress()
+    progress_lock = threading.Lock()
+    workers = workers or BATCH_WORKERS
+
+    todo = []
+    for slug, date_str in targets:
+        status = progress.get(slug, {}).get("status")
+        if find_archived_solution(slug=slug) or status in ("Accepted", "Skipped"):
+            continue
+        if status == "Failed" and not retry_failed:
+            continue
+        todo.append((slug, date_str))
+
+    print(f"Batch: {len(todo)} to solve, {len(targets) - len(todo)} already done/skipped, {workers} worker(s)")
+    auth_failed = threading.Event()
+    # Per-problem results are rolled into one email at the end
+    get_notifier().start_digest(f"LeetCode batch report ({len(todo)} problems)")
+
+    def record(slug, outcome):
+        with progress_lock:
+            progress[slug] = {
+                "status": outcome["status"],
+                "attempts": outcome.get("attempts", 0),
+                "last_error": (outcome.get("last_error") or "")[:500],
+                "updated": datetime.now().isoformat(timespec="seconds"),
+            }
+            save_batch_progress(progress)
+
+    def work(slug, date_str):
+        run = start_run("batch", slug=slug)
+        try:
+            slug, status = solve_one(slug, date_str)
+            run.update(verdict=status)
+            return slug, status
+        finally:
+            run.finish()
+
+    def solve_one(slug, date_str):
+        if auth_failed.is_set():
+            return slug, "Not Run"
+        try:
+            problem = get_problem(slug)
+            if problem.get("paid_only"):
+                print(f"⚠ {slug} is premium-only, skipping")
+                record(slug, {"status": "Skipped"})
+                return slug, "Skipped"
+            if date_str:
+                problem = dict(problem, date=date_str)
+            outcome = solve_problem(problem, dry_run=dry_run)
+            trace_outcome(problem, outcome)
+        except AuthenticationError as auth_err:
+            auth_failed.set()
+            print_auth_error(auth_err)
+            return slug, "Auth Error"
+
+        if outcome["status"] == "Accepted":
+            archive_solution(problem, outcome["code"], outcome["result"], outcome["submission_id"], outcome["lang"])
+            if date_str:
+                # Past dailies belong in the archive too - committed together at the end
+                save_solution(date_str, problem['title'], outcome["code"], problem['frontend_question_id'],
+                              commit=False, lang=outcome["lang"])
+        if outcome["status"] != "Dry Run":
+            record(slug, outcome)
+            details = f"Attempts: {outcome['attempts']}"
+            if outcome["status"] == "Accepted":
+                details += f"\nRuntime: {outcome['result'].get('status_runtime', 'N/A')}"
+                details += f"\nMemory: {outcome['result'].get('status_memory', 'N/A')}"
+            elif outcome.get("last_error"):
+                details += f"\nLast Error:\n{outcome['last_error']}"
+            send_email(f"{outcome['status']}: {problem['title']} ({slug})", details)
+        return slug, outcome["status"]
+
+    counts = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(work, slug, date_str) for slug, date_str in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                slug, status = future.result()
+            except Exception as e:
+                slug, status = "?", "Error"
+                print(f"✗ Batch item failed: {e}")
+            counts[status] = counts.get(status, 0) + 1
+            print(f"\n[batch {done}/{len(todo)}] {slug}: {status}")
+
+    flush_saved_solutions()
+
+    summary = ", ".join(f"{status}: {n}" for status, n in sorted(counts.items())) or "nothing to do"
+    print(f"\n{'='*70}")
+    print(f"BATCH COMPLETE - {summary}")
+    print(f"{'='*70}")
+
+    if auth_failed.is_set() and not dry_run:
+        send_auth_failure_email("Authentication failed during batch run")
+    elif todo and not dry_run:
+        send_email(f"LeetCode batch finished: {summary}", f"Batch of {len(todo)} problems finished.\n\n{summary}")
+    get_notifier().flush()
+    return counts
+
+
+# ---------------------------
+# FAN-OUT MODE (one fetch and generation, many accounts)
+# ---------------------------
+class Account:
+    """One LeetCode account in a fan-out run, with its own connection pool and submit rate limit"""
+
+    def __init__(self, name, session, csrf=None):
+        self.name = name
+        self.client = LeetCodeClient(session, csrf, name=name)
+        self.limiter = TokenBucket(SUBMIT_RATE_PER_MIN, RATE_BURST)
+        self.status = "Pending"
+        self.attempts = 0
+        self.result = None
+        self.submission_id = None
+        self.code = None
+        self.lang = "java"
+        self.error = None
+
+
+def load_accounts(path=None):
+    """Read accounts from a JSON file or LEETCODE_ACCOUNTS: [{"name", "session", "csrf"}, ...]"""
+    if path:
+        with open(path) as f:
+            entries = json.load(f)
+    else:
+        raw = os.environ.get("LEETCODE_ACCOUNTS", "")
+        if not raw:
+            raise MissingConfigError("Missing environment variable(s): LEETCODE_ACCOUNTS")
+        entries = json.loads(raw)
+
+    accounts = []
+    for n, entry in enumerate(entries, 1):
+        if not entry.get("session"):
+            raise MissingConfigError(f"Account {entry.get('name', n)} has no session cookie")
+        accounts.append(Account(entry.get("name") or f"account-{n}", entry["session"], entry.get("csrf")))
+    if not accounts:
+        raise MissingConfigError("LEETCODE_ACCOUNTS lists no accounts")
+    return accounts
+
+
+async def judge_account(account, problem, code, lang="java"):
+    """Submit one candidate as one account; auth and transport failures stay with that account"""
+    try:
+        await account.limiter.acquire_async()
+        account.attempts += 1
+        submission_id = await submit_async(account.client, problem['slug'], problem['question_id'], code, lang)
+        result = await check_status_async(account.client, submission_id)
+    except AuthenticationError as auth_err:
+        print(f"✗ [{account.name}] {auth_err}")
+        account.status = "Auth Error"
+        account.error = str(auth_err)
+        return None
+    except Exception as e:
+        print(f"✗ [{account.name}] Submission error: {e}")
+        account.error = str(e)
+        return None
+
+    print(f"  [{account.name}] {result.get('status_msg', 'Unknown')}")
+    if result.get("status_msg") == "Accepted":
+        account.status = "Accepted"
+        account.result = result
+        account.submission_id = submission_id
+        account.code = code
+        account.lang = lang
+    return submission_id, result
+
+
+def fan_out_judge(accounts):
+    """A solve_problem judge that submits each candidate to every account still pending
+
+    Accounts whose submission failed in transport get code another account
+    already had accepted, up to FANOUT_RESUBMITS more times (after that they
+    are marked Error). Returns Accepted once no account is pending; otherwise
+    the first rejection, whose details feed the next generation.
+    """
+    def submit_all(problem, targets, code, lang):
+        async def judge_all():
+            import asyncio
+
+            return await asyncio.gather(*(judge_account(a, problem, code, lang) for a in targets))
+
+        return dict(zip(targets, run_async(judge_all())))
+
+    def judge(problem, code, lang="java"):
+        pending = [a for a in accounts if a.status == "Pending"]
+        print(f"\n[3/5] Submitting to {len(pending)} account(s) concurrently...")
+        outcomes = submit_all(problem, pending, code, lang)
+        if all(a.status == "Auth Error" for a in accounts):
+            raise AuthenticationError("Every account's session token or CSRF token has expired.")
+
+        # Accepted code is known good, so an account that only failed to reach the judge gets it again
+        for resubmit in range(FANOUT_RESUBMITS + 1):
+            accepted = [a for a in accounts if a.status == "Accepted"]
+            errored = [a for a, o in outcomes.items() if o is None and a.status == "Pending"]
+            if not accepted or not errored:
+                break
+            if resubmit == FANOUT_RESUBMITS:
+                for account in errored:
+                    account.status = "Error"
+                break
+            lead = accepted[0]
+            print(f"↺ Resubmitting {lead.name}'s accepted code to {', '.join(a.name for a in errored)} "
+                  f"in {RETRY_DELAY}s ({resubmit + 1}/{FANOUT_RESUBMITS})")
+            time.sleep(RETRY_DELAY)
+            outcomes.update(submit_all(problem, errored, lead.code, lead.lang))
+
+        rejected = [o for a, o in outcomes.items() if o and a.status == "Pending"]
+        accepted = [a for a in accounts if a.status == "Accepted"]
+        if not any(a.status == "Pending" for a in accounts):
+            return accepted[0].submission_id, accepted[0].result
+        if rejected:
+            return rejected[0]
+        raise Exception("; ".join(f"{a.name}: {a.error}" for a in pending if a.status == "Pending"))
+
+    return judge
+
+
+def fan_out_report(problem, accounts):
+    """One combined report across all accounts"""
+    lines = [f"{problem['title']} ({problem['slug']}) - {problem['date']}", ""]
+    for account in accounts:
+        line = f"{account.name}: {account.status} after {account.attempts} submission(s)"
+        if account.status == "Accepted":
+            line += (f" - runtime {account.result.get('status_runtime', 'N/A')},"
+                     f" memory {account.result.get('status_memory', 'N/A')},"
+                     f" submission {account.submission_id}")
+        elif account.error:
+            line += f" - {account.error[:200]}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def run_fanout(accounts, dry_run=False):
+    """Fetch and generate once, then submit for every account concurrently"""
+    run = start_run("fanout", accounts=len(accounts), dry_run=dry_run)
+    try:
+        print("=" * 70)
+        print(f"LEETCODE DAILY FAN-OUT ({len(accounts)} accounts)" + (" (DRY RUN)" if dry_run else ""))
+        print("=" * 70)
+
+        # Any account with a live session can fetch the daily for everyone
+        problem = None
+        print("\n[1/5] Fetching daily challenge...")
+        for account in accounts:
+            try:
+                problem = get_daily_challenge(client=account.client)
+                break
+            except AuthenticationError as auth_err:
+                print(f"✗ [{account.name}] {auth_err}")
+                account.status = "Auth Error"
+                account.error = str(auth_err)
+        if problem is None:
+            trace_outcome(None, {"status": "Auth Error"})
+            if not dry_run:
+                send_auth_failure_email("Every account failed authentication while fetching the daily")
+            return accounts
+        print(f"✓ Problem: {problem['title']} ({problem['slug']})")
+
+        archived = find_archived_candidate(problem)
+        try:
+            outcome = solve_problem(problem, dry_run=dry_run, judge=fan_out_judge(accounts),
+                                    initial_candidates=[(archived['lang'], archived['code'])] if archived else None)
+        except AuthenticationError as auth_err:
+            print_auth_error(auth_err)
+            outcome = {"status": "Auth Error", "attempts": 0}
+        trace_outcome(problem, outcome)
+        if dry_run:
+            return accounts
+
+        accepted = [a for a in accounts if a.status == "Accepted"]
+        if accepted:
+            # Same problem, one archive: save the first accepted solution once
+            lead = accepted[0]
+            archive_solution(problem, lead.code, lead.result, lead.submission_id, lead.lang)
+            save_solution(problem['date'], problem['title'], lead.code, problem['frontend_question_id'], lang=lead.lang)
+
+        report = fan_out_report(problem, accounts)
+        print(f"\n{'=' * 70}\n{report}\n{'=' * 70}")
+        send_email(
+            f"LeetCode Daily fan-out: {len(accepted)}/{len(accounts)} accepted - {problem['title']}",
+            report,
+        )
+        return accounts
+    finally:
+        run.finish()
+
+
+# ---------------------------
+# DAEMON MODE (stay resident with warm connections and fire at the UTC rollover)
+# ---------------------------
+_daemon_health = {}
+_daemon_health_lock = threading.Lock()
+
+
+def session_expiry(session_cookie):
+    """When a LEETCODE_SESSION cookie expires (UTC), read from its JWT payload, or None"""
+    try:
+        payload = session_cookie.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError, AttributeError):
+        return None
+    if claims.get("exp"):
+        return datetime.fromtimestamp(claims["exp"], timezone.utc)
+    # LeetCode's own sessions carry when they were refreshed and how long they last (14 days)
+    refreshed_at = claims.get("refreshed_at")
+    if not refreshed_at:
+        return None
+    max_age = claims.get("_session_expiry") or SESSION_MAX_AGE_DAYS * 86400
+    return datetime.fromtimestamp(refreshed_at, timezone.utc) + timedelta(seconds=max_age)
+
+
+def load_env_file(path):
+    """Apply KEY=VALUE lines from a file to os.environ; True if anything changed"""
+    changed = False
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.removeprefix("export ").split("=", 1)
+            key, value = key.strip(), value.strip().strip("'\"")
+            if os.environ.get(key) != value:
+                os.environ[key] = value
+                changed = True
+    return changed
+
+
+def reset_credentials():
+    """Drop every client built from the old secrets so the next use picks up the new ones"""
+    global _config, _client, _notifier, _genai_client
+    with _config_lock:
+        client, notifier = _client, _notifier
+        _config = _client = _notifier = _genai_client = None
+    if client:
+        run_async(client.aclose())
+        with _config_lock:
+            if client in _clients:
+                _clients.remove(client)
+    if notifier:
+        notifier.close()
+
+
+def report_health(**fields):
+    """Update the daemon's health record and write it to DAEMON_HEALTH_PATH"""
+    with _daemon_health_lock:
+        _daemon_health.update(fields, heartbeat=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        snapshot = dict(_daemon_health)
+    try:
+        os.makedirs(os.path.dirname(DAEMON_HEALTH_PATH) or ".", exist_ok=True)
+        tmp = DAEMON_HEALTH_PATH + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, indent=2, default=str)
+        os.replace(tmp, DAEMON_HEALTH_PATH)
+    except OSError as e:
+        print(f"⚠ Could not write daemon health: {e}")
+
+
+def serve_health(port):
+    """Serve the health record as JSON on 127.0.0.1:port (503 unless the daemon is healthy)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with _daemon_health_lock:
+                body = json.dumps(_daemon_health, default=str).encode()
+                healthy = _daemon_health.get("status") == "ok"
+            self.send_response(200 if healthy else 503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), HealthHandler)
+    threading.Thread(target=server.serve_forever, name="health", daemon=True).start()
+    print(f"✓ Health endpoint on http://127.0.0.1:{server.server_address[1]}/")
+    return server
+
+
+def warm_up():
+    """Open the LeetCode, Gemini and SMTP connections ahead of the run; returns the signed-in username"""
+    status = graphql("query { userStatus { isSignedIn username } }", operation="Checking session")["userStatus"]
+    if not status.get("isSignedIn"):
+        raise AuthenticationError("LeetCode session is no longer signed in. Please update credentials.")
+    if GEMINI_BACKEND == "genai":
+        get_genai_client()
+    else:
+        get_backend()
+    if get_config().email_to:
+        get_notifier().warm()
+    return status.get("username")
+
+
+def wait_for_daily(today, deadline, stop):
+    """Poll until LeetCode serves `today`'s daily (keeps the connection warm meanwhile); True once it's live"""
+    query = "query { activeDailyCodingChallengeQuestion { date } }"
+    while not stop.is_set():
+        try:
+            data = graphql(query, operation="Polling daily rollover")["activeDailyCodingChallengeQuestion"]
+            if data and data.get("date") == today:
+                return True
+        except AuthenticationError:
+            raise
+        except Exception as e:
+            print(f"  ⚠ Rollover poll failed: {e}")
+        if time.time() >= deadline:
+            return False
+        stop.wait(DAEMON_POLL_INTERVAL)
+    return False
+
+
+def check_session(warned):
+    """Health-check the session cookie; False (after one email) if it has expired
+
+    `warned` holds what has been emailed already, so each warning goes out once.
+    """
+    expires = session_expiry(get_config().leetcode_session)
+    report_health(session_expires=expires.isoformat(timespec="seconds") if expires else None)
+    if not expires:
+        return True
+    left = expires - datetime.now(timezone.utc)
+    if left.total_seconds() <= 0:
+        report_health(status="auth_expired", state="waiting for new credentials")
+        if ("expired", expires) not in warned:
+            warned.add(("expired", expires))
+            print(f"✗ LEETCODE_SESSION expired at {expires:%Y-%m-%d %H:%M} UTC")
+            send_auth_failure_email(AuthenticationError(f"LEETCODE_SESSION expired at {expires:%Y-%m-%d %H:%M} UTC"))
+        return False
+    if left.days < COOKIE_WARN_DAYS and ("expiring", expires) not in warned:
+        warned.add(("expiring", expires))
+        print(f"⚠ LEETCODE_SESSION expires in {left.days}d {left.seconds // 3600}h")
+        send_email(
+            "⚠ LeetCode session expires soon",
+            f"LEETCODE_SESSION expires at {expires:%Y-%m-%d %H:%M} UTC ({left.days}d {left.seconds // 3600}h left).\n\n"
+            "Log into LeetCode, copy the new LEETCODE_SESSION and csrftoken cookies and update "
+            f"{DAEMON_ENV_FILE or 'the daemon environment'} - the daemon reloads it without restarting."
+        )
+    return True
+
+
+def run_daemon(once=False, catch_up=True):
+    """Stay resident: warm up just before each UTC rollover, wait for the new daily and solve it
+
+    SIGHUP reloads DAEMON_ENV_FILE (it's also re-read whenever it changes);
+    SIGINT/SIGTERM stop the daemon between runs.
+    """
+    import signal
+
+    stop = threading.Event()
+    reload = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: reload.set())
+
+    if DAEMON_HEALTH_PORT:
+        serve_health(DAEMON_HEALTH_PORT)
+    report_health(status="ok", state="starting", pid=os.getpid(),
+                  started_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+    env_mtime = None
+    warned = set()
+    runs = 0
+    while not stop.is_set():
+        if DAEMON_ENV_FILE:
+            try:
+                mtime = os.stat(DAEMON_ENV_FILE).st_mtime
+            except OSError:
+                mtime = None
+            if mtime is not None and (mtime != env_mtime or reload.is_set()):
+                if load_env_file(DAEMON_ENV_FILE) and env_mtime is not None:
+                    print(f"↺ Reloaded credentials from {DAEMON_ENV_FILE}")
+                    reset_credentials()
+                env_mtime = mtime
+            reload.clear()
+
+        if not check_session(warned):
+            stop.wait(60)
+            continue
+
+        now = datetime.now(timezone.utc)
+        fire_at = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        if catch_up:
+            # Today's daily may still be unsolved (fresh start, or a crash) - the journal makes this safe
+            fire_at = now
+            catch_up = False
+        report_health(status="ok", state="sleeping", next_run=fire_at.isoformat(timespec="seconds"))
+        print(f"\n⏳ Next run at {fire_at:%Y-%m-%d %H:%M:%S} UTC")
+
+        # Wake up a little early; anything that changes meanwhile is picked up next loop
+        if stop.wait(max(0.0, (fire_at - datetime.now(timezone.utc)).total_seconds() - DAEMON_LEAD_SECONDS)):
+            break
+        try:
+            report_health(state="warming up")
+            user = warm_up()
+            report_health(user=user)
+            print(f"✓ Connections warm (signed in as {user})")
+            today = fire_at.strftime("%Y-%m-%d")
+            report_health(state="waiting for rollover")
+            if not wait_for_daily(today, fire_at.timestamp() + DAEMON_POLL_TIMEOUT, stop):
+                if stop.is_set():
+                    break
+                print(f"⚠ LeetCode still serving an older daily {DAEMON_POLL_TIMEOUT:.0f}s after rollover - running anyway")
+        except AuthenticationError as auth_err:
+            print_auth_error(auth_err)
+            report_health(status="auth_expired", state="waiting for new credentials", error=str(auth_err))
+            if ("rejected", get_config().leetcode_session) not in warned:
+                warned.add(("rejected", get_config().leetcode_session))
+                send_auth_failure_email(auth_err)
+            stop.wait(60)
+            continue
+        except Exception as e:
+            print(f"✗ Warm-up failed: {e} - running cold")
+            report_health(error=str(e))
+
+        started = time.monotonic()
+        lag = max(0.0, time.time() - fire_at.timestamp())
+        print(f"✓ Starting the pipeline {lag:.1f}s after the scheduled time")
+        report_health(state="running", error=None)
+        try:
+            run = main()
+            verdict = run.fields.get("verdict")
+        except Exception as e:
+            print(f"✗ Daily run crashed: {e}")
+            verdict = f"Crash: {e}"
+        runs += 1
+        report_health(
+            status="auth_expired" if verdict == "Auth Error" else "ok",
+            state="idle", runs=runs,
+            last_run={
+                "date": fire_at.strftime("%Y-%m-%d"),
+                "verdict": verdict,
+                "seconds": round(time.monotonic() - started, 1),
+                "started_after_rollover": round(lag, 1),
+            },
+        )
+        flush_saved_solutions()
+        if _notifier:
+            _notifier.flush()
+        # The one-shot CLI does this on exit; a resident process has to do it after every run
+        report_cache_stats()
+        cache_stats.clear()
+        evict_cache()
+        # Per-run state that would otherwise grow by one problem a day (the ledgers reseed from the archive)
+        with _cache_lock:
+            _prompt_uses.clear()
+            _generation_keys.clear()
+        with _ledgers_lock:
+            _ledgers.clear()
+        if once:
+            break
+
+    report_health(status="stopped", state="stopped")
+    print("✓ Daemon stopped")
+
+
+# ---------------------------
+# IMPORT-TIME REGRESSION CHECK
+# ---------------------------
+def check_import_time(runs=5):
+    """Import daily.py in fresh interpreters without secrets; fail on heavy imports or a blown budget"""
+    secrets = {"LEETCODE_SESSION", "LEETCODE_CSRF", "GEMINI_API_KEY", "EMAIL_USER", "EMAIL_PASS", "EMAIL_TO", "GH_PAT"}
+    env = {key: value for key, value in os.environ.items() if key not in secrets}
+    probe = (
+        "import sys, time; sys.path.insert(0, {path!r}); start = time.perf_counter(); import daily; "
+        "print((time.perf_counter() - start) * 1000); print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    ).format(path=os.path.dirname(os.path.abspath(__file__)), heavy=HEAVY_MODULES)
+
+    timings = []
+    loaded = ""
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"✗ Importing daily.py failed without secrets:\n{result.stderr}")
+            return 1
+        elapsed, loaded = result.stdout.strip().split("\n") if "\n" in result.stdout.strip() else (result.stdout.strip(), "")
+        timings.append(float(elapsed))
+
+    best = min(timings)
+    print(f"Import time: {best:.1f} ms (best of {runs}, budget {IMPORT_TIME_BUDGET_MS:.0f} ms)")
+    if loaded:
+        print(f"✗ Heavy modules imported eagerly: {loaded}")
+        return 1
+    if best > IMPORT_TIME_BUDGET_MS:
+        print("✗ Import time budget exceeded")
+        return 1
+    print("✓ Import time within budget")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solve today's LeetCode daily challenge with Gemini")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="fetch, generate and validate locally, but don't submit, save or email")
+    parser.add_argument("--languages", metavar="LANGS",
+                        help="comma-separated LeetCode langSlugs to race, e.g. java,cpp (default: RACE_LANGUAGES)")
+    parser.add_argument("--check-import-time", action="store_true",
+                        help="verify importing this script stays lazy and within IMPORT_TIME_BUDGET_MS, then exit")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="pre-build accepted solutions for many problems")
+    batch_parser.add_argument("--slugs", default="", help="comma-separated problem slugs")
+    batch_parser.add_argument("--dates", default="", help="comma-separated past daily dates (YYYY-MM-DD)")
+    batch_parser.add_argument("--problemset", type=int, default=0, metavar="N",
+                              help="page through the first N problems of the problemset")
+    batch_parser.add_argument("--skip", type=int, default=0, help="problemset offset")
+    batch_parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    batch_parser.add_argument("--retry-failed", action="store_true",
+                              help="retry problems that failed in a previous batch")
+
+    fanout_parser = subparsers.add_parser("fanout", help="solve the daily once and submit it for many accounts")
+    fanout_parser.add_argument("--accounts", metavar="FILE",
+                               help="JSON list of {name, session, csrf} (default: LEETCODE_ACCOUNTS)")
+
+    archive_parser = subparsers.add_parser("archive", help="show the solution archive, or bootstrap it from JavaYatra")
+    archive_parser.add_argument("--bootstrap", action="store_true",
+                                help="index leetcode_daily/<Mon>/<Mon><dd>.java using the 'lc N' commit history")
+
+    daemon_parser = subparsers.add_parser("daemon", help="stay resident and solve each daily right after the UTC rollover")
+    daemon_parser.add_argument("--once", action="store_true", help="exit after one run")
+    daemon_parser.add_argument("--no-catch-up", dest="catch_up", action="store_false",
+                               help="don't solve today's daily on start; wait for the next rollover")
+
+    stats_parser = subparsers.add_parser("stats", help="p50/p95 per stage across recorded runs")
+    stats_parser.add_argument("--days", type=int, default=0, help="only runs from the last N days")
+    stats_parser.add_argument("--kind", choices=["daily", "batch", "fanout"], help="only daily, batch or fanout runs")
+    args = parser.parse_args()
+
+    if args.check_import_time:
+        sys.exit(check_import_time())
+    if args.languages:
+        RACE_LANGUAGES = [lang.strip() for lang in args.languages.split(",") if lang.strip()]
+    if args.command == "stats":
+        report_stats(days=args.days, kind=args.kind)
+        sys.exit(0)
+
+    try:
+        if args.command == "batch":
+            targets = collect_batch_targets(
+                slugs=[s.strip() for s in args.slugs.split(",") if s.strip()],
+                dates=[d.strip() for d in args.dates.split(",") if d.strip()],
+                problemset_skip=args.skip,
+                problemset_limit=args.problemset,
+            )
+            run_batch(targets, workers=args.workers, retry_failed=args.retry_failed, dry_run=args.dry_run)
+        elif args.command == "archive":
+            if args.bootstrap:
+                bootstrap_archive()
+            report_archive()
+        elif args.command == "fanout":
+            run_fanout(load_accounts(args.accounts), dry_run=args.dry_run)
+        elif args.command == "daemon":
+            run_daemon(once=args.once, catch_up=args.catch_up)
+        else:
+            main(dry_run=args.dry_run)
+    finally:
+        release_context_caches()
+        close_transport()
+        if _notifier:
+            _notifier.close()
+        report_cache_stats()
+        evict_cache()
@@ -0,0 +1,190 @@
+"""Loop nesting and the complexity budget from the constraints (python -m pytest tests)"""
+import pytest
+
+import daily
+
+# O(n): sliding window
+LINEAR_WINDOW = """class Solution {
+    public int lengthOfLongestSubstring(String s) {
+        int[] last = new int[128];
+        int best = 0;
+        for (int left = 0, right = 0; right < s.length(); right++) {
+            char c = s.charAt(right);
+            left = Math.max(left, last[c]);
+            best = Math.max(best, right - left + 1);
+            last[c] = right + 1;
+        }
+        return best;
+    }
+}"""
+
+# O(n): two pointers, one loop
+TWO_POINTER = """class Solution {
+    public int maxArea(int[] height) {
+        int i = 0, j = height.length - 1, best = 0;
+        while (i < j) {
+            best = Math.max(best, Math.min(height[i], height[j]) * (j - i));
+            if (height[i] < height[j]) {
+                i++;
+            } else {
+                j--;
+            }
+        }
+        return best;
+    }
+}"""
+
+# O(n log n): binary search inside the scan
+NLOGN = """class Solution {
+    public int lengthOfLIS(int[] nums) {
+        int[] tails = new int[nums.length];
+        int size = 0;
+        for (int x : nums) {
+            int lo = 0, hi = size;
+            while (lo < hi) {
+                int mid = (lo + hi) >>> 1;
+                if (tails[mid] < x) lo = mid + 1; else hi = mid;
+            }
+            tails[lo] = x;
+            if (lo == size) size++;
+        }
+        return size;
+    }
+}"""
+
+# O(n^2): the textbook LIS dp
+QUADRATIC = """class Solution {
+    public int lengthOfLIS(int[] nums) {
+        int[] dp = new int[nums.length];
+        int best = 0;
+        for (int i = 0; i < nums.length; i++) {
+            dp[i] = 1;
+            for (int j = 0; j < i; j++) {
+                if (nums[j] < nums[i]) {
+                    dp[i] = Math.max(dp[i], dp[j] + 1);
+                }
+            }
+            best = Math.max(best, dp[i]);
+        }
+        return best;
+    }
+}"""
+
+# O(n^3): every triple
+CUBIC = """class Solution {
+    public int threeSumCount(int[] nums) {
+        int count = 0;
+        for (int i = 0; i < nums.length; i++) {
+            for (int j = i + 1; j < nums.length; j++) {
+                for (int k = j + 1; k < nums.length; k++) {
+                    if (nums[i] + nums[j] + nums[k] == 0) count++;
+                }
+            }
+        }
+        return count;
+    }
+}"""
+
+# O(m * n): a grid scan, plus a direction loop with constant bounds
+GRID_DIRS = """class Solution {
+    private static final int[][] DIRS = {{1, 0}, {-1, 0}, {0, 1}, {0, -1}};
+    public int numIslands(char[][] grid) {
+        int count = 0;
+        for (int r = 0; r < grid.length; r++) {
+            for (int c = 0; c < grid[0].length; c++) {
+                if (grid[r][c] == '1') { count++; sink(grid, r, c); }
+            }
+        }
+        return count;
+    }
+    private void sink(char[][] grid, int r, int c) {
+        grid[r][c] = '0';
+        for (int[] d : DIRS) {
+            int nr = r + d[0], nc = c + d[1];
+            if (nr >= 0 && nc >= 0 && nr < grid.length && nc < grid[0].length && grid[nr][nc] == '1') sink(grid, nr, nc);
+        }
+    }
+}"""
+
+# O(n * k): an alphabet loop inside the scan
+ALPHABET = """class Solution {
+    public List<List<String>> groupAnagrams(String[] strs) {
+        Map<String, List<String>> groups = new HashMap<>();
+        for (String s : strs) {
+            int[] count = new int[26];
+            for (char ch : s.toCharArray()) count[ch - 'a']++;
+            StringBuilder key = new StringBuilder();
+            for (int i = 0; i < 26; i++) {
+                key.append('#').append(count[i]);
+            }
+            groups.computeIfAbsent(key.toString(), x -> new ArrayList<>()).add(s);
+        }
+        return new ArrayList<>(groups.values());
+    }
+}"""
+
+
+def constraints(*lines):
+    """A Constraints section as LeetCode renders it"""
+    items = "".join(f"\n\t<li><code>{line}</code></li>" for line in lines)
+    return {"content": f"<p><strong>Constraints:</strong></p>\n\n<ul>{items}\n</ul>\n"}
+
+
+@pytest.mark.parametrize("code, depth, skipping_constant", [
+    (LINEAR_WINDOW, 1, 1),
+    (TWO_POINTER, 1, 1),
+    (NLOGN, 2, 2),
+    (QUADRATIC, 2, 2),
+    (CUBIC, 3, 3),
+    (GRID_DIRS, 2, 2),
+    (ALPHABET, 2, 1),
+], ids=["sliding-window", "two-pointers", "n-log-n", "quadratic", "cubic", "grid-dirs", "alphabet"])
+def test_loop_nesting_depth(code, depth, skipping_constant):
+    assert daily.loop_nesting_depth(code) == depth
+    assert daily.loop_nesting_depth(code, skip_constant=True) == skipping_constant
+
+
+@pytest.mark.parametrize("problem, label, too_slow, max_depth", [
+    # Two Sum
+    (constraints("2 &lt;= nums.length &lt;= 10<sup>4</sup>", "-10<sup>9</sup> &lt;= nums[i] &lt;= 10<sup>9</sup>"),
+     "O(n^2)", "O(n^2 log n)", 3),
+    # Kth Largest Element in an Array
+    (constraints("1 &lt;= k &lt;= nums.length &lt;= 10<sup>5</sup>", "-10<sup>4</sup> &lt;= nums[i] &lt;= 10<sup>4</sup>"),
+     "O(n sqrt n)", "O(n^2)", 2),
+    # Longest Increasing Subsequence
+    (constraints("1 &lt;= nums.length &lt;= 2500", "-10<sup>4</sup> &lt;= nums[i] &lt;= 10<sup>4</sup>"),
+     "O(n^2 log n)", "O(n^3)", 3),
+    # Number of Islands
+    (constraints("m == grid.length", "n == grid[i].length", "1 &lt;= m, n &lt;= 300"), "O(n^3)", "O(2^n)", 4),
+    # Fibonacci Number: n is a value, not a length, so there is no nesting limit
+    (constraints("0 &lt;= n &lt;= 30"), "O(n^3)", "O(2^n)", None),
+    # Subsets: tiny inputs allow exhaustive search
+    (constraints("1 &lt;= nums.length &lt;= 10", "-10 &lt;= nums[i] &lt;= 10"), "O(n!)", None, None),
+], ids=["two-sum", "kth-largest", "lis", "number-of-islands", "fibonacci", "subsets"])
+def test_complexity_budget(problem, label, too_slow, max_depth):
+    budget = daily.complexity_budget(problem)
+    assert (budget["label"], budget["too_slow"], budget["max_loop_depth"]) == (label, too_slow, max_depth)
+
+
+def test_no_budget_without_size_bounds(monkeypatch):
+    assert daily.complexity_budget({"content": "<p>Given an integer array <code>nums</code>.</p>"}) is None
+    monkeypatch.setattr(daily, "COMPLEXITY_BUDGET", False)
+    assert daily.complexity_budget(constraints("1 &lt;= nums.length &lt;= 10<sup>5</sup>")) is None
+
+
+LARGE = constraints("1 &lt;= nums.length &lt;= 10<sup>5</sup>")
+MEDIUM = constraints("1 &lt;= nums.length &lt;= 10<sup>4</sup>")
+
+
+@pytest.mark.parametrize("code, problem, over", [
+    (LINEAR_WINDOW, LARGE, None),
+    (TWO_POINTER, LARGE, None),
+    (NLOGN, LARGE, None),
+    # One level of slack: nesting can't tell the O(n^2) dp from an amortized scan
+    (QUADRATIC, LARGE, None),
+    (ALPHABET, LARGE, None),
+    (CUBIC, LARGE, {"loop_depth": 3, "budget": "O(n sqrt n)", "n": 10 ** 5}),
+    (CUBIC, MEDIUM, None),
+], ids=["sliding-window", "two-pointers", "n-log-n", "quadratic", "alphabet", "cubic-large", "cubic-medium"])
+def test_exceeds_budget(code, problem, over):
+    assert daily.exceeds_budget(code, daily.complexity_budget(problem)) == over
@@ -0,0 +1,119 @@
+"""Constraint parsing and runtime curve fitting for the stress test (python -m pytest tests)"""
+import math
+
+import pytest
+
+import daily
+
+# Constraints sections as LeetCode serves them in the question's `content`
+TWO_SUM = """<p><strong>Constraints:</strong></p>
+
+<ul>
+	<li><code>2 &lt;= nums.length &lt;= 10<sup>4</sup></code></li>
+	<li><code>-10<sup>9</sup> &lt;= nums[i] &lt;= 10<sup>9</sup></code></li>
+	<li><code>-10<sup>9</sup> &lt;= target &lt;= 10<sup>9</sup></code></li>
+	<li><strong>Only one valid answer exists.</strong></li>
+</ul>
+
+<p>&nbsp;</p>
+<strong>Follow-up:&nbsp;</strong>Can you come up with an algorithm that is less than <code>O(n<sup>2</sup>)</code><font face="monospace">&nbsp;</font>time complexity?"""
+
+NUMBER_OF_ISLANDS = """<p><strong>Constraints:</strong></p>
+
+<ul>
+	<li><code>m == grid.length</code></li>
+	<li><code>n == grid[i].length</code></li>
+	<li><code>1 &lt;= m, n &lt;= 300</code></li>
+	<li><code>grid[i][j]</code> is <code>&#39;0&#39;</code> or <code>&#39;1&#39;</code>.</li>
+</ul>
+"""
+
+LONGEST_SUBSTRING = """<p><strong>Constraints:</strong></p>
+
+<ul>
+	<li><code>0 &lt;= s.length &lt;= 5 * 10<sup>4</sup></code></li>
+	<li><code>s</code> consists of English letters, digits, symbols and spaces.</li>
+</ul>
+"""
+
+# Minified: no whitespace between the list items
+MINIFIED = ("<p><strong>Constraints:</strong></p><ul><li><code>1 &lt;= nums.length &lt;= 10<sup>5</sup></code></li>"
+            "<li><code>-10<sup>9</sup> &lt;= nums[i] &lt;= 10<sup>9</sup></code></li></ul>")
+
+KTH_LARGEST = """<p><strong>Constraints:</strong></p>
+
+<ul>
+	<li><code>1 &lt;= k &lt;= nums.length &lt;= 10<sup>5</sup></code></li>
+	<li><code>-10<sup>4</sup> &lt;= nums[i] &lt;= 10<sup>4</sup></code></li>
+</ul>
+"""
+
+MEDIAN_OF_TWO_ARRAYS = """<p><strong>Constraints:</strong></p>
+
+<ul>
+	<li><code>nums1.length == m</code></li>
+	<li><code>nums2.length == n</code></li>
+	<li><code>0 &lt;= m &lt;= 1000</code></li>
+	<li><code>0 &lt;= n &lt;= 1000</code></li>
+	<li><code>1 &lt;= m + n &lt;= 2000</code></li>
+	<li><code>-10<sup>6</sup> &lt;= nums1[i], nums2[i] &lt;= 10<sup>6</sup></code></li>
+</ul>
+"""
+
+
+@pytest.mark.parametrize("content, expected", [
+    (TWO_SUM, {"nums.length": (2, 10 ** 4), "nums[i]": (-10 ** 9, 10 ** 9), "target": (-10 ** 9, 10 ** 9)}),
+    (NUMBER_OF_ISLANDS, {"m": (1, 300), "n": (1, 300), "grid.length": (1, 300), "grid[i].length": (1, 300)}),
+    (LONGEST_SUBSTRING, {"s.length": (0, 5 * 10 ** 4)}),
+    (MINIFIED, {"nums.length": (1, 10 ** 5), "nums[i]": (-10 ** 9, 10 ** 9)}),
+    (KTH_LARGEST, {"k": (1, "nums.length"), "nums.length": (1, 10 ** 5), "nums[i]": (-10 ** 4, 10 ** 4)}),
+    (MEDIAN_OF_TWO_ARRAYS, {"m": (0, 1000), "n": (0, 1000), "nums1.length": (0, 1000), "nums2.length": (0, 1000),
+                            "nums1[i]": (-10 ** 6, 10 ** 6), "nums2[i]": (-10 ** 6, 10 ** 6)}),
+], ids=["two-sum", "number-of-islands", "longest-substring", "minified", "kth-largest", "median-of-two-arrays"])
+def test_parse_constraints(content, expected):
+    assert daily.parse_constraints(daily.constraints_text(content)) == expected
+
+
+def test_constraints_text_stops_at_follow_up():
+    assert "O(n^2)" not in daily.constraints_text(TWO_SUM)
+    assert daily.constraints_text("<p>Given an integer array <code>nums</code>.</p>") == ""
+
+
+@pytest.mark.parametrize("expr, value", [
+    ("10^5", 10 ** 5),
+    ("2 * 10^4", 2 * 10 ** 4),
+    ("-2^31", -2 ** 31),
+    ("2^31 - 1", 2 ** 31 - 1),
+    ("10,000", 10000),
+    ("nums.length", None),
+    ("10^100", None),
+])
+def test_parse_bound(expr, value):
+    assert daily.parse_bound(expr) == value
+
+
+FRACTIONS = [1 / 64, 1 / 16, 1 / 4, 1]
+N = 10 ** 5
+
+
+@pytest.mark.parametrize("cost, exponent, label", [
+    (lambda n: n * 1e-3, 1.0, "O(n)"),
+    # n log n over a 64x range only adds ~0.1 to the exponent, so it reads as (near) linear
+    (lambda n: n * math.log2(n) * 1e-4, 1.11, "O(n)"),
+    (lambda n: n * n * 1e-6, 2.0, "O(n^2)"),
+    (lambda n: n ** 3 * 1e-12, 3.0, "O(n^3)"),
+], ids=["linear", "n-log-n", "quadratic", "cubic"])
+def test_fit_complexity(cost, exponent, label):
+    fitted, predicted = daily.fit_complexity([(f, cost(f * N)) for f in FRACTIONS])
+    assert fitted == pytest.approx(exponent, abs=0.01)
+    assert predicted == pytest.approx(cost(N), rel=0.02)
+    assert daily.complexity_label(fitted) == label
+
+
+@pytest.mark.parametrize("timings, expected", [
+    ([(f, 0.5) for f in FRACTIONS], (None, 0.5)),  # All under a millisecond - nothing to fit
+    ([(1, 5.0)], (None, 5.0)),
+    ([], (None, 0.0)),
+])
+def test_fit_complexity_without_a_curve(timings, expected):
+    assert daily.fit_complexity(timings) == expected
@@ -0,0 +1,115 @@
+"""Candidate fingerprints and the duplicate ledger (python -m pytest tests)"""
+import pytest
+
+import daily
+
+TWO_SUM_HASH = """class Solution {
+    public int[] twoSum(int[] nums, int target) {
+        Map<Integer, Integer> seen = new HashMap<>();
+        for (int i = 0; i < nums.length; i++) {
+            int need = target - nums[i];
+            if (seen.containsKey(need)) return new int[]{seen.get(need), i};
+            seen.put(nums[i], i);
+        }
+        return new int[0];
+    }
+}"""
+
+# Same code: renamed locals/parameters, an import and a comment
+TWO_SUM_RENAMED = """import java.util.*;
+class Solution {
+    // one pass hash map
+    public int[] twoSum(int[] arr, int goal) {
+        Map<Integer, Integer> index = new HashMap<>();
+        for (int k = 0; k < arr.length; k++) {
+            int want = goal - arr[k];
+            if (index.containsKey(want)) return new int[]{index.get(want), k};
+            index.put(arr[k], k);
+        }
+        return new int[0];
+    }
+}"""
+
+# A one-token change to the hash map solution
+TWO_SUM_TWEAKED = TWO_SUM_HASH.replace("int need = target - nums[i];", "int need = target - nums[i] + 7;")
+
+TWO_SUM_BRUTE = """class Solution {
+    public int[] twoSum(int[] nums, int target) {
+        for (int i = 0; i < nums.length; i++) {
+            for (int j = i + 1; j < nums.length; j++) {
+                if (nums[i] + nums[j] == target) return new int[]{i, j};
+            }
+        }
+        return new int[0];
+    }
+}"""
+
+HELPER_FIRST = """class Solution {
+    private int helper(int x) { return x * 2; }
+    public int solve(int[] nums) { int s = 0; for (int v : nums) s += helper(v); return s; }
+}"""
+
+HELPER_LAST = """class Solution {
+    public int solve(int[] a) { int t = 0; for (int w : a) t += helper(w); return t; }
+    private int helper(int y) { return y * 2; }
+}"""
+
+
+def signature(code):
+    return daily.minhash_signature(daily.normalized_java_tokens(code))
+
+
+@pytest.mark.parametrize("first, second, same", [
+    (TWO_SUM_HASH, TWO_SUM_RENAMED, True),
+    (HELPER_FIRST, HELPER_LAST, True),
+    (TWO_SUM_TWEAKED, TWO_SUM_TWEAKED.replace("+ 7", "+ 9"), True),
+    (TWO_SUM_HASH, TWO_SUM_HASH.replace("new int[0]", "new int[1]"), False),
+    (TWO_SUM_HASH, TWO_SUM_TWEAKED, False),
+    (TWO_SUM_HASH, TWO_SUM_BRUTE, False),
+], ids=["renamed", "reordered-methods", "other-literal", "zero-vs-one", "extra-term", "other-algorithm"])
+def test_normalized_tokens(first, second, same):
+    assert (daily.normalized_java_tokens(first) == daily.normalized_java_tokens(second)) is same
+
+
+def test_normalized_tokens_keep_library_names():
+    tokens = daily.normalized_java_tokens(TWO_SUM_HASH)
+    assert {"containsKey", "length", "HashMap"} <= set(tokens)
+    assert "nums" not in tokens and "target" not in tokens
+
+
+@pytest.mark.parametrize("first, second, low, high", [
+    (TWO_SUM_HASH, TWO_SUM_HASH, 1.0, 1.0),
+    (TWO_SUM_HASH, TWO_SUM_RENAMED, 1.0, 1.0),
+    (TWO_SUM_HASH, TWO_SUM_TWEAKED, 0.8, 0.99),
+    (TWO_SUM_HASH, TWO_SUM_BRUTE, 0.0, 0.4),
+], ids=["identical", "renamed", "extra-term", "other-algorithm"])
+def test_minhash_similarity(first, second, low, high):
+    assert low <= daily.minhash_similarity(signature(first), signature(second)) <= high
+
+
+def test_ledger_drops_duplicates_until_a_fixable_verdict(monkeypatch):
+    monkeypatch.setattr(daily, "NEAR_DUPLICATE_THRESHOLD", 0.8)
+    ledger = daily.CandidateLedger()
+    assert ledger.admit(TWO_SUM_HASH) is None
+    assert ledger.admit(TWO_SUM_RENAMED) == 1.0
+    assert ledger.admit(TWO_SUM_TWEAKED) >= 0.8
+    assert ledger.admit(TWO_SUM_BRUTE) is None
+
+    # A small edit can fix a wrong answer, so near copies are let through again
+    ledger.mark(TWO_SUM_HASH, "Wrong Answer")
+    assert ledger.admit(TWO_SUM_TWEAKED) is None
+    assert ledger.admit(TWO_SUM_RENAMED) == 1.0
+
+
+def test_ledger_seeds_from_the_archive(monkeypatch, tmp_path):
+    monkeypatch.setattr(daily, "ARCHIVE_PATH", str(tmp_path / "archive.sqlite3"))
+    monkeypatch.setattr(daily, "_ledgers", {})
+    earlier = daily.candidate_ledger("two-sum")
+    earlier.admit(TWO_SUM_BRUTE)
+    earlier.mark(TWO_SUM_BRUTE, "Time Limit Exceeded")
+
+    # A later process starts with an empty in-memory ledger
+    monkeypatch.setattr(daily, "_ledgers", {})
+    later = daily.candidate_ledger("two-sum")
+    assert later.admit(TWO_SUM_BRUTE.replace("target", "goal")) == 1.0
+    assert daily.candidate_ledger("three-sum").admit(TWO_SUM_BRUTE) is None